@@ -0,0 +1,41 @@
+"""add inbound mqtt receipts for idempotent shared-subscription ingestion
+
+Revision ID: 0004_mqtt_inbound_receipts
+Revises: 0003_mission_orders
+Create Date: 2026-07-02
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "0004_mqtt_inbound_receipts"
+down_revision: str | None = "0003_mission_orders"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mqtt_inbound_receipts",
+        sa.Column("message_key", sa.String(length=64), nullable=False),
+        sa.Column(
+            "received_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("message_key"),
+    )
+    op.create_index(
+        "ix_mqtt_inbound_receipts_received_at",
+        "mqtt_inbound_receipts",
+        ["received_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mqtt_inbound_receipts_received_at", table_name="mqtt_inbound_receipts")
+    op.drop_table("mqtt_inbound_receipts")
@@ -0,0 +1,35 @@
+"""index mqtt message logs by creation time for retention pruning
+
+Revision ID: 0005_mqtt_message_log_created_at
+Revises: 0004_mqtt_inbound_receipts
+Create Date: 2026-07-09
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0005_mqtt_message_log_created_at"
+down_revision: str | None = "0004_mqtt_inbound_receipts"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Build the index without blocking inserts into a table that may already be large.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_mqtt_message_logs_created_at",
+            "mqtt_message_logs",
+            ["created_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_mqtt_message_logs_created_at",
+            table_name="mqtt_message_logs",
+            postgresql_concurrently=True,
+        )
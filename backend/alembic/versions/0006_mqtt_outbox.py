@@ -0,0 +1,58 @@
+"""add the mqtt outbox relayed to the broker after commit
+
+Revision ID: 0006_mqtt_outbox
+Revises: 0005_mqtt_message_log_created_at
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "0006_mqtt_outbox"
+down_revision: str | None = "0005_mqtt_message_log_created_at"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mqtt_outbox",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            autoincrement=True,
+            nullable=False,
+        ),
+        sa.Column("robot_id", sa.String(length=36), nullable=True),
+        sa.Column("message_log_id", sa.String(length=36), nullable=False),
+        sa.Column("mission_order_id", sa.String(length=36), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.String(length=500), nullable=True),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("published_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["robot_id"], ["robots.id"]),
+        sa.ForeignKeyConstraint(["message_log_id"], ["mqtt_message_logs.id"]),
+        sa.ForeignKeyConstraint(["mission_order_id"], ["mission_orders.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_mqtt_outbox_pending",
+        "mqtt_outbox",
+        ["robot_id", "id"],
+        postgresql_where=sa.text("published_at IS NULL AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mqtt_outbox_pending", table_name="mqtt_outbox")
+    op.drop_table("mqtt_outbox")
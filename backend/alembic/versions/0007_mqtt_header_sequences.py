@@ -0,0 +1,33 @@
+"""add per-robot outbound header sequences
+
+Revision ID: 0007_mqtt_header_sequences
+Revises: 0006_mqtt_outbox
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "0007_mqtt_header_sequences"
+down_revision: str | None = "0006_mqtt_outbox"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Rows are created on first use, seeded from the robot's existing orders and message logs.
+    op.create_table(
+        "mqtt_header_sequences",
+        sa.Column("robot_id", sa.String(length=36), nullable=False),
+        sa.Column("message_type", sa.String(length=64), nullable=False),
+        sa.Column("next_header_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["robot_id"], ["robots.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("robot_id", "message_type"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("mqtt_header_sequences")
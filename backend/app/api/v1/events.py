@@ -1,15 +1,19 @@
 import asyncio
 from contextlib import suppress
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
 
 from app.api.deps import EventBusDep
+from app.api.v1.schemas import EventSubscriptionMessage
+from app.services.event_bus import EventFilter
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
 @router.websocket("/ws")
 async def events_websocket(websocket: WebSocket, event_bus: EventBusDep) -> None:
+    """Stream domain events; a ``subscribe`` message narrows which events are sent."""
     await websocket.accept()
     try:
         async with event_bus.subscribe() as events:
@@ -26,8 +30,29 @@ async def events_websocket(websocket: WebSocket, event_bus: EventBusDep) -> None
                         with suppress(asyncio.CancelledError):
                             await event_task
                         return
+                    try:
+                        subscription = EventSubscriptionMessage.model_validate_json(
+                            message.get("text") or message.get("bytes") or b""
+                        )
+                    except ValidationError:
+                        event_task.cancel()
+                        with suppress(asyncio.CancelledError):
+                            await event_task
+                        await websocket.close(
+                            code=status.WS_1008_POLICY_VIOLATION,
+                            reason="Expected a subscribe message",
+                        )
+                        return
+                    event_bus.update_filter(
+                        events,
+                        EventFilter(
+                            event_types=frozenset(subscription.event_types),
+                            robot_ids=frozenset(subscription.robot_ids),
+                            mission_ids=frozenset(subscription.mission_ids),
+                        ),
+                    )
                 if event_task in done:
-                    await websocket.send_json(event_task.result().as_message())
+                    await websocket.send_text(event_task.result().as_json())
                 for task in pending:
                     task.cancel()
                     with suppress(asyncio.CancelledError):
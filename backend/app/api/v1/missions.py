@@ -6,12 +6,12 @@ from sqlalchemy import select
 from app.api.deps import EventBusDep, SessionDep
 from app.api.v1.schemas import MissionCreate, MissionDispatchRead, MissionRead
 from app.db.base import Mission
-from app.mqtt.outbound import MqttPublisher, get_mqtt_publisher
+from app.mqtt.outbox import OutboxRelay, get_outbox_relay
 from app.services.mission_dispatch import MissionDispatchService
 from app.services.mission_service import MissionService
 
 router = APIRouter(prefix="/missions", tags=["missions"])
-PublisherDep = Annotated[MqttPublisher, Depends(get_mqtt_publisher)]
+OutboxRelayDep = Annotated[OutboxRelay, Depends(get_outbox_relay)]
 
 
 @router.get("", response_model=list[MissionRead])
@@ -44,15 +44,14 @@ async def create_mission(
 async def dispatch_mission(
     mission_id: str,
     session: SessionDep,
-    publisher: PublisherDep,
+    outbox_relay: OutboxRelayDep,
     event_bus: EventBusDep,
 ) -> MissionDispatchRead:
-    result = await MissionDispatchService(session, publisher, event_bus).dispatch_mission(
-        mission_id
-    )
+    result = await MissionDispatchService(session, event_bus).dispatch_mission(mission_id)
     if not result.accepted:
         status_code = status.HTTP_404_NOT_FOUND if result.errors == ["Mission not found"] else 400
         raise HTTPException(status_code=status_code, detail=result.errors)
+    outbox_relay.notify()
     return MissionDispatchRead(
         accepted=result.accepted,
         topic=result.topic,
@@ -1,13 +1,25 @@
 from typing import Annotated, Literal
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy import func, select
 
 from app.api.deps import SessionDep
-from app.api.v1.schemas import MqttMessagePage, MqttMessageRead
+from app.api.v1.schemas import (
+    MqttIngestLaneRead,
+    MqttIngestStatsRead,
+    MqttIngestTopicRead,
+    MqttMessagePage,
+    MqttMessageRead,
+    MqttSequenceStatsRead,
+)
+from app.core.config import get_settings
 from app.db.base import MqttMessageLog
+from app.mqtt.inbound_queue import PRIORITY_CLASSES, TopicQueueStats, message_priority
+from app.mqtt.worker import MqttWorker
+from app.services.robot_registry import RobotIdentityCache, get_robot_identity_cache
 
 router = APIRouter(prefix="/mqtt", tags=["mqtt"])
+IdentityCacheDep = Annotated[RobotIdentityCache, Depends(get_robot_identity_cache)]
 
 
 @router.get("/messages", response_model=MqttMessagePage)
@@ -53,3 +65,114 @@ async def list_mqtt_messages(
         total=total,
         pages=pages,
     )
+
+
+@router.get("/ingest", response_model=MqttIngestStatsRead)
+async def get_mqtt_ingest_stats(request: Request) -> MqttIngestStatsRead:
+    settings = get_settings()
+    worker: MqttWorker | None = getattr(request.app.state, "mqtt_worker", None)
+    if worker is None:
+        return MqttIngestStatsRead(
+            enabled=False,
+            batch_size_limit=settings.mqtt_ingest_batch_size,
+            batch_latency_ms=settings.mqtt_ingest_batch_latency_ms,
+            coalesce_threshold=settings.mqtt_ingest_coalesce_threshold,
+            shed_policy=settings.mqtt_ingest_shed_policy,
+            redelivery_window=settings.mqtt_ingest_redelivery_window,
+            queue_depth=0,
+            batches=0,
+            messages=0,
+            failed_batches=0,
+            coalesced_messages=0,
+            duplicate_messages=0,
+            redelivered_messages=0,
+            last_batch_size=0,
+            max_batch_size=0,
+            average_batch_size=0.0,
+            messages_per_second=0.0,
+            topics=_topic_reads({}),
+            lanes=[],
+        )
+    dispatcher = worker.dispatcher
+    stats = dispatcher.stats
+    return MqttIngestStatsRead(
+        enabled=True,
+        batch_size_limit=settings.mqtt_ingest_batch_size,
+        batch_latency_ms=settings.mqtt_ingest_batch_latency_ms,
+        coalesce_threshold=settings.mqtt_ingest_coalesce_threshold,
+        shed_policy=settings.mqtt_ingest_shed_policy,
+        redelivery_window=settings.mqtt_ingest_redelivery_window,
+        queue_depth=dispatcher.queue_depth,
+        batches=stats.batches,
+        messages=stats.messages,
+        failed_batches=stats.failed_batches,
+        coalesced_messages=stats.coalesced_messages,
+        duplicate_messages=stats.duplicate_messages,
+        redelivered_messages=stats.redelivered_messages,
+        last_batch_size=stats.last_batch_size,
+        max_batch_size=stats.max_batch_size,
+        average_batch_size=stats.average_batch_size,
+        messages_per_second=dispatcher.messages_per_second,
+        topics=_topic_reads(dispatcher.topic_stats),
+        lanes=[
+            MqttIngestLaneRead(
+                lane=index,
+                queue_depth=lane.queue_depth,
+                batches=lane.stats.batches,
+                messages=lane.stats.messages,
+                failed_batches=lane.stats.failed_batches,
+                coalesced_messages=lane.stats.coalesced_messages,
+                duplicate_messages=lane.stats.duplicate_messages,
+                redelivered_messages=lane.stats.redelivered_messages,
+                last_batch_size=lane.stats.last_batch_size,
+                max_batch_size=lane.stats.max_batch_size,
+                average_batch_size=lane.stats.average_batch_size,
+                messages_per_second=lane.messages_per_second,
+            )
+            for index, lane in enumerate(dispatcher.lanes)
+        ],
+    )
+
+
+@router.get("/sequences", response_model=list[MqttSequenceStatsRead])
+async def list_mqtt_sequence_stats(
+    request: Request, identity_cache: IdentityCacheDep
+) -> list[MqttSequenceStatsRead]:
+    worker: MqttWorker | None = getattr(request.app.state, "mqtt_worker", None)
+    if worker is None:
+        return []
+    reads = []
+    for (manufacturer, serial_number), stats in sorted(worker.dispatcher.sequence_stats.items()):
+        robot = identity_cache.get(manufacturer, serial_number)
+        reads.append(
+            MqttSequenceStatsRead(
+                manufacturer=manufacturer,
+                serial_number=serial_number,
+                robot_id=robot.id if robot is not None else None,
+                received=stats.received,
+                missing=stats.missing,
+                late=stats.late,
+                duplicates=stats.duplicates,
+                restarts=stats.restarts,
+                loss_rate=stats.loss_rate,
+                reorder_rate=stats.reorder_rate,
+            )
+        )
+    return reads
+
+
+def _topic_reads(stats_by_type: dict[str, TopicQueueStats]) -> list[MqttIngestTopicRead]:
+    names = set(PRIORITY_CLASSES) | stats_by_type.keys()
+    reads = []
+    for name in sorted(names, key=lambda name: (message_priority(name), name)):
+        stats = stats_by_type.get(name, TopicQueueStats())
+        reads.append(
+            MqttIngestTopicRead(
+                message_type=name,
+                priority=message_priority(name),
+                queued=stats.queued,
+                shed=stats.shed,
+                queue_depth=stats.depth,
+            )
+        )
+    return reads
@@ -1,23 +1,33 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 
 from app.api.deps import EventBusDep, SessionDep
 from app.api.v1.schemas import (
+    InstantActionBroadcastCreate,
+    InstantActionBroadcastItemRead,
+    InstantActionBroadcastRead,
     InstantActionCreate,
     InstantActionRead,
     RobotCreate,
     RobotRead,
     RobotStateRead,
+    VisualizationSampleRead,
 )
 from app.db.base import Robot, RobotStateSnapshot
-from app.mqtt.outbound import MqttPublisher, get_mqtt_publisher
+from app.mqtt.outbox import OutboxRelay, get_outbox_relay
 from app.services.instant_action_service import InstantActionService
 from app.services.robot_registry import RobotRegistryService
+from app.services.visualization_buffer import (
+    VisualizationBuffer,
+    VisualizationSample,
+    get_visualization_buffer,
+)
 
 router = APIRouter(prefix="/robots", tags=["robots"])
-PublisherDep = Annotated[MqttPublisher, Depends(get_mqtt_publisher)]
+OutboxRelayDep = Annotated[OutboxRelay, Depends(get_outbox_relay)]
+VisualizationBufferDep = Annotated[VisualizationBuffer, Depends(get_visualization_buffer)]
 
 
 @router.get("", response_model=list[RobotRead])
@@ -61,6 +71,17 @@ async def list_robot_states(robot_id: str, session: SessionDep) -> list[RobotSta
     return list(result.scalars())
 
 
+@router.get("/{robot_id}/visualization", response_model=list[VisualizationSampleRead])
+async def list_robot_visualization(
+    robot_id: str,
+    session: SessionDep,
+    buffer: VisualizationBufferDep,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+) -> list[VisualizationSample]:
+    robot = await _ensure_robot_exists(robot_id, session)
+    return buffer.samples(robot.manufacturer, robot.serial_number, limit)
+
+
 @router.get("/{robot_id}/factsheet")
 async def get_robot_factsheet(robot_id: str, session: SessionDep) -> dict[str, Any]:
     robot = await _ensure_robot_exists(robot_id, session)
@@ -71,6 +92,43 @@ async def get_robot_factsheet(robot_id: str, session: SessionDep) -> dict[str, A
     return robot.factsheet
 
 
+@router.post(
+    "/instant-actions",
+    response_model=InstantActionBroadcastRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def broadcast_instant_action(
+    payload: InstantActionBroadcastCreate,
+    session: SessionDep,
+    outbox_relay: OutboxRelayDep,
+    event_bus: EventBusDep,
+) -> InstantActionBroadcastRead:
+    result = await InstantActionService(session, event_bus).broadcast(
+        payload.action_type,
+        payload.action_parameters,
+        robot_ids=payload.robot_ids,
+        manufacturer=payload.manufacturer,
+        connection_state=payload.connection_state,
+    )
+    if not result.accepted:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result.errors)
+    outbox_relay.notify()
+    return InstantActionBroadcastRead(
+        accepted=True,
+        results=[
+            InstantActionBroadcastItemRead(
+                robot_id=robot_id,
+                accepted=item.accepted,
+                topic=item.topic,
+                payload=item.payload,
+                errors=item.errors,
+            )
+            for robot_id, item in result.results.items()
+        ],
+        errors=[],
+    )
+
+
 @router.post(
     "/{robot_id}/instant-actions",
     response_model=InstantActionRead,
@@ -80,15 +138,16 @@ async def send_instant_action(
     robot_id: str,
     payload: InstantActionCreate,
     session: SessionDep,
-    publisher: PublisherDep,
+    outbox_relay: OutboxRelayDep,
     event_bus: EventBusDep,
 ) -> InstantActionRead:
-    result = await InstantActionService(session, publisher, event_bus).send(
+    result = await InstantActionService(session, event_bus).send(
         robot_id, payload.action_type, payload.action_parameters
     )
     if not result.accepted:
         status_code = status.HTTP_404_NOT_FOUND if result.errors == ["Robot not found"] else 400
         raise HTTPException(status_code=status_code, detail=result.errors)
+    outbox_relay.notify()
     return InstantActionRead(
         accepted=True,
         topic=result.topic,
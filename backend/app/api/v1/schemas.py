@@ -38,6 +38,16 @@ class RobotStateRead(BaseModel):
     raw_payload: dict[str, Any] = Field(serialization_alias="rawPayload")
 
 
+class VisualizationSampleRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    header_id: int | None = Field(serialization_alias="headerId")
+    timestamp: str | None
+    received_at: datetime = Field(serialization_alias="receivedAt")
+    agv_position: dict[str, Any] | None = Field(serialization_alias="agvPosition")
+    velocity: dict[str, Any] | None
+
+
 class InstantActionCreate(BaseModel):
     action_type: str = Field(alias="actionType", min_length=1)
     action_parameters: list[dict[str, Any]] | None = Field(
@@ -52,6 +62,22 @@ class InstantActionRead(BaseModel):
     errors: list[str]
 
 
+class InstantActionBroadcastCreate(InstantActionCreate):
+    robot_ids: list[str] | None = Field(default=None, alias="robotIds")
+    manufacturer: str | None = None
+    connection_state: str | None = Field(default=None, alias="connectionState")
+
+
+class InstantActionBroadcastItemRead(InstantActionRead):
+    robot_id: str = Field(serialization_alias="robotId")
+
+
+class InstantActionBroadcastRead(BaseModel):
+    accepted: bool
+    results: list[InstantActionBroadcastItemRead]
+    errors: list[str]
+
+
 class MapCreate(BaseModel):
     name: str = Field(min_length=1, max_length=160)
     description: str | None = None
@@ -159,3 +185,68 @@ class MqttMessagePage(BaseModel):
     page_size: int = Field(serialization_alias="pageSize")
     total: int
     pages: int
+
+
+class MqttIngestLaneRead(BaseModel):
+    lane: int
+    queue_depth: int = Field(serialization_alias="queueDepth")
+    batches: int
+    messages: int
+    failed_batches: int = Field(serialization_alias="failedBatches")
+    coalesced_messages: int = Field(serialization_alias="coalescedMessages")
+    duplicate_messages: int = Field(serialization_alias="duplicateMessages")
+    redelivered_messages: int = Field(serialization_alias="redeliveredMessages")
+    last_batch_size: int = Field(serialization_alias="lastBatchSize")
+    max_batch_size: int = Field(serialization_alias="maxBatchSize")
+    average_batch_size: float = Field(serialization_alias="averageBatchSize")
+    messages_per_second: float = Field(serialization_alias="messagesPerSecond")
+
+
+class MqttIngestTopicRead(BaseModel):
+    message_type: str = Field(serialization_alias="messageType")
+    priority: int
+    queued: int
+    shed: int
+    queue_depth: int = Field(serialization_alias="queueDepth")
+
+
+class MqttIngestStatsRead(BaseModel):
+    enabled: bool
+    batch_size_limit: int = Field(serialization_alias="batchSizeLimit")
+    batch_latency_ms: float = Field(serialization_alias="batchLatencyMs")
+    coalesce_threshold: int | None = Field(serialization_alias="coalesceThreshold")
+    shed_policy: str = Field(serialization_alias="shedPolicy")
+    redelivery_window: int = Field(serialization_alias="redeliveryWindow")
+    queue_depth: int = Field(serialization_alias="queueDepth")
+    batches: int
+    messages: int
+    failed_batches: int = Field(serialization_alias="failedBatches")
+    coalesced_messages: int = Field(serialization_alias="coalescedMessages")
+    duplicate_messages: int = Field(serialization_alias="duplicateMessages")
+    redelivered_messages: int = Field(serialization_alias="redeliveredMessages")
+    last_batch_size: int = Field(serialization_alias="lastBatchSize")
+    max_batch_size: int = Field(serialization_alias="maxBatchSize")
+    average_batch_size: float = Field(serialization_alias="averageBatchSize")
+    messages_per_second: float = Field(serialization_alias="messagesPerSecond")
+    topics: list[MqttIngestTopicRead]
+    lanes: list[MqttIngestLaneRead]
+
+
+class MqttSequenceStatsRead(BaseModel):
+    manufacturer: str
+    serial_number: str = Field(serialization_alias="serialNumber")
+    robot_id: str | None = Field(serialization_alias="robotId")
+    received: int
+    missing: int
+    late: int
+    duplicates: int
+    restarts: int
+    loss_rate: float = Field(serialization_alias="lossRate")
+    reorder_rate: float = Field(serialization_alias="reorderRate")
+
+
+class EventSubscriptionMessage(BaseModel):
+    type: Literal["subscribe"]
+    event_types: list[str] = Field(default_factory=list, alias="eventTypes")
+    robot_ids: list[str] = Field(default_factory=list, alias="robotIds")
+    mission_ids: list[str] = Field(default_factory=list, alias="missionIds")
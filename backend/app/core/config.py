@@ -1,8 +1,20 @@
 from functools import lru_cache
+from typing import Annotated, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+ShedPolicy = Literal["block", "drop_oldest", "drop_newest"]
+MqttPublisherBackend = Literal["asyncio", "paho"]
+EventBusBackendName = Literal["local", "mqtt"]
+ValidationMode = Literal["compiled", "jsonschema"]
+# `always`, `invalid_only`, `off`, or `every:N` (every Nth valid message per topic).
+MessageLogPolicy = Annotated[str, Field(pattern=r"^(always|invalid_only|off|every:[1-9][0-9]*)$")]
+# `full`, `every:N`, or `trusted:K:N` (every Nth message after K valid messages in a row).
+ValidationPolicy = Annotated[
+    str, Field(pattern=r"^(full|every:[1-9][0-9]*|trusted:[1-9][0-9]*:[1-9][0-9]*)$")
+]
+
 
 class Settings(BaseSettings):
     """Runtime settings for the TARS backend."""
@@ -22,9 +34,42 @@ class Settings(BaseSettings):
     mqtt_password: str | None = None
     mqtt_reconnect_min_seconds: float = 1.0
     mqtt_reconnect_max_seconds: float = 30.0
+    mqtt_publisher: MqttPublisherBackend = "asyncio"
+    mqtt_publish_timeout_seconds: float = Field(default=10.0, gt=0)
+    mqtt_publish_max_inflight: int = Field(default=20, ge=1)
+    mqtt_header_lease_size: int = Field(default=20, ge=1)
+    mqtt_outbox_batch_size: int = Field(default=100, ge=1)
+    mqtt_outbox_poll_interval_seconds: float = Field(default=1.0, gt=0)
+    mqtt_outbox_max_attempts: int = Field(default=5, ge=1)
+    mqtt_outbox_retry_delay_seconds: float = Field(default=1.0, ge=0)
+    mqtt_shared_subscription_group: str | None = Field(default=None, pattern=r"^[^/+#]+$")
+    mqtt_ingest_batch_size: int = Field(default=100, ge=1)
+    mqtt_ingest_batch_latency_ms: float = Field(default=50.0, ge=0)
+    mqtt_ingest_lanes: int = Field(default=1, ge=1)
+    mqtt_ingest_coalesce_threshold: int | None = Field(default=None, ge=1)
+    mqtt_ingest_queue_size: int | None = Field(default=None, ge=1)
+    mqtt_ingest_shed_policy: ShedPolicy = "block"
+    mqtt_ingest_redelivery_window: int = Field(default=16, ge=0)
+    mqtt_visualization_buffer_size: int = Field(default=100, ge=1)
+    mqtt_visualization_persist_every: int | None = Field(default=None, ge=1)
+    mqtt_message_log_default_policy: MessageLogPolicy = "always"
+    mqtt_message_log_policies: dict[str, MessageLogPolicy] = Field(default_factory=dict)
+    mqtt_message_log_retention_hours: float | None = Field(default=None, gt=0)
+    mqtt_message_log_retention_batch_size: int = Field(default=1000, ge=1)
+    mqtt_message_log_retention_interval_seconds: float = Field(default=300.0, gt=0)
+    mqtt_message_log_archive_dir: str | None = None
+    mqtt_validation_default_policy: ValidationPolicy = "full"
+    mqtt_validation_policies: dict[str, ValidationPolicy] = Field(default_factory=dict)
     mqtt_interface_name: str = "vda5050"
     vda5050_major_version: str = "v3"
     vda5050_protocol_version: str = "3.0.0"
+    vda5050_validation_mode: ValidationMode = "compiled"
+    # Worker processes validating payloads of at least `vda5050_validation_offload_bytes`; 0 off.
+    vda5050_validation_processes: int = Field(default=0, ge=0)
+    vda5050_validation_offload_bytes: int = Field(default=65536, ge=0)
+    event_bus_backend: EventBusBackendName = "local"
+    event_bus_mqtt_topic_prefix: str = Field(default="tars/events", pattern=r"^[^+#]*[^/+#]$")
+    event_bus_mqtt_buffer_size: int = Field(default=1000, ge=1)
     backend_cors_origins: str = Field(default="http://localhost:5173,http://localhost:8080")
 
 
@@ -0,0 +1,50 @@
+from prometheus_client import Counter, Histogram
+
+from app.vda5050.topics import VALID_TOPICS
+
+# Sub-millisecond stages such as topic parsing need the low buckets; commits can take seconds.
+_STAGE_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+_END_TO_END_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+mqtt_inbound_stage_seconds = Histogram(
+    "tars_mqtt_inbound_stage_seconds",
+    "Time spent in one stage of the inbound MQTT pipeline.",
+    ["stage", "message_type"],
+    buckets=_STAGE_BUCKETS,
+)
+mqtt_inbound_end_to_end_seconds = Histogram(
+    "tars_mqtt_inbound_end_to_end_seconds",
+    "Time from the payload timestamp set by the robot to the commit of the message.",
+    ["message_type"],
+    buckets=_END_TO_END_BUCKETS,
+)
+
+mqtt_inbound_validation_skipped_total = Counter(
+    "tars_mqtt_inbound_validation_skipped_total",
+    "Inbound messages accepted without schema validation by their validation policy.",
+    ["message_type"],
+)
+
+
+def message_type_label(topic: str) -> str:
+    """Last topic level if it is a VDA 5050 topic name, so label values stay bounded."""
+    name = topic.rpartition("/")[2]
+    return name if name in VALID_TOPICS else "unknown"
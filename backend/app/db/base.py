@@ -3,7 +3,17 @@ from datetime import datetime
 from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, String, UniqueConstraint, func
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -148,7 +158,64 @@ class MqttMessageLog(Base):
     payload: Mapped[dict[str, Any]] = mapped_column(json_type(), nullable=False)
     schema_valid: Mapped[bool] = mapped_column(default=False)
     validation_errors: Mapped[list[str]] = mapped_column(json_type(), default=list)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+
+class MqttOutboxMessage(Base):
+    """An outbound message committed with the records it belongs to, published by the relay."""
+
+    __tablename__ = "mqtt_outbox"
+    __table_args__ = (
+        Index(
+            "ix_mqtt_outbox_pending",
+            "robot_id",
+            "id",
+            postgresql_where=text("published_at IS NULL AND failed_at IS NULL"),
+        ),
+    )
+
+    # An increasing integer key keeps the relay in commit order; timestamps can tie.
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer(), "sqlite"), primary_key=True, autoincrement=True
+    )
+    robot_id: Mapped[str | None] = mapped_column(ForeignKey("robots.id"))
+    message_log_id: Mapped[str] = mapped_column(ForeignKey("mqtt_message_logs.id"), nullable=False)
+    mission_order_id: Mapped[str | None] = mapped_column(
+        ForeignKey("mission_orders.id", ondelete="CASCADE")
+    )
+    attempts: Mapped[int] = mapped_column(default=0)
+    last_error: Mapped[str | None] = mapped_column(String(500))
+    available_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    message_log: Mapped[MqttMessageLog] = relationship()
+    mission_order: Mapped[MissionOrder | None] = relationship()
+
+
+class MqttHeaderSequence(Base):
+    """Next outbound ``headerId`` per robot and message type, leased in ranges by replicas."""
+
+    __tablename__ = "mqtt_header_sequences"
+
+    robot_id: Mapped[str] = mapped_column(
+        ForeignKey("robots.id", ondelete="CASCADE"), primary_key=True
+    )
+    message_type: Mapped[str] = mapped_column(String(64), primary_key=True)
+    next_header_id: Mapped[int] = mapped_column(nullable=False)
+
+
+class MqttInboundReceipt(Base):
+    """Key of an inbound message that was applied, so a redelivery can be recognised."""
+
+    __tablename__ = "mqtt_inbound_receipts"
+
+    message_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
 
 
 engine = create_async_engine(get_settings().database_url, pool_pre_ping=True)
@@ -1,29 +1,63 @@
+import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.api.v1.router import api_router
 from app.core.config import get_settings
 from app.mqtt.asyncio_compat import configure_windows_selector_event_loop_policy
+from app.mqtt.event_bridge import MqttEventBridge
+from app.mqtt.message_log import MessageLogRetention
+from app.mqtt.outbound import create_mqtt_publisher
+from app.mqtt.outbox import OutboxRelay
 from app.mqtt.worker import MqttWorker
+from app.services.robot_registry import warm_robot_identity_cache
+from app.vda5050.validation_pool import get_validation_pool
+from app.vda5050.validator import compile_validators
 
 configure_windows_selector_event_loop_policy()
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    logger.info("Warmed up VDA 5050 validators in %.0f ms", compile_validators() * 1000)
+    validation_pool = get_validation_pool()
+    validation_pool.start()
+    # Bridge events to other processes before anything in this one starts publishing them.
+    event_bridge = MqttEventBridge.from_settings(settings)
+    if event_bridge is not None:
+        event_bridge.start()
     mqtt_worker = MqttWorker(settings) if settings.mqtt_enabled else None
     if mqtt_worker is not None:
+        await warm_robot_identity_cache()
         mqtt_worker.start()
+    message_log_retention = MessageLogRetention.from_settings(settings)
+    if message_log_retention is not None:
+        message_log_retention.start()
+    mqtt_publisher = create_mqtt_publisher(settings)
+    mqtt_publisher.start()
+    outbox_relay = OutboxRelay.from_settings(settings, mqtt_publisher)
+    outbox_relay.start()
     app.state.mqtt_worker = mqtt_worker
+    app.state.mqtt_publisher = mqtt_publisher
+    app.state.outbox_relay = outbox_relay
     try:
         yield
     finally:
+        await outbox_relay.stop()
+        await mqtt_publisher.stop()
+        if message_log_retention is not None:
+            await message_log_retention.stop()
         if mqtt_worker is not None:
             await mqtt_worker.stop()
+        await validation_pool.stop()
+        if event_bridge is not None:
+            await event_bridge.stop()
 
 
 app = FastAPI(
@@ -45,3 +79,8 @@ app.include_router(api_router)
 @app.get("/")
 def root() -> dict[str, str]:
     return {"service": settings.service_name, "docs": "/docs"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
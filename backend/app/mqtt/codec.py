@@ -0,0 +1,20 @@
+from typing import Any
+
+import orjson
+
+
+class PayloadDecodeError(ValueError):
+    pass
+
+
+def decode_payload(data: bytes | bytearray | memoryview | str) -> Any:
+    """Decode an MQTT JSON payload straight from the received bytes."""
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError as exc:
+        raise PayloadDecodeError(str(exc)) from exc
+
+
+def encode_payload(payload: Any) -> bytes:
+    """Encode a JSON payload to compact UTF-8 bytes ready to publish."""
+    return orjson.dumps(payload)
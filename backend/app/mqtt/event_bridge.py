@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from contextlib import suppress
+from uuid import uuid4
+
+import aiomqtt
+import orjson
+
+from app.core.config import Settings, get_settings
+from app.services.event_bus import DomainEvent, EventBus, get_event_bus
+
+logger = logging.getLogger(__name__)
+
+# Topic level or header field used for events without a robot or mission.
+NO_ID = "-"
+
+
+class MqttEventBridge:
+    """Carry domain events between backend processes over the MQTT broker.
+
+    As the ``EventBus`` backend, it queues every event published in this process and a task
+    publishes them, in publish order, with QoS 0 to ``<prefix>/<origin>/<robot id>``, where
+    ``origin`` identifies this process. The broker keeps the messages of one client on one topic
+    in order, so each robot's events reach other processes in the order they were published.
+    Events arriving on ``<prefix>/#`` from other origins are delivered to this process's
+    subscribers only. Subscribers in the publishing process never wait for the broker.
+
+    A message is a ``<type>\t<mission id>`` line followed by the event's JSON, so together with
+    the robot id in the topic a receiver can drop events no local subscriber wants without
+    decoding them.
+
+    Like subscriber queues, forwarding is best effort: when ``buffer_size`` events are waiting,
+    the oldest is dropped, and events queued while disconnected are sent after reconnecting.
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        event_bus: EventBus | None = None,
+        *,
+        buffer_size: int = 1000,
+    ) -> None:
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be positive")
+        self.settings = settings or get_settings()
+        self.event_bus = event_bus or get_event_bus()
+        self.topic_prefix = self.settings.event_bus_mqtt_topic_prefix
+        self.origin = uuid4().hex
+        self.dropped_events = 0
+        self._outgoing: asyncio.Queue[DomainEvent] = asyncio.Queue(maxsize=buffer_size)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "MqttEventBridge | None":
+        if settings.event_bus_backend != "mqtt":
+            return None
+        return cls(settings, buffer_size=settings.event_bus_mqtt_buffer_size)
+
+    def attach(self) -> None:
+        """Become the backend of ``event_bus`` and start queueing its events."""
+        self._loop = asyncio.get_running_loop()
+        self.event_bus.backend = self
+
+    def start(self) -> None:
+        self.attach()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="tars-event-bridge")
+
+    async def stop(self) -> None:
+        if self.event_bus.backend is self:
+            self.event_bus.backend = None
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def forward(self, event: DomainEvent) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            current_loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        if current_loop is loop:
+            self._enqueue(event)
+        elif loop.is_running():
+            loop.call_soon_threadsafe(self._enqueue, event)
+
+    def topic_for(self, event: DomainEvent) -> str:
+        return f"{self.topic_prefix}/{self.origin}/{event.robot_id or NO_ID}"
+
+    @staticmethod
+    def payload_for(event: DomainEvent) -> str:
+        return f"{event.type}\t{event.mission_id or NO_ID}\n{event.as_json()}"
+
+    def receive(self, topic: str, payload: bytes | str) -> DomainEvent | None:
+        """Deliver an event published by another process; return it, or ``None`` if skipped."""
+        origin, _, robot_id = topic.removeprefix(f"{self.topic_prefix}/").partition("/")
+        if origin == self.origin:
+            return None
+        data = payload.encode() if isinstance(payload, str) else payload
+        header, _, body = data.partition(b"\n")
+        event_type, _, mission_id = header.decode(errors="replace").partition("\t")
+        if not body or not mission_id:
+            logger.warning("Dropping malformed event on %s", topic)
+            return None
+        if not self.event_bus.wants(
+            event_type,
+            None if robot_id == NO_ID else robot_id,
+            None if mission_id == NO_ID else mission_id,
+        ):
+            return None
+        try:
+            encoded = body.decode()
+            event = DomainEvent.from_message(orjson.loads(encoded), encoded)
+        except (orjson.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError):
+            logger.warning("Dropping malformed event on %s", topic)
+            return None
+        self.event_bus.deliver(event)
+        return event
+
+    async def run(self) -> None:
+        delay = self.settings.mqtt_reconnect_min_seconds
+        while True:
+            try:
+                async with aiomqtt.Client(
+                    hostname=self.settings.mqtt_host,
+                    port=self.settings.mqtt_port,
+                    username=self.settings.mqtt_username or None,
+                    password=self.settings.mqtt_password or None,
+                ) as client:
+                    await client.subscribe(f"{self.topic_prefix}/#")
+                    delay = self.settings.mqtt_reconnect_min_seconds
+                    logger.info("Event bridge connected to %s", self.settings.mqtt_host)
+                    sender = asyncio.create_task(self.send(client))
+                    try:
+                        async for message in client.messages:
+                            if isinstance(message.payload, bytes | str):
+                                self.receive(str(message.topic), message.payload)
+                    finally:
+                        sender.cancel()
+                        with suppress(asyncio.CancelledError):
+                            await sender
+            except asyncio.CancelledError:
+                raise
+            except (aiomqtt.MqttError, OSError) as exc:
+                logger.warning("Event bridge disconnected; retrying in %.1fs: %s", delay, exc)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.settings.mqtt_reconnect_max_seconds)
+
+    async def send(self, client: aiomqtt.Client) -> None:
+        """Publish queued events one at a time, which keeps them in publish order."""
+        while True:
+            event = await self._outgoing.get()
+            try:
+                await client.publish(self.topic_for(event), payload=self.payload_for(event), qos=0)
+            except aiomqtt.MqttError as exc:
+                # The connection is gone; the receive loop notices and reconnects.
+                logger.warning("Dropping event %s: %s", event.type, exc)
+
+    def _enqueue(self, event: DomainEvent) -> None:
+        if self._outgoing.full():
+            self._outgoing.get_nowait()
+            self.dropped_events += 1
+        self._outgoing.put_nowait(event)
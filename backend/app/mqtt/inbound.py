@@ -1,13 +1,28 @@
-from dataclasses import dataclass
+import hashlib
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.base import MqttMessageLog
-from app.services.event_bus import EventBus, get_event_bus
-from app.services.robot_registry import RobotRegistryService
+from app.core.metrics import (
+    mqtt_inbound_end_to_end_seconds,
+    mqtt_inbound_stage_seconds,
+    mqtt_inbound_validation_skipped_total,
+)
+from app.db.base import MqttInboundReceipt, MqttMessageLog
+from app.mqtt.message_log import MessageLogSampler, get_message_log_sampler
+from app.mqtt.sequence import parse_timestamp
+from app.mqtt.validation_sampler import ValidationSampler, get_validation_sampler
+from app.services.event_bus import EventBus, PendingEvent, get_event_bus
+from app.services.robot_registry import CachedRobot, RobotIdentity, RobotRegistryService
 from app.vda5050.topics import TopicParseError, parse_topic
-from app.vda5050.validator import validate_message
+from app.vda5050.validation_pool import ValidationPool, get_validation_pool
+from app.vda5050.validator import ValidationResult
 
 
 @dataclass(frozen=True)
@@ -16,6 +31,10 @@ class InboundMqttMessage:
     payload: dict[str, Any]
     qos: int = 0
     retain: bool = False
+    # Arrived after a newer message on the same topic; see ``app.mqtt.sequence``.
+    stale: bool = False
+    # Length of the encoded payload as received, if known.
+    size: int | None = None
 
 
 @dataclass(frozen=True)
@@ -24,20 +43,167 @@ class MqttInboundResult:
     message_type: str
     robot_id: str | None
     errors: list[str]
+    duplicate: bool = False
+    stale: bool = False
+
+
+@dataclass
+class _InboundBatch:
+    robots: dict[RobotIdentity, CachedRobot] = field(default_factory=dict)
+    updates: dict[str, dict[str, Any]] = field(default_factory=dict)
+    events: list[PendingEvent] = field(default_factory=list)
+
+
+def inbound_message_key(message: InboundMqttMessage) -> str | None:
+    """Identify a message across redeliveries by topic, ``headerId`` and ``timestamp``.
+
+    ``headerId`` alone restarts when a robot reboots; together with the robot's own timestamp
+    the key only repeats when the broker delivers the same message again. Payloads that are not
+    JSON objects have no key; schema validation rejects them.
+    """
+    if not isinstance(message.payload, dict):
+        return None
+    header_id = message.payload.get("headerId")
+    if header_id is None:
+        return None
+    raw_key = f"{message.topic}\x00{header_id}\x00{message.payload.get('timestamp')}"
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+
+async def prune_inbound_receipts(session: AsyncSession, older_than: timedelta) -> int:
+    result = await session.execute(
+        delete(MqttInboundReceipt).where(
+            MqttInboundReceipt.received_at < datetime.now(UTC) - older_than
+        )
+    )
+    await session.commit()
+    return int(result.rowcount or 0)  # type: ignore[attr-defined]
 
 
 class MqttInboundService:
-    def __init__(self, session: AsyncSession, event_bus: EventBus | None = None) -> None:
+    """Apply inbound VDA 5050 messages.
+
+    With ``deduplicate`` set, every applied message leaves a receipt keyed by
+    ``inbound_message_key`` in the same transaction, and messages whose receipt already exists
+    are skipped. This keeps ingestion idempotent when a shared subscription redelivers a message
+    to another backend replica.
+
+    Whether a message gets an ``mqtt_message_logs`` row is decided by ``log_sampler``; the
+    ``mqtt.message.received`` event is published either way. ``validation_sampler`` may let
+    messages from robots with a clean record through without schema validation; they are
+    handled as valid.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        event_bus: EventBus | None = None,
+        *,
+        deduplicate: bool = False,
+        log_sampler: MessageLogSampler | None = None,
+        validation_pool: ValidationPool | None = None,
+        validation_sampler: ValidationSampler | None = None,
+    ) -> None:
         self.session = session
         self.event_bus = event_bus or get_event_bus()
         self.robot_registry = RobotRegistryService(session, self.event_bus)
+        self.deduplicate = deduplicate
+        self.log_sampler = log_sampler or get_message_log_sampler()
+        self.validation_pool = validation_pool or get_validation_pool()
+        self.validation_sampler = validation_sampler or get_validation_sampler()
 
     async def handle_message(self, message: InboundMqttMessage) -> MqttInboundResult:
+        return (await self.handle_batch([message]))[0]
+
+    async def handle_batch(self, messages: Sequence[InboundMqttMessage]) -> list[MqttInboundResult]:
+        results, events = await self.persist_batch(messages)
+        self.event_bus.publish_pending(events)
+        return results
+
+    async def persist_batch(
+        self, messages: Sequence[InboundMqttMessage]
+    ) -> tuple[list[MqttInboundResult], list[PendingEvent]]:
+        """Apply a batch of inbound messages in one transaction.
+
+        Domain events are staged while the batch is applied and returned in message order for
+        the caller to publish after the commit, so subscribers never observe rolled-back rows.
+        A stale ``state`` is logged but stores no snapshot, so it never becomes the latest state.
+        Robots already in the identity cache are addressed by id, so a steady-state message
+        costs no lookup query; their columns are written once per robot per batch.
+        """
+        batch = _InboundBatch()
+        try:
+            if self.deduplicate:
+                results = await self._stage_new_messages(messages, batch)
+            else:
+                results = [await self._stage_message(message, batch) for message in messages]
+            await self.robot_registry.update_robots(batch.updates)
+            with mqtt_inbound_stage_seconds.labels("commit", "batch").time():
+                await self.session.commit()
+        except Exception:
+            # A cached id may point at a robot removed behind our back; look it up again next time.
+            for robot in batch.robots.values():
+                self.robot_registry.identity_cache.invalidate(
+                    robot.manufacturer, robot.serial_number
+                )
+            raise
+        for robot in batch.robots.values():
+            self.robot_registry.identity_cache.put(robot)
+        self._observe_end_to_end(messages, results)
+        return results, batch.events
+
+    def _observe_end_to_end(
+        self, messages: Sequence[InboundMqttMessage], results: list[MqttInboundResult]
+    ) -> None:
+        committed_at = datetime.now(UTC)
+        for message, result in zip(messages, results, strict=True):
+            if not result.accepted:
+                continue
+            sent_at = parse_timestamp(message.payload.get("timestamp"))
+            if sent_at is not None:
+                # Robot clocks may run ahead of ours; clamp instead of recording negative latency.
+                latency = max((committed_at - sent_at).total_seconds(), 0.0)
+                mqtt_inbound_end_to_end_seconds.labels(result.message_type).observe(latency)
+
+    async def _stage_new_messages(
+        self, messages: Sequence[InboundMqttMessage], batch: _InboundBatch
+    ) -> list[MqttInboundResult]:
+        keys = [inbound_message_key(message) for message in messages]
+        applied = set(
+            (
+                await self.session.scalars(
+                    select(MqttInboundReceipt.message_key).where(
+                        MqttInboundReceipt.message_key.in_({key for key in keys if key})
+                    )
+                )
+            ).all()
+        )
+        results = []
+        for message, key in zip(messages, keys, strict=True):
+            if key is not None and key in applied:
+                message_type = message.topic.rpartition("/")[2]
+                results.append(MqttInboundResult(False, message_type, None, [], duplicate=True))
+                continue
+            if key is not None:
+                applied.add(key)
+                self.session.add(MqttInboundReceipt(message_key=key))
+            results.append(await self._stage_message(message, batch))
+        return results
+
+    async def _stage_message(
+        self, message: InboundMqttMessage, batch: _InboundBatch
+    ) -> MqttInboundResult:
+        events = batch.events
+        started = time.perf_counter()
         try:
             parsed_topic = parse_topic(message.topic)
         except TopicParseError as exc:
+            mqtt_inbound_stage_seconds.labels("parse_topic", "unknown").observe(
+                time.perf_counter() - started
+            )
             errors = [str(exc)]
-            await self._log_message(
+            self._log_message(
+                events,
                 message=message,
                 message_type="unknown",
                 robot_id=None,
@@ -46,80 +212,133 @@ class MqttInboundService:
             )
             return MqttInboundResult(False, "unknown", None, errors)
 
-        validation = validate_message(parsed_topic.topic, message.payload)
+        message_type = parsed_topic.topic
+        mqtt_inbound_stage_seconds.labels("parse_topic", message_type).observe(
+            time.perf_counter() - started
+        )
+        if isinstance(message.payload, dict) and not self.validation_sampler.should_validate(
+            message.topic, message_type
+        ):
+            mqtt_inbound_validation_skipped_total.labels(message_type).inc()
+            validation = ValidationResult(True, [])
+        else:
+            with mqtt_inbound_stage_seconds.labels("validate", message_type).time():
+                validation = await self.validation_pool.validate(
+                    message_type, message.payload, size=message.size
+                )
+            self.validation_sampler.record(message.topic, valid=validation.valid)
         if not validation.valid:
-            await self._log_message(
+            self._log_message(
+                events,
                 message=message,
-                message_type=parsed_topic.topic,
+                message_type=message_type,
                 robot_id=None,
                 schema_valid=False,
                 validation_errors=validation.errors,
             )
-            return MqttInboundResult(False, parsed_topic.topic, None, validation.errors)
+            return MqttInboundResult(False, message_type, None, validation.errors)
 
-        robot = await self.robot_registry.get_or_create(
-            parsed_topic.manufacturer, parsed_topic.serial_number
-        )
-        if parsed_topic.topic == "connection":
-            robot = await self.robot_registry.update_connection_state(
-                robot.id, message.payload["connectionState"]
+        with mqtt_inbound_stage_seconds.labels("robot_lookup", message_type).time():
+            robot = await self._robot_for(
+                parsed_topic.manufacturer, parsed_topic.serial_number, batch
             )
-        elif parsed_topic.topic == "factsheet":
-            robot = await self.robot_registry.update_factsheet(robot.id, message.payload)
-        elif parsed_topic.topic == "state":
-            await self.robot_registry.save_state_snapshot(robot.id, message.payload)
+        updates = batch.updates.setdefault(robot.id, {})
+        if message_type == "connection":
+            state = message.payload["connectionState"]
+            values, event = self.robot_registry.connection_update(robot.id, state)
+            updates.update(values)
+            batch.robots[robot.manufacturer, robot.serial_number] = replace(
+                robot, last_connection_state=state
+            )
+            events.append(event)
+        elif message_type == "factsheet":
+            values, event = self.robot_registry.factsheet_update(robot.id, message.payload)
+            updates.update(values)
+            events.append(event)
+        elif message_type == "state" and not message.stale:
+            _, event = self.robot_registry.stage_state_snapshot(robot.id, message.payload)
+            events.append(event)
 
-        await self._log_message(
+        self._log_message(
+            events,
             message=message,
-            message_type=parsed_topic.topic,
+            message_type=message_type,
             robot_id=robot.id,
             schema_valid=True,
             validation_errors=[],
         )
-        return MqttInboundResult(True, parsed_topic.topic, robot.id, [])
+        return MqttInboundResult(True, message_type, robot.id, [], stale=message.stale)
 
-    async def _log_message(
+    async def _robot_for(
+        self, manufacturer: str, serial_number: str, batch: _InboundBatch
+    ) -> CachedRobot:
+        key = (manufacturer, serial_number)
+        robot = batch.robots.get(key) or self.robot_registry.identity_cache.get(*key)
+        if robot is None:
+            with self.session.no_autoflush:
+                row = await self.robot_registry.find(manufacturer, serial_number)
+            if row is None:
+                row, event = self.robot_registry.stage_robot(manufacturer, serial_number)
+                batch.events.append(event)
+                # Insert the robot before rows that reference it; tables are only related by FK.
+                await self.session.flush()
+            robot = CachedRobot.from_robot(row)
+        batch.robots[key] = robot
+        return robot
+
+    def _log_message(
         self,
+        events: list[PendingEvent],
         *,
         message: InboundMqttMessage,
         message_type: str,
         robot_id: str | None,
         schema_valid: bool,
         validation_errors: list[str],
-    ) -> MqttMessageLog:
-        log = MqttMessageLog(
-            direction="inbound",
-            topic=message.topic,
-            qos=message.qos,
-            retain=message.retain,
-            robot_id=robot_id,
-            message_type=message_type,
-            payload=message.payload,
-            schema_valid=schema_valid,
-            validation_errors=validation_errors,
-        )
-        self.session.add(log)
-        await self.session.commit()
-        await self.session.refresh(log)
-        self.event_bus.publish(
-            "mqtt.message.received",
-            robot_id=robot_id,
-            payload={
-                "messageId": log.id,
-                "topic": log.topic,
-                "messageType": log.message_type,
-                "schemaValid": log.schema_valid,
-            },
-        )
-        if not schema_valid:
-            self.event_bus.publish(
-                "vda.validation.failed",
+    ) -> MqttMessageLog | None:
+        started = time.perf_counter()
+        log = None
+        if self.log_sampler.should_log(message.topic, message_type, schema_valid=schema_valid):
+            log = MqttMessageLog(
+                id=str(uuid4()),
+                direction="inbound",
+                topic=message.topic,
+                qos=message.qos,
+                retain=message.retain,
+                robot_id=robot_id,
+                message_type=message_type,
+                payload=message.payload,
+                schema_valid=schema_valid,
+                validation_errors=validation_errors,
+            )
+            self.session.add(log)
+        message_id = log.id if log is not None else None
+        events.append(
+            PendingEvent(
+                "mqtt.message.received",
                 robot_id=robot_id,
                 payload={
-                    "messageId": log.id,
-                    "topic": log.topic,
-                    "messageType": log.message_type,
-                    "errors": validation_errors,
+                    "messageId": message_id,
+                    "topic": message.topic,
+                    "messageType": message_type,
+                    "schemaValid": schema_valid,
                 },
             )
+        )
+        if not schema_valid:
+            events.append(
+                PendingEvent(
+                    "vda.validation.failed",
+                    robot_id=robot_id,
+                    payload={
+                        "messageId": message_id,
+                        "topic": message.topic,
+                        "messageType": message_type,
+                        "errors": validation_errors,
+                    },
+                )
+            )
+        mqtt_inbound_stage_seconds.labels("log", message_type).observe(
+            time.perf_counter() - started
+        )
         return log
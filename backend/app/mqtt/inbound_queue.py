@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from app.core.config import ShedPolicy
+from app.mqtt.inbound import InboundMqttMessage
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first. Unknown message types are queued with `state`.
+PRIORITY_CLASSES = ("connection", "factsheet", "state", "visualization")
+_DEFAULT_PRIORITY = PRIORITY_CLASSES.index("state")
+_PRIORITY_BY_MESSAGE_TYPE = {name: index for index, name in enumerate(PRIORITY_CLASSES)}
+
+
+def message_type(topic: str) -> str:
+    return topic.rpartition("/")[2]
+
+
+def message_priority(topic: str) -> int:
+    return _PRIORITY_BY_MESSAGE_TYPE.get(message_type(topic), _DEFAULT_PRIORITY)
+
+
+@dataclass
+class TopicQueueStats:
+    queued: int = 0
+    shed: int = 0
+    depth: int = 0
+
+
+class _PriorityClasses:
+    """FIFO per priority class; the storage behind ``PriorityInboundQueue``."""
+
+    def __init__(self) -> None:
+        self.classes = tuple(deque[InboundMqttMessage]() for _ in PRIORITY_CLASSES)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[InboundMqttMessage]:
+        for messages in self.classes:
+            yield from messages
+
+
+class PriorityInboundQueue(asyncio.Queue[InboundMqttMessage]):
+    """Bounded inbound queue that hands out higher-priority message types first.
+
+    Messages are FIFO within a priority class (connection > factsheet > state > visualization).
+    When the queue is full, ``shed_policy`` decides what happens to a new message:
+
+    - ``block`` waits for space, applying backpressure to the MQTT consumer;
+    - ``drop_oldest`` discards the oldest queued message of the lowest queued class, unless that
+      class outranks the new message, in which case the new message is discarded;
+    - ``drop_newest`` discards the new message if it belongs to the lowest class present, and
+      otherwise the newest queued message of that class.
+
+    ``connection`` messages are never shed; if the queue holds nothing else, ``put`` waits.
+    """
+
+    def __init__(self, maxsize: int, *, shed_policy: ShedPolicy = "block") -> None:
+        super().__init__(maxsize)
+        self.shed_policy = shed_policy
+        self.topic_stats: dict[str, TopicQueueStats] = {}
+        self._depth: Counter[str] = Counter()
+
+    def _init(self, maxsize: int) -> None:
+        self._queue = _PriorityClasses()
+
+    def _put(self, item: InboundMqttMessage) -> None:
+        self._queue.classes[message_priority(item.topic)].append(item)
+        self._queue.size += 1
+        self._record(item, queued=True)
+
+    def _get(self) -> InboundMqttMessage:
+        for messages in self._queue.classes:
+            if messages:
+                self._queue.size -= 1
+                item = messages.popleft()
+                self._depth[message_type(item.topic)] -= 1
+                return item
+        raise asyncio.QueueEmpty
+
+    async def put(self, item: InboundMqttMessage) -> None:
+        if self.full() and self.shed_policy != "block" and self._shed_for(item) is item:
+            return
+        await super().put(item)
+
+    def stats_by_message_type(self) -> dict[str, TopicQueueStats]:
+        for name, stats in self.topic_stats.items():
+            stats.depth = self._depth[name]
+        return self.topic_stats
+
+    def _shed_for(self, item: InboundMqttMessage) -> InboundMqttMessage | None:
+        """Free one slot for ``item`` and return the shed message, or ``None`` if none was."""
+        incoming = message_priority(item.topic)
+        lowest = max(
+            (priority for priority, messages in enumerate(self._queue.classes) if messages),
+            default=None,
+        )
+        if lowest is None or (lowest == 0 and incoming == 0):
+            return None
+        if lowest < incoming or (lowest == incoming and self.shed_policy == "drop_newest"):
+            shed = item
+        else:
+            victims = self._queue.classes[lowest]
+            shed = victims.popleft() if self.shed_policy == "drop_oldest" else victims.pop()
+            self._queue.size -= 1
+            self._depth[message_type(shed.topic)] -= 1
+        self._record(shed, queued=False)
+        logger.debug("Shed inbound MQTT message on %s", shed.topic)
+        return shed
+
+    def _record(self, item: InboundMqttMessage, *, queued: bool) -> None:
+        name = message_type(item.topic)
+        stats = self.topic_stats.get(name)
+        if stats is None:
+            stats = self.topic_stats[name] = TopicQueueStats()
+        if queued:
+            stats.queued += 1
+            self._depth[name] += 1
+        else:
+            stats.shed += 1
@@ -0,0 +1,439 @@
+import asyncio
+import logging
+import time
+import zlib
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, replace
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import ShedPolicy
+from app.db.base import AsyncSessionMaker
+from app.mqtt.inbound import (
+    InboundMqttMessage,
+    MqttInboundResult,
+    MqttInboundService,
+    prune_inbound_receipts,
+)
+from app.mqtt.inbound_queue import PriorityInboundQueue, TopicQueueStats, message_type
+from app.mqtt.redelivery import RedeliveryWindow
+from app.mqtt.sequence import SequenceStats, SequenceTracker, is_stale
+from app.services.event_bus import EventBus, PendingEvent, get_event_bus
+from app.services.robot_registry import RobotIdentity
+
+logger = logging.getLogger(__name__)
+
+# Only the newest of these matters for the fleet view; connection, factsheet and order-related
+# messages change robot state incrementally and are never coalesced.
+COALESCIBLE_MESSAGE_TYPES = frozenset({"state"})
+
+# Redeliveries arrive within seconds of the original; receipts are kept well beyond that.
+RECEIPT_RETENTION = timedelta(hours=1)
+RECEIPT_PRUNE_INTERVAL = 60.0
+
+
+def coalesce_states(
+    batch: list[InboundMqttMessage],
+) -> tuple[list[InboundMqttMessage], int]:
+    """Keep only the newest coalescible message per topic, each at its own position.
+
+    Stale messages arrived after a newer one, so they never count as the newest.
+    """
+    latest = {
+        message.topic: index
+        for index, message in enumerate(batch)
+        if message_type(message.topic) in COALESCIBLE_MESSAGE_TYPES and not message.stale
+    }
+    kept = [
+        message for index, message in enumerate(batch) if latest.get(message.topic, index) == index
+    ]
+    return kept, len(batch) - len(kept)
+
+
+@dataclass
+class IngestStats:
+    batches: int = 0
+    messages: int = 0
+    failed_batches: int = 0
+    coalesced_messages: int = 0
+    duplicate_messages: int = 0
+    redelivered_messages: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    last_flushed_at: float = 0.0
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.messages / self.batches if self.batches else 0.0
+
+    def record_batch(self, size: int) -> None:
+        self.batches += 1
+        self.messages += size
+        self.last_batch_size = size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.last_flushed_at = time.monotonic()
+
+
+class InboundBatcher:
+    """Buffer decoded inbound messages and persist them one transaction per batch.
+
+    A batch is flushed once it holds ``max_batch_size`` messages or ``max_latency`` seconds
+    after its first message arrived, whichever comes first. The buffer is a
+    ``PriorityInboundQueue`` bounded by ``max_queue_size`` (four batches by default): when the
+    database falls behind, ``put`` either applies backpressure to the MQTT consumer or sheds
+    low-priority messages, depending on ``shed_policy``.
+
+    With ``coalesce_threshold`` set, a batch collected while at least that many messages are
+    queued keeps only the newest ``state`` per robot, so a backlog replayed after a broker outage
+    is worked off at the rate robots are seen rather than the rate messages were sent.
+
+    With ``deduplicate`` set, messages are applied idempotently (see ``MqttInboundService``) and
+    receipts older than ``RECEIPT_RETENTION`` are pruned about once a minute.
+
+    With ``redelivery_window`` set, ``put`` drops a message whose topic saw the same ``headerId``
+    and ``timestamp`` among its last ``redelivery_window`` messages, before it is queued, validated
+    or written.
+
+    ``put`` also tracks ``headerId`` order per topic in ``sequences`` and marks messages that
+    arrive after a newer one as stale, so a late ``state`` cannot become the latest state.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_batch_size: int,
+        max_latency: float,
+        session_maker: async_sessionmaker[AsyncSession] = AsyncSessionMaker,
+        event_bus: EventBus | None = None,
+        max_queue_size: int | None = None,
+        rate_window: float = 60.0,
+        coalesce_threshold: int | None = None,
+        shed_policy: ShedPolicy = "block",
+        deduplicate: bool = False,
+        redelivery_window: int | None = None,
+        name: str = "tars-mqtt-ingest",
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+        if max_latency < 0:
+            raise ValueError("max_latency must not be negative")
+        if coalesce_threshold is not None and coalesce_threshold < 1:
+            raise ValueError("coalesce_threshold must be positive")
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.session_maker = session_maker
+        self.event_bus = event_bus
+        self.rate_window = rate_window
+        self.coalesce_threshold = coalesce_threshold
+        self.deduplicate = deduplicate
+        self.redeliveries = RedeliveryWindow(redelivery_window) if redelivery_window else None
+        self.sequences = SequenceTracker()
+        self.name = name
+        self.stats = IngestStats()
+        self._recent_flushes: deque[tuple[float, int]] = deque()
+        self._started_at: float | None = None
+        self._queue = PriorityInboundQueue(
+            max_queue_size or max_batch_size * 4, shed_policy=shed_policy
+        )
+        self._batch: list[InboundMqttMessage] = []
+        self._task: asyncio.Task[None] | None = None
+        self._flushing = False
+        self._closing = False
+        self._receipts_pruned_at = time.monotonic()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() + len(self._batch)
+
+    @property
+    def topic_stats(self) -> dict[str, TopicQueueStats]:
+        """Queued, shed and currently buffered messages per message type."""
+        return self._queue.stats_by_message_type()
+
+    @property
+    def messages_per_second(self) -> float:
+        """Persisted throughput over the last ``rate_window`` seconds."""
+        now = time.monotonic()
+        self._trim_recent_flushes(now)
+        if self._started_at is None or not self._recent_flushes:
+            return 0.0
+        elapsed = min(self.rate_window, now - self._started_at)
+        messages = sum(size for _, size in self._recent_flushes)
+        return messages / elapsed if elapsed > 0 else 0.0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._started_at = time.monotonic()
+            self._task = asyncio.create_task(self.run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Stop the flush loop and persist whatever is still buffered.
+
+        A flush already in progress is awaited rather than cancelled, so its transaction either
+        commits with its events published or is retried below; nothing buffered is dropped.
+        """
+        if self._task is not None:
+            self._closing = True
+            if not self._flushing:
+                self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        remaining = self._batch
+        self._batch = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for start in range(0, len(remaining), self.max_batch_size):
+            await self.flush(remaining[start : start + self.max_batch_size])
+
+    async def put(self, message: InboundMqttMessage) -> None:
+        if self.redeliveries is not None and self.redeliveries.is_redelivery(message):
+            self.stats.redelivered_messages += 1
+            logger.debug("Dropped redelivered MQTT message on %s", message.topic)
+            return
+        if is_stale(self.sequences.observe(message.topic, message.payload)):
+            message = replace(message, stale=True)
+        await self._queue.put(message)
+
+    async def run(self) -> None:
+        while not self._closing:
+            await self._collect_batch()
+            batch = self._batch
+            self._batch = []
+            self._flushing = True
+            try:
+                await self.flush(batch)
+                if self.deduplicate:
+                    await self._prune_receipts()
+            finally:
+                self._flushing = False
+
+    async def _collect_batch(self) -> None:
+        self._batch.append(await self._queue.get())
+        if self._is_backlogged():
+            self._collect_coalesced_backlog()
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_latency
+        while len(self._batch) < self.max_batch_size:
+            if not self._queue.empty():
+                self._batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                return
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except TimeoutError:
+                return
+
+    def _is_backlogged(self) -> bool:
+        return (
+            self.coalesce_threshold is not None
+            and self._queue.qsize() + 1 >= self.coalesce_threshold
+        )
+
+    def _collect_coalesced_backlog(self) -> None:
+        """Drain queued messages until the batch holds ``max_batch_size`` survivors."""
+        seen_topics: set[str] = set()
+        kept = 0
+        drain_limit = self._queue.maxsize + self.max_batch_size
+        for message in self._batch:
+            kept += self._counts_after_coalescing(message, seen_topics)
+        while kept < self.max_batch_size and len(self._batch) < drain_limit:
+            if self._queue.empty():
+                break
+            message = self._queue.get_nowait()
+            self._batch.append(message)
+            kept += self._counts_after_coalescing(message, seen_topics)
+        self._batch, dropped = coalesce_states(self._batch)
+        if dropped:
+            self.stats.coalesced_messages += dropped
+            logger.info(
+                "Coalesced %d superseded state messages from a backlog of %d",
+                dropped,
+                self._queue.qsize() + len(self._batch) + dropped,
+            )
+
+    @staticmethod
+    def _counts_after_coalescing(message: InboundMqttMessage, seen_topics: set[str]) -> int:
+        if message_type(message.topic) not in COALESCIBLE_MESSAGE_TYPES:
+            return 1
+        if message.topic in seen_topics:
+            return 0
+        seen_topics.add(message.topic)
+        return 1
+
+    async def flush(self, batch: list[InboundMqttMessage]) -> None:
+        if not batch:
+            return
+        try:
+            async with self.session_maker() as session:
+                results, events = await self._service(session).persist_batch(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats.failed_batches += 1
+            logger.exception(
+                "Failed to persist inbound batch of %d messages; retrying individually",
+                len(batch),
+            )
+            results, events = await self._persist_individually(batch)
+        self.stats.duplicate_messages += sum(result.duplicate for result in results)
+        self.stats.record_batch(len(batch))
+        self._recent_flushes.append((self.stats.last_flushed_at, len(batch)))
+        self._trim_recent_flushes(self.stats.last_flushed_at)
+        logger.debug("Persisted inbound MQTT batch of %d messages", len(batch))
+        try:
+            self._event_bus().publish_pending(events)
+        except Exception:
+            # The rows are committed; retrying would duplicate them, so only report the loss.
+            logger.exception(
+                "Failed to publish events for inbound batch of %d messages", len(batch)
+            )
+
+    async def _persist_individually(
+        self, batch: list[InboundMqttMessage]
+    ) -> tuple[list[MqttInboundResult], list[PendingEvent]]:
+        results: list[MqttInboundResult] = []
+        events: list[PendingEvent] = []
+        for message in batch:
+            try:
+                async with self.session_maker() as session:
+                    message_results, message_events = await self._service(session).persist_batch(
+                        [message]
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to process MQTT message on %s", message.topic)
+                continue
+            results.extend(message_results)
+            events.extend(message_events)
+        return results, events
+
+    async def _prune_receipts(self) -> None:
+        now = time.monotonic()
+        if now - self._receipts_pruned_at < RECEIPT_PRUNE_INTERVAL:
+            return
+        self._receipts_pruned_at = now
+        try:
+            async with self.session_maker() as session:
+                pruned = await prune_inbound_receipts(session, RECEIPT_RETENTION)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Failed to prune inbound MQTT receipts")
+            return
+        logger.debug("Pruned %d inbound MQTT receipts", pruned)
+
+    def _service(self, session: AsyncSession) -> MqttInboundService:
+        return MqttInboundService(session, self.event_bus, deduplicate=self.deduplicate)
+
+    def _trim_recent_flushes(self, now: float) -> None:
+        while self._recent_flushes and self._recent_flushes[0][0] < now - self.rate_window:
+            self._recent_flushes.popleft()
+
+    def _event_bus(self) -> EventBus:
+        return self.event_bus or get_event_bus()
+
+
+class ShardedInboundDispatcher:
+    """Spread inbound messages over independent batching lanes, one robot per lane.
+
+    Messages are routed by a stable hash of the robot prefix of their topic
+    (``interface/version/manufacturer/serialNumber``), so every message of a robot is handled by
+    the same lane in arrival order while different robots are persisted concurrently.
+    """
+
+    def __init__(
+        self,
+        *,
+        lanes: int,
+        max_batch_size: int,
+        max_latency: float,
+        session_maker: async_sessionmaker[AsyncSession] = AsyncSessionMaker,
+        event_bus: EventBus | None = None,
+        max_queue_size: int | None = None,
+        coalesce_threshold: int | None = None,
+        shed_policy: ShedPolicy = "block",
+        deduplicate: bool = False,
+        redelivery_window: int | None = None,
+    ) -> None:
+        if lanes < 1:
+            raise ValueError("lanes must be positive")
+        self.lanes = [
+            InboundBatcher(
+                max_batch_size=max_batch_size,
+                max_latency=max_latency,
+                session_maker=session_maker,
+                event_bus=event_bus,
+                max_queue_size=max_queue_size,
+                coalesce_threshold=coalesce_threshold,
+                shed_policy=shed_policy,
+                deduplicate=deduplicate,
+                redelivery_window=redelivery_window,
+                name=f"tars-mqtt-ingest-{index}",
+            )
+            for index in range(lanes)
+        ]
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(lane.queue_depth for lane in self.lanes)
+
+    @property
+    def messages_per_second(self) -> float:
+        return sum(lane.messages_per_second for lane in self.lanes)
+
+    @property
+    def stats(self) -> IngestStats:
+        total = IngestStats()
+        for lane in self.lanes:
+            total.batches += lane.stats.batches
+            total.messages += lane.stats.messages
+            total.failed_batches += lane.stats.failed_batches
+            total.coalesced_messages += lane.stats.coalesced_messages
+            total.duplicate_messages += lane.stats.duplicate_messages
+            total.redelivered_messages += lane.stats.redelivered_messages
+            total.max_batch_size = max(total.max_batch_size, lane.stats.max_batch_size)
+            if lane.stats.last_flushed_at > total.last_flushed_at:
+                total.last_flushed_at = lane.stats.last_flushed_at
+                total.last_batch_size = lane.stats.last_batch_size
+        return total
+
+    @property
+    def topic_stats(self) -> dict[str, TopicQueueStats]:
+        total: dict[str, TopicQueueStats] = {}
+        for lane in self.lanes:
+            for name, stats in lane.topic_stats.items():
+                aggregate = total.setdefault(name, TopicQueueStats())
+                aggregate.queued += stats.queued
+                aggregate.shed += stats.shed
+                aggregate.depth += stats.depth
+        return total
+
+    @property
+    def sequence_stats(self) -> dict[RobotIdentity, SequenceStats]:
+        total: dict[RobotIdentity, SequenceStats] = {}
+        for lane in self.lanes:
+            for robot, stats in lane.sequences.stats_by_robot().items():
+                total.setdefault(robot, SequenceStats()).add(stats)
+        return total
+
+    def lane_for(self, topic: str) -> int:
+        robot_prefix = topic.rsplit("/", 1)[0]
+        return zlib.crc32(robot_prefix.encode("utf-8")) % len(self.lanes)
+
+    def start(self) -> None:
+        for lane in self.lanes:
+            lane.start()
+
+    async def stop(self) -> None:
+        await asyncio.gather(*(lane.stop() for lane in self.lanes))
+
+    async def put(self, message: InboundMqttMessage) -> None:
+        await self.lanes[self.lane_for(message.topic)].put(message)
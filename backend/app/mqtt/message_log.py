@@ -0,0 +1,217 @@
+import asyncio
+import gzip
+import logging
+from collections.abc import Mapping
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import orjson
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import Settings, get_settings
+from app.db.base import AsyncSessionMaker, MqttMessageLog
+
+logger = logging.getLogger(__name__)
+
+
+def parse_log_policy(policy: str) -> int | None:
+    """Sampling interval of an ``every:N`` policy, ``None`` for the other policies."""
+    name, _, every = policy.partition(":")
+    if name == "every":
+        return int(every)
+    if name in {"always", "invalid_only", "off"}:
+        return None
+    raise ValueError(f"Unknown MQTT message log policy: {policy}")
+
+
+class MessageLogSampler:
+    """Decide per message type which inbound messages get an ``mqtt_message_logs`` row.
+
+    - ``always`` logs every message;
+    - ``invalid_only`` logs messages that failed topic or schema validation;
+    - ``every:N`` logs invalid messages and the first and then every Nth valid message per topic;
+    - ``off`` logs nothing.
+
+    Message types without their own policy use ``default``.
+    """
+
+    def __init__(self, policies: Mapping[str, str] | None = None, default: str = "always") -> None:
+        self.default = default
+        self.policies = dict(policies or {})
+        self._every = {
+            message_type: parse_log_policy(policy)
+            for message_type, policy in {**self.policies, "": default}.items()
+        }
+        self._valid_seen: dict[str, int] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "MessageLogSampler":
+        return cls(settings.mqtt_message_log_policies, settings.mqtt_message_log_default_policy)
+
+    def policy_for(self, message_type: str) -> str:
+        return self.policies.get(message_type, self.default)
+
+    def should_log(self, topic: str, message_type: str, *, schema_valid: bool) -> bool:
+        policy = self.policy_for(message_type)
+        if policy == "off":
+            return False
+        if not schema_valid or policy == "always":
+            return True
+        every = self._every.get(message_type, self._every[""])
+        if every is None:
+            return False
+        seen = self._valid_seen.get(topic, 0)
+        self._valid_seen[topic] = seen + 1
+        return seen % every == 0
+
+
+message_log_sampler = MessageLogSampler.from_settings(get_settings())
+
+
+def get_message_log_sampler() -> MessageLogSampler:
+    return message_log_sampler
+
+
+def _archive_rows(path: Path, rows: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Each call appends one gzip member; readers such as `zcat` see a single JSON Lines stream.
+    with gzip.open(path, "ab") as archive:
+        for row in rows:
+            archive.write(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE))
+
+
+def _archive_row(log: MqttMessageLog) -> dict[str, Any]:
+    return {
+        "id": log.id,
+        "direction": log.direction,
+        "topic": log.topic,
+        "qos": log.qos,
+        "retain": log.retain,
+        "robotId": log.robot_id,
+        "messageType": log.message_type,
+        "payload": log.payload,
+        "schemaValid": log.schema_valid,
+        "validationErrors": log.validation_errors,
+        "createdAt": log.created_at,
+    }
+
+
+async def prune_message_logs(
+    session: AsyncSession,
+    older_than: timedelta,
+    *,
+    batch_size: int,
+    archive_dir: Path | None = None,
+) -> int:
+    """Delete up to ``batch_size`` inbound log rows older than ``older_than`` in one transaction.
+
+    Rows are written to a daily ``mqtt_message_logs-YYYYMMDD.jsonl.gz`` in ``archive_dir`` before
+    they are deleted. Outbound rows are kept: instant action header ids are derived from them.
+    """
+    cutoff = datetime.now(UTC) - older_than
+    expired = (
+        select(MqttMessageLog)
+        .where(MqttMessageLog.direction == "inbound", MqttMessageLog.created_at < cutoff)
+        .order_by(MqttMessageLog.created_at)
+        .limit(batch_size)
+        # Another replica pruning at the same time takes the next rows instead of waiting.
+        .with_for_update(skip_locked=True)
+    )
+    if archive_dir is not None:
+        logs = list((await session.scalars(expired)).all())
+        ids = [log.id for log in logs]
+        if logs:
+            path = archive_dir / f"mqtt_message_logs-{datetime.now(UTC):%Y%m%d}.jsonl.gz"
+            await asyncio.to_thread(_archive_rows, path, [_archive_row(log) for log in logs])
+    else:
+        ids = list((await session.scalars(expired.with_only_columns(MqttMessageLog.id))).all())
+    if ids:
+        await session.execute(delete(MqttMessageLog).where(MqttMessageLog.id.in_(ids)))
+    await session.commit()
+    return len(ids)
+
+
+class MessageLogRetention:
+    """Background job that prunes inbound ``mqtt_message_logs`` rows older than ``retention``.
+
+    Every ``interval`` seconds it deletes old rows in transactions of at most ``batch_size``
+    rows, pausing ``batch_pause`` seconds between them, so the table is never locked for long and
+    concurrent inserts keep flowing.
+    """
+
+    def __init__(
+        self,
+        *,
+        retention: timedelta,
+        batch_size: int = 1000,
+        interval: float = 300.0,
+        archive_dir: Path | None = None,
+        batch_pause: float = 0.1,
+        session_maker: async_sessionmaker[AsyncSession] = AsyncSessionMaker,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.retention = retention
+        self.batch_size = batch_size
+        self.interval = interval
+        self.archive_dir = archive_dir
+        self.batch_pause = batch_pause
+        self.session_maker = session_maker
+        self.pruned_rows = 0
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "MessageLogRetention | None":
+        if settings.mqtt_message_log_retention_hours is None:
+            return None
+        archive_dir = settings.mqtt_message_log_archive_dir
+        return cls(
+            retention=timedelta(hours=settings.mqtt_message_log_retention_hours),
+            batch_size=settings.mqtt_message_log_retention_batch_size,
+            interval=settings.mqtt_message_log_retention_interval_seconds,
+            archive_dir=Path(archive_dir) if archive_dir else None,
+        )
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="tars-mqtt-log-retention")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to prune MQTT message logs")
+            await asyncio.sleep(self.interval)
+
+    async def prune(self) -> int:
+        """Prune batch by batch until no expired rows are left; return the number removed."""
+        total = 0
+        while True:
+            async with self.session_maker() as session:
+                pruned = await prune_message_logs(
+                    session,
+                    self.retention,
+                    batch_size=self.batch_size,
+                    archive_dir=self.archive_dir,
+                )
+            total += pruned
+            self.pruned_rows += pruned
+            if pruned < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
+        if total:
+            logger.info("Pruned %d MQTT message log rows", total)
+        return total
@@ -1,12 +1,20 @@
 import asyncio
-import json
+import logging
+import threading
+from contextlib import suppress
 from dataclasses import dataclass
 from typing import Any, Protocol
 
+import aiomqtt
 import paho.mqtt.client as mqtt
 from paho.mqtt.enums import CallbackAPIVersion
+from paho.mqtt.properties import Properties
+from paho.mqtt.reasoncodes import ReasonCode
 
 from app.core.config import Settings, get_settings
+from app.mqtt.codec import encode_payload
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -44,8 +52,61 @@ class RecordingMqttPublisher:
 
 
 class PahoMqttPublisher:
+    """Publish over one long-lived paho connection driven by paho's background network thread.
+
+    ``start`` connects asynchronously and paho reconnects on its own, backing off between
+    ``mqtt_reconnect_min_seconds`` and ``mqtt_reconnect_max_seconds``. A QoS 0 publish only
+    hands the packet to that thread; a QoS 1 or 2 publish is awaited until the broker
+    acknowledges it, for at most ``mqtt_publish_timeout_seconds``. Publishing while disconnected
+    raises ``ConnectionError`` instead of queueing, so callers can report the failure.
+    """
+
     def __init__(self, settings: Settings | None = None) -> None:
         self.settings = settings or get_settings()
+        self._client: mqtt.Client | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Message ids handed to paho but not completed yet, with the future a QoS 1/2 publish
+        # awaits, and ids paho completed before ``publish`` could register them. Both are shared
+        # with paho's network thread, which must not be blocked while it holds its own locks.
+        self._lock = threading.Lock()
+        self._pending: dict[int, asyncio.Future[None] | None] = {}
+        self._acknowledged: set[int] = set()
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None and self._client.is_connected()
+
+    def start(self) -> None:
+        if self._client is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        client = mqtt.Client(CallbackAPIVersion.VERSION2)
+        if self.settings.mqtt_username:
+            client.username_pw_set(self.settings.mqtt_username, self.settings.mqtt_password or None)
+        client.reconnect_delay_set(
+            min_delay=max(1, round(self.settings.mqtt_reconnect_min_seconds)),
+            max_delay=max(1, round(self.settings.mqtt_reconnect_max_seconds)),
+        )
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_publish = self._on_publish
+        client.connect_async(self.settings.mqtt_host, self.settings.mqtt_port, keepalive=30)
+        client.loop_start()
+        self._client = client
+
+    async def stop(self) -> None:
+        client, self._client = self._client, None
+        if client is None:
+            return
+        client.disconnect()
+        await asyncio.to_thread(client.loop_stop)
+        with self._lock:
+            waiting = [future for future in self._pending.values() if future is not None]
+            self._pending.clear()
+            self._acknowledged.clear()
+        for future in waiting:
+            if not future.done():
+                future.set_exception(ConnectionError("MQTT publisher stopped"))
 
     async def publish(
         self,
@@ -55,29 +116,164 @@ class PahoMqttPublisher:
         qos: int = 0,
         retain: bool = False,
     ) -> None:
-        await asyncio.to_thread(
-            self._publish_sync,
-            topic=topic,
-            payload=payload,
-            qos=qos,
-            retain=retain,
-        )
+        client = self._client
+        if client is None or not client.is_connected():
+            raise ConnectionError(f"MQTT publisher is not connected; cannot publish to {topic}")
+        info = client.publish(topic, payload=encode_payload(payload), qos=qos, retain=retain)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            raise ConnectionError(f"MQTT publish to {topic} failed: {mqtt.error_string(info.rc)}")
+        future = asyncio.get_running_loop().create_future() if qos > 0 else None
+        with self._lock:
+            if info.mid in self._acknowledged:
+                self._acknowledged.discard(info.mid)
+                return
+            self._pending[info.mid] = future
+        if future is None:
+            return
+        try:
+            await asyncio.wait_for(future, self.settings.mqtt_publish_timeout_seconds)
+        except BaseException:
+            with self._lock:
+                # Let a late acknowledgement clear the entry instead of being kept as early.
+                if info.mid in self._pending:
+                    self._pending[info.mid] = None
+            raise
 
-    def _publish_sync(
+    def _on_connect(
+        self,
+        client: mqtt.Client,
+        userdata: Any,
+        flags: mqtt.ConnectFlags,
+        reason_code: ReasonCode,
+        properties: Properties | None,
+    ) -> None:
+        if reason_code.is_failure:
+            logger.warning("MQTT publisher connection refused: %s", reason_code)
+        else:
+            logger.info("MQTT publisher connected to %s", self.settings.mqtt_host)
+
+    def _on_disconnect(
+        self,
+        client: mqtt.Client,
+        userdata: Any,
+        flags: mqtt.DisconnectFlags,
+        reason_code: ReasonCode,
+        properties: Properties | None,
+    ) -> None:
+        with self._lock:
+            # Unsent QoS 0 messages are dropped by paho; QoS 1/2 ones are resent on reconnect.
+            for mid in [mid for mid, future in self._pending.items() if future is None]:
+                del self._pending[mid]
+        if reason_code.is_failure:
+            logger.warning("MQTT publisher disconnected; reconnecting: %s", reason_code)
+
+    def _on_publish(
+        self,
+        client: mqtt.Client,
+        userdata: Any,
+        mid: int,
+        reason_code: ReasonCode,
+        properties: Properties | None,
+    ) -> None:
+        with self._lock:
+            if mid not in self._pending:
+                self._acknowledged.add(mid)
+                return
+            future = self._pending.pop(mid)
+        if future is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(_resolve, future)
+
+
+class AiomqttPublisher:
+    """Publish over a dedicated aiomqtt connection driven by the application's event loop.
+
+    A task keeps the connection open and reconnects with the same backoff as ``MqttWorker``, so
+    publishing never uses a thread. At most ``mqtt_publish_max_inflight`` QoS 1/2 messages wait
+    for their acknowledgement at a time; further publishes wait for a free slot, which pushes
+    back on callers instead of growing paho's outgoing queue. Waiting for a slot and for the
+    acknowledgement together is bounded by ``mqtt_publish_timeout_seconds``. Publishing while
+    disconnected raises ``ConnectionError``.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or get_settings()
+        self._client: aiomqtt.Client | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._inflight = asyncio.Semaphore(self.settings.mqtt_publish_max_inflight)
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="tars-mqtt-publisher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        delay = self.settings.mqtt_reconnect_min_seconds
+        while True:
+            try:
+                async with aiomqtt.Client(
+                    hostname=self.settings.mqtt_host,
+                    port=self.settings.mqtt_port,
+                    username=self.settings.mqtt_username or None,
+                    password=self.settings.mqtt_password or None,
+                    timeout=self.settings.mqtt_publish_timeout_seconds,
+                    max_inflight_messages=self.settings.mqtt_publish_max_inflight,
+                ) as client:
+                    self._client = client
+                    delay = self.settings.mqtt_reconnect_min_seconds
+                    logger.info("MQTT publisher connected to %s", self.settings.mqtt_host)
+                    # Nothing is subscribed; the iterator only ends by raising on disconnect.
+                    async for _ in client.messages:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except (aiomqtt.MqttError, OSError) as exc:
+                logger.warning("MQTT publisher disconnected; retrying in %.1fs: %s", delay, exc)
+            finally:
+                self._client = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.settings.mqtt_reconnect_max_seconds)
+
+    async def publish(
         self,
         *,
         topic: str,
         payload: dict[str, Any],
-        qos: int,
-        retain: bool,
+        qos: int = 0,
+        retain: bool = False,
     ) -> None:
-        encoded = json.dumps(payload, separators=(",", ":"))
-        client = mqtt.Client(CallbackAPIVersion.VERSION2)
-        client.connect(self.settings.mqtt_host, self.settings.mqtt_port, keepalive=30)
-        result = client.publish(topic, payload=encoded, qos=qos, retain=retain)
-        result.wait_for_publish()
-        client.disconnect()
+        async with asyncio.timeout(self.settings.mqtt_publish_timeout_seconds):
+            if qos == 0:
+                await self._publish(topic, encode_payload(payload), qos, retain)
+                return
+            async with self._inflight:
+                await self._publish(topic, encode_payload(payload), qos, retain)
+
+    async def _publish(self, topic: str, payload: bytes, qos: int, retain: bool) -> None:
+        client = self._client
+        if client is None:
+            raise ConnectionError(f"MQTT publisher is not connected; cannot publish to {topic}")
+        try:
+            await client.publish(topic, payload=payload, qos=qos, retain=retain)
+        except aiomqtt.MqttError as exc:
+            raise ConnectionError(f"MQTT publish to {topic} failed: {exc}") from exc
+
+
+def create_mqtt_publisher(settings: Settings) -> AiomqttPublisher | PahoMqttPublisher:
+    if settings.mqtt_publisher == "paho":
+        return PahoMqttPublisher(settings)
+    return AiomqttPublisher(settings)
 
 
-def get_mqtt_publisher() -> MqttPublisher:
-    return PahoMqttPublisher()
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+
+from fastapi import Request
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased, selectinload
+
+from app.core.config import Settings
+from app.db.base import AsyncSessionMaker, Mission, MissionOrder, MqttOutboxMessage
+from app.mqtt.outbound import MqttPublisher
+from app.services.event_bus import EventBus, PendingEvent, get_event_bus
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """Background task that publishes committed ``mqtt_outbox`` rows to the broker.
+
+    Services write the outbox row in the same transaction as the ``MqttMessageLog`` and
+    ``MissionOrder`` it belongs to, so a message is published if and only if its records were
+    committed. The relay takes up to ``batch_size`` due rows at a time. Rows of one robot are
+    published one after another in commit order; different robots are published concurrently. A
+    failed publish is retried after ``retry_delay`` seconds, doubling per attempt, and given up
+    after ``max_attempts``; the robot's later rows wait until then. ``notify`` wakes the relay
+    right after a commit; otherwise it polls every ``interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        publisher: MqttPublisher,
+        *,
+        batch_size: int = 100,
+        interval: float = 1.0,
+        max_attempts: int = 5,
+        retry_delay: float = 1.0,
+        session_maker: async_sessionmaker[AsyncSession] = AsyncSessionMaker,
+        event_bus: EventBus | None = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.session_maker = session_maker
+        self.event_bus = event_bus or get_event_bus()
+        self.published_messages = 0
+        self.failed_messages = 0
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings, publisher: MqttPublisher) -> "OutboxRelay":
+        return cls(
+            publisher,
+            batch_size=settings.mqtt_outbox_batch_size,
+            interval=settings.mqtt_outbox_poll_interval_seconds,
+            max_attempts=settings.mqtt_outbox_max_attempts,
+            retry_delay=settings.mqtt_outbox_retry_delay_seconds,
+        )
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="tars-mqtt-outbox-relay")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        while True:
+            # Cleared before draining, so a commit notified meanwhile triggers another pass.
+            self._wake.clear()
+            try:
+                await self.relay_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to relay the MQTT outbox")
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+
+    async def relay_pending(self) -> int:
+        """Relay batch by batch until no due rows are left; return the number published."""
+        total = 0
+        while True:
+            async with self.session_maker() as session:
+                published, taken = await self.relay_batch(session)
+            total += published
+            if taken < self.batch_size or published == 0:
+                return total
+
+    async def relay_batch(self, session: AsyncSession) -> tuple[int, int]:
+        """Publish one batch of due rows; return how many were published and how many taken."""
+        now = datetime.now(UTC)
+        earlier = aliased(MqttOutboxMessage)
+        # A robot's rows wait while an earlier one is backing off, so they are not reordered.
+        behind_retry = (
+            select(earlier.id)
+            .where(
+                earlier.robot_id == MqttOutboxMessage.robot_id,
+                earlier.id < MqttOutboxMessage.id,
+                earlier.published_at.is_(None),
+                earlier.failed_at.is_(None),
+                earlier.available_at > now,
+            )
+            .exists()
+        )
+        rows = list(
+            (
+                await session.scalars(
+                    select(MqttOutboxMessage)
+                    .where(
+                        MqttOutboxMessage.published_at.is_(None),
+                        MqttOutboxMessage.failed_at.is_(None),
+                        or_(
+                            MqttOutboxMessage.available_at.is_(None),
+                            MqttOutboxMessage.available_at <= now,
+                        ),
+                        ~behind_retry,
+                    )
+                    .order_by(MqttOutboxMessage.id)
+                    .limit(self.batch_size)
+                    .options(selectinload(MqttOutboxMessage.message_log))
+                    # Not SKIP LOCKED: another replica waits for this batch to commit instead
+                    # of publishing a robot's later rows before the earlier ones.
+                    .with_for_update()
+                )
+            ).all()
+        )
+        if not rows:
+            await session.commit()
+            return 0, 0
+
+        by_robot: dict[str | None, list[MqttOutboxMessage]] = {}
+        for row in rows:
+            by_robot.setdefault(row.robot_id, []).append(row)
+        outcomes = await asyncio.gather(
+            *(self._publish_in_order(group) for group in by_robot.values())
+        )
+
+        events: list[PendingEvent] = []
+        published = 0
+        for group, (sent, error) in zip(by_robot.values(), outcomes, strict=True):
+            for row in group[:sent]:
+                await self._mark_published(session, row, events)
+            published += sent
+            if error is not None:
+                await self._mark_failed(session, group[sent], error, events)
+        await session.commit()
+        self.event_bus.publish_pending(events)
+        self.published_messages += published
+        return published, len(rows)
+
+    async def _publish_in_order(
+        self, rows: Sequence[MqttOutboxMessage]
+    ) -> tuple[int, BaseException | None]:
+        """Publish until one fails, so a robot never receives its messages out of order."""
+        for sent, row in enumerate(rows):
+            log = row.message_log
+            try:
+                await self.publisher.publish(
+                    topic=log.topic, payload=log.payload, qos=log.qos, retain=log.retain
+                )
+            except Exception as exc:
+                return sent, exc
+        return len(rows), None
+
+    async def _mark_published(
+        self, session: AsyncSession, row: MqttOutboxMessage, events: list[PendingEvent]
+    ) -> None:
+        now = datetime.now(UTC)
+        row.attempts += 1
+        row.published_at = now
+        log = row.message_log
+        mission_id = None
+        if row.mission_order_id is not None:
+            mission_order = await session.get(MissionOrder, row.mission_order_id)
+            if mission_order is not None:
+                mission_order.published_at = now
+                mission_id = mission_order.mission_id
+        events.append(
+            PendingEvent(
+                "mqtt.message.published",
+                robot_id=log.robot_id,
+                mission_id=mission_id,
+                payload={"messageId": log.id, "topic": log.topic, "messageType": log.message_type},
+            )
+        )
+
+    async def _mark_failed(
+        self,
+        session: AsyncSession,
+        row: MqttOutboxMessage,
+        error: BaseException,
+        events: list[PendingEvent],
+    ) -> None:
+        row.attempts += 1
+        row.last_error = (str(error) or type(error).__name__)[:500]
+        if row.attempts < self.max_attempts:
+            delay = self.retry_delay * 2 ** (row.attempts - 1)
+            row.available_at = datetime.now(UTC) + timedelta(seconds=delay)
+            logger.warning(
+                "MQTT publish to %s failed (attempt %d); retrying in %.1fs: %s",
+                row.message_log.topic,
+                row.attempts,
+                delay,
+                row.last_error,
+            )
+            return
+
+        row.failed_at = datetime.now(UTC)
+        self.failed_messages += 1
+        logger.error(
+            "Giving up on MQTT publish to %s after %d attempts: %s",
+            row.message_log.topic,
+            row.attempts,
+            row.last_error,
+        )
+        if row.mission_order_id is None:
+            return
+        mission_order = await session.get(MissionOrder, row.mission_order_id)
+        if mission_order is None:
+            return
+        mission_order.validation_status = "publish_failed"
+        mission = await session.get(Mission, mission_order.mission_id)
+        if mission is not None and mission.status == "sent":
+            # The order never reached the robot; let the mission be dispatched again.
+            mission.status = "assigned"
+            events.append(
+                PendingEvent(
+                    "mission.status.changed",
+                    robot_id=mission_order.robot_id,
+                    mission_id=mission.id,
+                    payload={"status": mission.status},
+                )
+            )
+
+
+def get_outbox_relay(request: Request) -> OutboxRelay:
+    """The application's outbox relay, started in the FastAPI lifespan."""
+    relay: OutboxRelay = request.app.state.outbox_relay
+    return relay
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+from app.mqtt.inbound import InboundMqttMessage
+
+MessageIdentity = tuple[int, str | None]
+
+
+class RedeliveryWindow:
+    """Recently seen ``(headerId, timestamp)`` pairs per topic, to recognise redeliveries.
+
+    QoS 1 retries and retained messages replayed on reconnect arrive with the same ``headerId``
+    and ``timestamp`` as the original. Each topic, and so each robot and message type, keeps the
+    ``size`` most recently seen pairs in LRU order. Messages without an integer ``headerId``, or
+    whose payload is not a JSON object, are never treated as redeliveries; schema validation
+    rejects them later.
+    """
+
+    def __init__(self, size: int = 16) -> None:
+        if size < 1:
+            raise ValueError("size must be positive")
+        self.size = size
+        self._seen: dict[str, OrderedDict[MessageIdentity, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def is_redelivery(self, message: InboundMqttMessage) -> bool:
+        """Record ``message`` and return whether its topic already saw the same message."""
+        if not isinstance(message.payload, dict):
+            return False
+        header_id = message.payload.get("headerId")
+        timestamp = message.payload.get("timestamp")
+        if not isinstance(header_id, int) or not isinstance(timestamp, str | None):
+            return False
+        identity = (header_id, timestamp)
+        seen = self._seen.get(message.topic)
+        if seen is None:
+            seen = self._seen[message.topic] = OrderedDict()
+        elif identity in seen:
+            seen.move_to_end(identity)
+            return True
+        seen[identity] = None
+        if len(seen) > self.size:
+            seen.popitem(last=False)
+        return False
+
+    def clear(self) -> None:
+        self._seen.clear()
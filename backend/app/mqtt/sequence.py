@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from app.services.robot_registry import RobotIdentity
+
+# `connection` is left out: the broker publishes a robot's last will with the headerId it had
+# when it connected, which would always look late. `visualization` mostly bypasses ingestion.
+SEQUENCED_MESSAGE_TYPES = frozenset({"state", "factsheet"})
+
+SequenceVerdict = Literal["first", "in_order", "gap", "late", "duplicate", "restart"]
+
+
+@dataclass(frozen=True)
+class SequencePosition:
+    header_id: int
+    timestamp: datetime | None
+
+
+@dataclass
+class SequenceStats:
+    received: int = 0
+    missing: int = 0
+    late: int = 0
+    duplicates: int = 0
+    restarts: int = 0
+
+    @property
+    def loss_rate(self) -> float:
+        expected = self.received + self.missing
+        return self.missing / expected if expected else 0.0
+
+    @property
+    def reorder_rate(self) -> float:
+        return self.late / self.received if self.received else 0.0
+
+    def add(self, other: "SequenceStats") -> None:
+        self.received += other.received
+        self.missing += other.missing
+        self.late += other.late
+        self.duplicates += other.duplicates
+        self.restarts += other.restarts
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    """An aware datetime from a payload ``timestamp``, or ``None`` if it is not ISO 8601."""
+    if not isinstance(value, str):
+        return None
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return timestamp if timestamp.tzinfo is not None else timestamp.replace(tzinfo=UTC)
+
+
+def classify(
+    previous: SequencePosition | None, position: SequencePosition
+) -> tuple[SequenceVerdict, int]:
+    """Place ``position`` relative to the newest message seen on its topic.
+
+    Returns the verdict and how many header ids were skipped. A ``headerId`` at or below the
+    previous one with a newer ``timestamp`` means the robot restarted its counter.
+    """
+    if previous is None:
+        return "first", 0
+    if position.header_id > previous.header_id:
+        missing = position.header_id - previous.header_id - 1
+        return ("gap" if missing else "in_order"), missing
+    if (
+        position.timestamp is not None
+        and previous.timestamp is not None
+        and position.timestamp > previous.timestamp
+    ):
+        return "restart", 0
+    if position.header_id == previous.header_id:
+        return "duplicate", 0
+    return "late", 0
+
+
+class SequenceTracker:
+    """Per-topic ``headerId`` bookkeeping for inbound messages, entirely in memory.
+
+    ``observe`` is called in arrival order. Late and duplicate messages do not move the topic's
+    position, so a message that arrives after a newer one is recognised as stale. A late message
+    that fills a previously counted gap is no longer counted as missing.
+    """
+
+    def __init__(self) -> None:
+        self._positions: dict[str, SequencePosition] = {}
+        self._stats: dict[RobotIdentity, SequenceStats] = {}
+
+    def observe(self, topic: str, payload: Any) -> SequenceVerdict | None:
+        """Record a message and return its verdict, or ``None`` if it is not sequenced.
+
+        Messages on other topics and payloads that are not JSON objects are not sequenced; schema
+        validation rejects the latter later.
+        """
+        parts = topic.split("/")
+        if len(parts) != 5 or parts[4] not in SEQUENCED_MESSAGE_TYPES:
+            return None
+        if not isinstance(payload, dict):
+            return None
+        header_id = payload.get("headerId")
+        if not isinstance(header_id, int):
+            return None
+        position = SequencePosition(header_id, parse_timestamp(payload.get("timestamp")))
+        verdict, missing = classify(self._positions.get(topic), position)
+
+        robot = (parts[2], parts[3])
+        stats = self._stats.get(robot)
+        if stats is None:
+            stats = self._stats[robot] = SequenceStats()
+        stats.received += 1
+        stats.missing += missing
+        if verdict == "late":
+            stats.late += 1
+            stats.missing = max(stats.missing - 1, 0)
+        elif verdict == "duplicate":
+            stats.duplicates += 1
+        else:
+            if verdict == "restart":
+                stats.restarts += 1
+            self._positions[topic] = position
+        return verdict
+
+    def stats_by_robot(self) -> dict[RobotIdentity, SequenceStats]:
+        return self._stats
+
+    def clear(self) -> None:
+        self._positions.clear()
+        self._stats.clear()
+
+
+def is_stale(verdict: SequenceVerdict | None) -> bool:
+    return verdict in {"late", "duplicate"}
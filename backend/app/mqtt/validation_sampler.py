@@ -0,0 +1,93 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from app.core.config import Settings, get_settings
+
+# Message types whose domain update only reads the payload defensively. `connection` and
+# `factsheet` are rare and drive robot columns directly, so they are always validated.
+SAMPLED_MESSAGE_TYPES = frozenset({"state", "visualization"})
+
+
+def parse_validation_policy(policy: str) -> tuple[int, int] | None:
+    """``(trusted_after, every)`` of a sampled policy, ``None`` for ``full``."""
+    name, _, arguments = policy.partition(":")
+    if name == "full" and not arguments:
+        return None
+    if name == "every":
+        return 0, int(arguments)
+    if name == "trusted":
+        trusted_after, _, every = arguments.partition(":")
+        return int(trusted_after), int(every)
+    raise ValueError(f"Unknown schema validation policy: {policy}")
+
+
+@dataclass(slots=True)
+class _TopicValidation:
+    consecutive_valid: int = 0
+    sampled: int = 0
+
+
+class ValidationSampler:
+    """Decide per robot and message type which inbound messages are schema validated.
+
+    - ``full`` validates every message;
+    - ``every:N`` validates the first and then every Nth message per topic;
+    - ``trusted:K:N`` validates every message until a topic sent K valid messages in a row,
+      then every Nth; any invalid message makes it validate every message again.
+
+    Message types without their own policy use ``default``. Only ``SAMPLED_MESSAGE_TYPES`` are
+    ever skipped; other message types are validated whatever their policy.
+    """
+
+    def __init__(self, policies: Mapping[str, str] | None = None, default: str = "full") -> None:
+        self.default = default
+        self.policies = dict(policies or {})
+        self._sampling = {
+            message_type: parse_validation_policy(policy)
+            for message_type, policy in {**self.policies, "": default}.items()
+        }
+        self._topics: dict[str, _TopicValidation] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ValidationSampler":
+        return cls(settings.mqtt_validation_policies, settings.mqtt_validation_default_policy)
+
+    def policy_for(self, message_type: str) -> str:
+        return self.policies.get(message_type, self.default)
+
+    def should_validate(self, topic: str, message_type: str) -> bool:
+        if message_type not in SAMPLED_MESSAGE_TYPES:
+            return True
+        sampling = self._sampling.get(message_type, self._sampling[""])
+        if sampling is None:
+            return True
+        trusted_after, every = sampling
+        topic_validation = self._topics.get(topic)
+        if topic_validation is None:
+            topic_validation = self._topics[topic] = _TopicValidation()
+        if topic_validation.consecutive_valid < trusted_after:
+            return True
+        sampled = topic_validation.sampled
+        topic_validation.sampled = sampled + 1
+        return sampled % every == 0
+
+    def record(self, topic: str, *, valid: bool) -> None:
+        """Record the outcome of a validation ``should_validate`` asked for."""
+        topic_validation = self._topics.get(topic)
+        if topic_validation is None:
+            return
+        if valid:
+            topic_validation.consecutive_valid += 1
+        else:
+            topic_validation.consecutive_valid = 0
+            topic_validation.sampled = 0
+
+    def clear(self) -> None:
+        self._topics.clear()
+
+
+validation_sampler = ValidationSampler.from_settings(get_settings())
+
+
+def get_validation_sampler() -> ValidationSampler:
+    return validation_sampler
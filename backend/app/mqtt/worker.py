@@ -1,19 +1,43 @@
 import asyncio
-import json
 import logging
 from contextlib import suppress
+from typing import Any
 
 import aiomqtt
 
 from app.core.config import Settings
-from app.db.base import AsyncSessionMaker
-from app.mqtt.inbound import InboundMqttMessage, MqttInboundService
+from app.core.metrics import message_type_label, mqtt_inbound_stage_seconds
+from app.mqtt.codec import PayloadDecodeError, decode_payload
+from app.mqtt.inbound import InboundMqttMessage
+from app.mqtt.ingest import ShardedInboundDispatcher
+from app.services.event_bus import EventBus, get_event_bus
+from app.services.robot_registry import RobotIdentityCache, get_robot_identity_cache
+from app.services.visualization_buffer import VisualizationBuffer, get_visualization_buffer
 
 logger = logging.getLogger(__name__)
 
 
-def build_subscription_filter(interface_name: str = "vda5050", major_version: str = "v3") -> str:
-    return f"{interface_name}/{major_version}/+/+/+"
+def build_subscription_filter(
+    interface_name: str = "vda5050",
+    major_version: str = "v3",
+    shared_group: str | None = None,
+) -> str:
+    """Filter for all robot topics, as an MQTT v5 shared subscription if a group is given."""
+    topic_filter = f"{interface_name}/{major_version}/+/+/+"
+    if shared_group:
+        return f"$share/{shared_group}/{topic_filter}"
+    return topic_filter
+
+
+def ingest_lane_count(settings: Settings) -> int:
+    """SQLite serialises writers, so concurrent lanes only add lock contention there."""
+    if settings.database_url.startswith("sqlite") and settings.mqtt_ingest_lanes > 1:
+        logger.warning(
+            "Ignoring MQTT_INGEST_LANES=%d: SQLite supports a single writer; using 1 lane",
+            settings.mqtt_ingest_lanes,
+        )
+        return 1
+    return settings.mqtt_ingest_lanes
 
 
 def next_reconnect_delay(current: float, maximum: float) -> float:
@@ -21,25 +45,49 @@ def next_reconnect_delay(current: float, maximum: float) -> float:
 
 
 class MqttWorker:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        event_bus: EventBus | None = None,
+        visualization_buffer: VisualizationBuffer | None = None,
+        identity_cache: RobotIdentityCache | None = None,
+    ) -> None:
         self.settings = settings
+        self.event_bus = event_bus or get_event_bus()
+        self.visualization_buffer = visualization_buffer or get_visualization_buffer()
+        self.identity_cache = identity_cache or get_robot_identity_cache()
+        self.dispatcher = ShardedInboundDispatcher(
+            lanes=ingest_lane_count(settings),
+            max_batch_size=settings.mqtt_ingest_batch_size,
+            max_latency=settings.mqtt_ingest_batch_latency_ms / 1000,
+            max_queue_size=settings.mqtt_ingest_queue_size,
+            coalesce_threshold=settings.mqtt_ingest_coalesce_threshold,
+            shed_policy=settings.mqtt_ingest_shed_policy,
+            # Replicas in a share group may each receive a redelivered message.
+            deduplicate=settings.mqtt_shared_subscription_group is not None,
+            redelivery_window=settings.mqtt_ingest_redelivery_window or None,
+        )
         self._task: asyncio.Task[None] | None = None
 
     def start(self) -> None:
+        self.dispatcher.start()
         if self._task is None or self._task.done():
             self._task = asyncio.create_task(self.run(), name="tars-mqtt-worker")
 
     async def stop(self) -> None:
-        if self._task is None:
-            return
-        self._task.cancel()
-        with suppress(asyncio.CancelledError):
-            await self._task
-        self._task = None
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.dispatcher.stop()
 
     async def run(self) -> None:
         subscription = build_subscription_filter(
-            self.settings.mqtt_interface_name, self.settings.vda5050_major_version
+            self.settings.mqtt_interface_name,
+            self.settings.vda5050_major_version,
+            self.settings.mqtt_shared_subscription_group,
         )
         delay = self.settings.mqtt_reconnect_min_seconds
         while True:
@@ -58,6 +106,11 @@ class MqttWorker:
             port=self.settings.mqtt_port,
             username=self.settings.mqtt_username or None,
             password=self.settings.mqtt_password or None,
+            protocol=(
+                aiomqtt.ProtocolVersion.V5
+                if self.settings.mqtt_shared_subscription_group
+                else aiomqtt.ProtocolVersion.V311
+            ),
         ) as client:
             await client.subscribe(subscription)
             logger.info("Subscribed to VDA 5050 MQTT topics: %s", subscription)
@@ -70,19 +123,53 @@ class MqttWorker:
                     logger.exception("Failed to process MQTT message on %s", message.topic)
 
     async def _handle_aiomqtt_message(self, message: aiomqtt.Message) -> None:
+        topic = str(message.topic)
         try:
-            payload = json.loads(message.payload.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
-            logger.warning("Dropping non-JSON MQTT payload on %s: %s", message.topic, exc)
+            with mqtt_inbound_stage_seconds.labels("decode", message_type_label(topic)).time():
+                payload = decode_payload(message.payload)
+        except PayloadDecodeError as exc:
+            logger.warning("Dropping non-JSON MQTT payload on %s: %s", topic, exc)
             return
 
-        async with AsyncSessionMaker() as session:
-            service = MqttInboundService(session)
-            await service.handle_message(
-                InboundMqttMessage(
-                    topic=str(message.topic),
-                    payload=payload,
-                    qos=int(message.qos),
-                    retain=bool(message.retain),
-                )
+        if topic.endswith("/visualization") and not self._buffer_visualization(topic, payload):
+            return
+        await self.dispatcher.put(
+            InboundMqttMessage(
+                topic=topic,
+                payload=payload,
+                qos=int(message.qos),
+                retain=bool(message.retain),
+                size=len(message.payload),
             )
+        )
+
+    def _buffer_visualization(self, topic: str, payload: Any) -> bool:
+        """Keep a visualization sample in memory; return whether to persist it as well.
+
+        Well-formed samples skip validation and the database. Every
+        ``MQTT_VISUALIZATION_PERSIST_EVERY``-th sample per robot, and anything malformed, still
+        goes through the regular inbound pipeline so it is validated and logged. Fields of the
+        wrong type are left out of the buffered sample and the event.
+        """
+        parts = topic.split("/")
+        if len(parts) != 5 or not isinstance(payload, dict):
+            return True
+        manufacturer, serial_number = parts[2], parts[3]
+        sample, received = self.visualization_buffer.record(manufacturer, serial_number, payload)
+        robot = self.identity_cache.get(manufacturer, serial_number)
+        self.event_bus.publish(
+            "robot.visualization.updated",
+            robot_id=robot.id if robot is not None else None,
+            payload={
+                "manufacturer": manufacturer,
+                "serialNumber": serial_number,
+                "headerId": sample.header_id,
+                "timestamp": sample.timestamp,
+                "agvPosition": sample.agv_position,
+                "velocity": sample.velocity,
+            },
+        )
+        if not sample.well_formed:
+            return True
+        persist_every = self.settings.mqtt_visualization_persist_every
+        return persist_every is not None and received % persist_every == 0
@@ -1,50 +1,241 @@
 import asyncio
-from collections.abc import AsyncIterator
+import time
+from collections.abc import AsyncIterator, Iterable
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, Protocol
 from uuid import uuid4
 
-from pydantic import BaseModel, ConfigDict, Field
+import orjson
 
 
-class DomainEvent(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
+class DomainEvent:
+    """A domain event as delivered to subscribers.
 
-    id: str = Field(default_factory=lambda: str(uuid4()))
-    type: str
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
-    robot_id: str | None = Field(default=None, serialization_alias="robotId")
-    mission_id: str | None = Field(default=None, serialization_alias="missionId")
-    payload: dict[str, Any] = Field(default_factory=dict)
+    ``id`` and ``timestamp`` are materialized on first access: most events are published with
+    nobody listening, and those need neither a UUID nor a ``datetime``. The timestamp still
+    records when the event was created. A published event must not be modified.
+    """
+
+    __slots__ = ("type", "robot_id", "mission_id", "payload", "_id", "_created_at", "_json")
+
+    def __init__(
+        self,
+        type: str,
+        *,
+        robot_id: str | None = None,
+        mission_id: str | None = None,
+        payload: dict[str, Any] | None = None,
+    ) -> None:
+        self.type = type
+        self.robot_id = robot_id
+        self.mission_id = mission_id
+        self.payload = payload if payload is not None else {}
+        self._id: str | None = None
+        self._created_at = time.time()
+        self._json: str | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"DomainEvent(type={self.type!r}, robot_id={self.robot_id!r}, "
+            f"mission_id={self.mission_id!r})"
+        )
+
+    @classmethod
+    def from_message(cls, message: dict[str, Any], encoded: str | None = None) -> "DomainEvent":
+        """Rebuild an event from ``as_message()`` output, keeping its id and timestamp.
+
+        ``encoded`` is the JSON text ``message`` was decoded from, reused by ``as_json``.
+        """
+        event = cls(
+            message["type"],
+            robot_id=message.get("robotId"),
+            mission_id=message.get("missionId"),
+            payload=message.get("payload") or {},
+        )
+        event._id = message["id"]
+        event._created_at = datetime.fromisoformat(message["timestamp"]).timestamp()
+        event._json = encoded
+        return event
+
+    @property
+    def id(self) -> str:
+        if self._id is None:
+            self._id = str(uuid4())
+        return self._id
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self._created_at, UTC)
 
     def as_message(self) -> dict[str, Any]:
-        return self.model_dump(mode="json", by_alias=True, exclude_none=True)
+        message: dict[str, Any] = {
+            "id": self.id,
+            "type": self.type,
+            "timestamp": self.timestamp.isoformat().replace("+00:00", "Z"),
+        }
+        if self.robot_id is not None:
+            message["robotId"] = self.robot_id
+        if self.mission_id is not None:
+            message["missionId"] = self.mission_id
+        message["payload"] = self.payload
+        return message
+
+    def as_json(self) -> str:
+        """``as_message()`` encoded as JSON, computed once and shared by every subscriber."""
+        if self._json is None:
+            self._json = orjson.dumps(self.as_message()).decode()
+        return self._json
+
+
+@dataclass(frozen=True)
+class PendingEvent:
+    """An event staged inside a transaction and published once it commits."""
+
+    type: str
+    robot_id: str | None = None
+    mission_id: str | None = None
+    payload: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """Which events a subscriber receives; an empty field does not restrict anything.
+
+    An event matches if its type starts with one of ``event_types``, its robot id is one of
+    ``robot_ids`` and its mission id one of ``mission_ids``.
+    """
+
+    event_types: frozenset[str] = frozenset()
+    robot_ids: frozenset[str] = frozenset()
+    mission_ids: frozenset[str] = frozenset()
+
+    def matches(self, event: DomainEvent) -> bool:
+        return self.accepts(event.type, event.robot_id, event.mission_id)
+
+    def accepts(self, event_type: str, robot_id: str | None, mission_id: str | None) -> bool:
+        return (
+            (not self.event_types or any(map(event_type.startswith, self.event_types)))
+            and (not self.robot_ids or robot_id in self.robot_ids)
+            and (not self.mission_ids or mission_id in self.mission_ids)
+        )
+
+
+@dataclass
+class _Subscriber:
+    loop: asyncio.AbstractEventLoop
+    event_filter: EventFilter
+
+
+class EventBusBackend(Protocol):
+    def forward(self, event: DomainEvent) -> None:
+        """Send an event published in this process to the other processes. Must not block."""
 
 
 class EventBus:
+    """Fan-out of domain events to subscriber queues.
+
+    Subscribers filtering on robot or mission ids are indexed by those ids, so publishing an
+    event only checks the subscribers interested in its robot or mission plus those without
+    such a filter. Subscribers in this process always get events directly; with a ``backend``
+    set, published events are also forwarded to other processes, whose events the backend
+    hands back through ``deliver``.
+    """
+
     def __init__(self, *, subscriber_buffer_size: int = 100) -> None:
         if subscriber_buffer_size < 1:
             raise ValueError("subscriber_buffer_size must be positive")
         self.subscriber_buffer_size = subscriber_buffer_size
-        self._subscribers: dict[
-            asyncio.Queue[DomainEvent], asyncio.AbstractEventLoop
-        ] = {}
+        self._subscribers: dict[asyncio.Queue[DomainEvent], _Subscriber] = {}
+        self._unindexed: set[asyncio.Queue[DomainEvent]] = set()
+        self._by_robot: dict[str, set[asyncio.Queue[DomainEvent]]] = {}
+        self._by_mission: dict[str, set[asyncio.Queue[DomainEvent]]] = {}
+        self.backend: EventBusBackend | None = None
 
     @property
     def subscriber_count(self) -> int:
         return len(self._subscribers)
 
     @asynccontextmanager
-    async def subscribe(self) -> AsyncIterator[asyncio.Queue[DomainEvent]]:
+    async def subscribe(
+        self, event_filter: EventFilter | None = None
+    ) -> AsyncIterator[asyncio.Queue[DomainEvent]]:
         queue: asyncio.Queue[DomainEvent] = asyncio.Queue(
             maxsize=self.subscriber_buffer_size
         )
-        self._subscribers[queue] = asyncio.get_running_loop()
+        event_filter = event_filter or EventFilter()
+        self._subscribers[queue] = _Subscriber(asyncio.get_running_loop(), event_filter)
+        self._index(queue, event_filter)
         try:
             yield queue
         finally:
-            self._subscribers.pop(queue, None)
+            subscriber = self._subscribers.pop(queue, None)
+            if subscriber is not None:
+                self._unindex(queue, subscriber.event_filter)
+
+    def update_filter(self, queue: asyncio.Queue[DomainEvent], event_filter: EventFilter) -> None:
+        """Change which events the subscriber behind ``queue`` receives.
+
+        Buffered events that do not match the new filter are discarded. Must be called from the
+        subscriber's event loop.
+        """
+        subscriber = self._subscribers.get(queue)
+        if subscriber is None:
+            raise KeyError("Not a subscriber queue of this event bus")
+        self._unindex(queue, subscriber.event_filter)
+        subscriber.event_filter = event_filter
+        self._index(queue, event_filter)
+        buffered = [queue.get_nowait() for _ in range(queue.qsize())]
+        for event in buffered:
+            if event_filter.matches(event):
+                queue.put_nowait(event)
+
+    def _index(self, queue: asyncio.Queue[DomainEvent], event_filter: EventFilter) -> None:
+        # An event must match every field, so one index is enough to find the candidates.
+        if event_filter.robot_ids:
+            for robot_id in event_filter.robot_ids:
+                self._by_robot.setdefault(robot_id, set()).add(queue)
+        elif event_filter.mission_ids:
+            for mission_id in event_filter.mission_ids:
+                self._by_mission.setdefault(mission_id, set()).add(queue)
+        else:
+            self._unindexed.add(queue)
+
+    def _unindex(self, queue: asyncio.Queue[DomainEvent], event_filter: EventFilter) -> None:
+        self._unindexed.discard(queue)
+        for index, keys in (
+            (self._by_robot, event_filter.robot_ids),
+            (self._by_mission, event_filter.mission_ids),
+        ):
+            for key in keys:
+                queues = index.get(key)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del index[key]
+
+    def _candidates(
+        self, robot_id: str | None, mission_id: str | None
+    ) -> list[asyncio.Queue[DomainEvent]]:
+        candidates = list(self._unindexed)
+        if robot_id is not None:
+            candidates.extend(self._by_robot.get(robot_id, ()))
+        if mission_id is not None:
+            candidates.extend(self._by_mission.get(mission_id, ()))
+        return candidates
+
+    def wants(self, event_type: str, robot_id: str | None, mission_id: str | None) -> bool:
+        """Whether a subscriber in this process would receive such an event."""
+        if not self._subscribers:
+            return False
+        for queue in self._candidates(robot_id, mission_id):
+            subscriber = self._subscribers.get(queue)
+            if subscriber is not None and subscriber.event_filter.accepts(
+                event_type, robot_id, mission_id
+            ):
+                return True
+        return False
 
     def publish(
         self,
@@ -60,16 +251,38 @@ class EventBus:
             mission_id=mission_id,
             payload=payload or {},
         )
+        if self.backend is not None:
+            self.backend.forward(event)
+        self.deliver(event)
+        return event
+
+    def deliver(self, event: DomainEvent) -> None:
+        """Hand ``event`` to this process's matching subscribers without forwarding it."""
+        if not self._subscribers:
+            return
         try:
             current_loop = asyncio.get_running_loop()
         except RuntimeError:
             current_loop = None
-        for queue, subscriber_loop in tuple(self._subscribers.items()):
-            if subscriber_loop is current_loop:
+        for queue in self._candidates(event.robot_id, event.mission_id):
+            subscriber = self._subscribers.get(queue)
+            if subscriber is None or not subscriber.event_filter.matches(event):
+                continue
+            if subscriber.loop is current_loop:
                 self._enqueue(queue, event)
-            elif subscriber_loop.is_running():
-                subscriber_loop.call_soon_threadsafe(self._enqueue, queue, event)
-        return event
+            elif subscriber.loop.is_running():
+                subscriber.loop.call_soon_threadsafe(self._enqueue, queue, event)
+
+    def publish_pending(self, events: Iterable[PendingEvent]) -> None:
+        if not self._subscribers and self.backend is None:
+            return
+        for event in events:
+            self.publish(
+                event.type,
+                robot_id=event.robot_id,
+                mission_id=event.mission_id,
+                payload=event.payload,
+            )
 
     @staticmethod
     def _enqueue(queue: asyncio.Queue[DomainEvent], event: DomainEvent) -> None:
@@ -0,0 +1,161 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.base import MissionOrder, MqttHeaderSequence, MqttMessageLog
+
+HeaderSequenceKey = tuple[str, str]
+
+
+class HeaderSequenceAllocator:
+    """Hands out outbound ``headerId`` values per robot and message type.
+
+    Each ``mqtt_header_sequences`` row holds the next unleased id. The allocator leases
+    ``lease_size`` ids at a time by advancing the row in its own short transaction, then serves
+    them from memory, so most allocations cost no query and concurrent requests and replicas
+    never share an id. Ids of a lease that is not used up, for example on restart, are skipped.
+
+    Allocations are serialised per robot and message type only, so a lease query for one robot
+    never holds up the others. ``allocate`` keeps a sequence held until the caller has committed
+    the message, so one process commits, and ``OutboxRelay`` publishes, a robot's ids in
+    increasing order. Replicas dispatching to the same robot interleave their leases; set
+    ``lease_size`` to 1 if a robot must see increasing ids across replicas.
+    """
+
+    def __init__(self, lease_size: int = 20) -> None:
+        if lease_size < 1:
+            raise ValueError("lease_size must be positive")
+        self.lease_size = lease_size
+        self._leases: dict[HeaderSequenceKey, tuple[int, int]] = {}
+        self._locks: dict[HeaderSequenceKey, asyncio.Lock] = {}
+
+    async def next_header_id(self, session: AsyncSession, robot_id: str, message_type: str) -> int:
+        return (await self.next_header_ids(session, [robot_id], message_type))[robot_id]
+
+    async def next_header_ids(
+        self, session: AsyncSession, robot_ids: Iterable[str], message_type: str
+    ) -> dict[str, int]:
+        """Allocate one id per robot without holding the sequences; see ``allocate``."""
+        async with self.allocate(session, robot_ids, message_type) as allocated:
+            return allocated
+
+    @asynccontextmanager
+    async def allocate(
+        self, session: AsyncSession, robot_ids: Iterable[str], message_type: str
+    ) -> AsyncIterator[dict[str, int]]:
+        """Allocate one id per robot and hold the robots' sequences until the block exits.
+
+        Commit the message inside the block: another allocation for the same robot and message
+        type waits for it, so it cannot commit a higher id first. Robots whose lease ran out are
+        leased in one transaction through a separate session on ``session``'s bind, so leases
+        stay committed even if the caller's transaction rolls back.
+        """
+        robot_ids = list(dict.fromkeys(robot_ids))
+        async with AsyncExitStack() as held:
+            # Always in the same order, so concurrent broadcasts cannot deadlock.
+            for robot_id in sorted(robot_ids):
+                lock = self._locks.setdefault((robot_id, message_type), asyncio.Lock())
+                await held.enter_async_context(lock)
+            exhausted = [
+                robot_id
+                for robot_id in robot_ids
+                if (lease := self._leases.get((robot_id, message_type))) is None
+                or lease[0] >= lease[1]
+            ]
+            if exhausted:
+                starts = await self._lease(session, exhausted, message_type)
+                for robot_id, start in starts.items():
+                    self._leases[(robot_id, message_type)] = (start, start + self.lease_size)
+            allocated = {}
+            for robot_id in robot_ids:
+                next_id, end = self._leases[(robot_id, message_type)]
+                self._leases[(robot_id, message_type)] = (next_id + 1, end)
+                allocated[robot_id] = next_id
+            yield allocated
+
+    def clear(self) -> None:
+        self._leases.clear()
+        self._locks.clear()
+
+    async def _lease(
+        self, session: AsyncSession, robot_ids: list[str], message_type: str
+    ) -> dict[str, int]:
+        while True:
+            async with AsyncSession(bind=session.bind) as lease_session:
+                try:
+                    starts = await self._advance(lease_session, robot_ids, message_type)
+                    await lease_session.commit()
+                    return starts
+                except IntegrityError:
+                    # Another replica created a missing row first; advance it instead.
+                    await lease_session.rollback()
+
+    async def _advance(
+        self, session: AsyncSession, robot_ids: list[str], message_type: str
+    ) -> dict[str, int]:
+        advanced = await session.execute(
+            update(MqttHeaderSequence)
+            .where(
+                MqttHeaderSequence.robot_id.in_(robot_ids),
+                MqttHeaderSequence.message_type == message_type,
+            )
+            .values(next_header_id=MqttHeaderSequence.next_header_id + self.lease_size)
+            .returning(MqttHeaderSequence.robot_id, MqttHeaderSequence.next_header_id)
+            .execution_options(synchronize_session=False)
+        )
+        starts = {robot_id: next_id - self.lease_size for robot_id, next_id in advanced}
+        missing = [robot_id for robot_id in robot_ids if robot_id not in starts]
+        if missing:
+            seeds = await _first_unused_header_ids(session, missing, message_type)
+            session.add_all(
+                MqttHeaderSequence(
+                    robot_id=robot_id,
+                    message_type=message_type,
+                    next_header_id=seed + self.lease_size,
+                )
+                for robot_id, seed in seeds.items()
+            )
+            await session.flush()
+            starts.update(seeds)
+        return starts
+
+
+async def _first_unused_header_ids(
+    session: AsyncSession, robot_ids: list[str], message_type: str
+) -> dict[str, int]:
+    """Continue after the ids a robot was sent before its sequence row existed."""
+    latest = dict.fromkeys(robot_ids, 0)
+    if message_type == "order":
+        rows = await session.execute(
+            select(MissionOrder.robot_id, func.max(MissionOrder.header_id))
+            .where(MissionOrder.robot_id.in_(robot_ids))
+            .group_by(MissionOrder.robot_id)
+        )
+        for robot_id, header_id in rows:
+            latest[robot_id] = header_id or 0
+    else:
+        # A one-off scan per robot; afterwards the sequence row is authoritative.
+        logs = await session.execute(
+            select(MqttMessageLog.robot_id, MqttMessageLog.payload).where(
+                MqttMessageLog.robot_id.in_(robot_ids),
+                MqttMessageLog.direction == "outbound",
+                MqttMessageLog.message_type == message_type,
+            )
+        )
+        for robot_id, payload in logs:
+            header_id = payload.get("headerId")
+            if robot_id is not None and isinstance(header_id, int):
+                latest[robot_id] = max(latest[robot_id], header_id)
+    return {robot_id: header_id + 1 for robot_id, header_id in latest.items()}
+
+
+header_sequence_allocator = HeaderSequenceAllocator(get_settings().mqtt_header_lease_size)
+
+
+def get_header_sequence_allocator() -> HeaderSequenceAllocator:
+    return header_sequence_allocator
@@ -1,13 +1,14 @@
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from typing import Any
 from uuid import uuid4
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.base import MqttMessageLog, Robot
-from app.mqtt.outbound import MqttPublisher
+from app.db.base import MqttMessageLog, MqttOutboxMessage, Robot
 from app.services.event_bus import EventBus, get_event_bus
+from app.services.header_sequence import HeaderSequenceAllocator, get_header_sequence_allocator
 from app.vda5050.instant_actions import build_instant_actions
 from app.vda5050.topics import build_topic
 from app.vda5050.validator import validate_message
@@ -21,16 +22,25 @@ class InstantActionResult:
     errors: list[str]
 
 
+@dataclass(frozen=True)
+class InstantActionBroadcastResult:
+    accepted: bool
+    results: dict[str, InstantActionResult]
+    errors: list[str]
+
+
 class InstantActionService:
+    """Build, validate and commit ``instantActions``; ``OutboxRelay`` publishes them."""
+
     def __init__(
         self,
         session: AsyncSession,
-        publisher: MqttPublisher,
         event_bus: EventBus | None = None,
+        header_sequences: HeaderSequenceAllocator | None = None,
     ) -> None:
         self.session = session
-        self.publisher = publisher
         self.event_bus = event_bus or get_event_bus()
+        self.header_sequences = header_sequences or get_header_sequence_allocator()
 
     async def send(
         self,
@@ -42,74 +52,117 @@ class InstantActionService:
         if robot is None:
             return InstantActionResult(False, "", {}, ["Robot not found"])
 
-        header_id = await self._next_header_id(robot.id)
-        payload = build_instant_actions(
-            manufacturer=robot.manufacturer,
-            serial_number=robot.serial_number,
-            header_id=header_id,
-            action_id=str(uuid4()),
-            action_type=action_type,
-            action_parameters=action_parameters,
-        )
-        validation = validate_message("instantActions", payload)
-        topic = build_topic(robot.manufacturer, robot.serial_number, "instantActions")
-        log = MqttMessageLog(
-            direction="outbound",
-            topic=topic,
-            qos=0,
-            retain=False,
-            robot_id=robot.id,
-            message_type="instantActions",
-            payload=payload,
-            schema_valid=validation.valid,
-            validation_errors=validation.errors,
-        )
-        self.session.add(log)
-        if not validation.valid:
-            await self.session.commit()
-            self.event_bus.publish(
-                "vda.validation.failed",
+        async with self.header_sequences.allocate(
+            self.session, [robot.id], "instantActions"
+        ) as header_ids:
+            header_id = header_ids[robot.id]
+            payload = build_instant_actions(
+                manufacturer=robot.manufacturer,
+                serial_number=robot.serial_number,
+                header_id=header_id,
+                action_id=str(uuid4()),
+                action_type=action_type,
+                action_parameters=action_parameters,
+            )
+            validation = validate_message("instantActions", payload)
+            topic = build_topic(robot.manufacturer, robot.serial_number, "instantActions")
+            log = MqttMessageLog(
+                direction="outbound",
+                topic=topic,
+                qos=0,
+                retain=False,
                 robot_id=robot.id,
-                payload={
-                    "topic": topic,
-                    "messageType": "instantActions",
-                    "errors": validation.errors,
-                },
+                message_type="instantActions",
+                payload=payload,
+                schema_valid=validation.valid,
+                validation_errors=validation.errors,
             )
-            return InstantActionResult(False, topic, payload, validation.errors)
+            self.session.add(log)
+            if not validation.valid:
+                await self.session.commit()
+                self.event_bus.publish(
+                    "vda.validation.failed",
+                    robot_id=robot.id,
+                    payload={
+                        "topic": topic,
+                        "messageType": "instantActions",
+                        "errors": validation.errors,
+                    },
+                )
+                return InstantActionResult(False, topic, payload, validation.errors)
 
-        try:
-            await self.publisher.publish(topic=topic, payload=payload, qos=0, retain=False)
-        except Exception:
+            self.session.add(MqttOutboxMessage(robot_id=robot.id, message_log=log))
             await self.session.commit()
-            return InstantActionResult(False, topic, payload, ["MQTT publish failed"])
-
-        await self.session.commit()
-        await self.session.refresh(log)
-        self.event_bus.publish(
-            "mqtt.message.published",
-            robot_id=robot.id,
-            payload={
-                "messageId": log.id,
-                "topic": topic,
-                "messageType": "instantActions",
-            },
-        )
         return InstantActionResult(True, topic, payload, [])
 
-    async def _next_header_id(self, robot_id: str) -> int:
-        logs = (
-            await self.session.execute(
-                select(MqttMessageLog.payload).where(
-                    MqttMessageLog.robot_id == robot_id,
-                    MqttMessageLog.direction == "outbound",
-                    MqttMessageLog.message_type == "instantActions",
-                )
-            )
-        ).scalars()
-        header_ids = [
-            value
-            for payload in logs
-            if isinstance((value := payload.get("headerId")), int)
-        ]
-        return max(header_ids, default=0) + 1
+    async def broadcast(
+        self,
+        action_type: str,
+        action_parameters: list[dict[str, Any]] | None = None,
+        *,
+        robot_ids: list[str] | None = None,
+        manufacturer: str | None = None,
+        connection_state: str | None = None,
+    ) -> InstantActionBroadcastResult:
+        """Queue the same instant action for every robot matching all given filters.
+
+        The payloads differ only in header fields the schema does not constrain, so one of them
+        is validated for all. Every log and outbox row is committed in one transaction; the
+        outbox relay then publishes to the robots concurrently. Unknown ``robot_ids`` are
+        reported per robot without failing the others.
+        """
+        query = select(Robot).order_by(Robot.manufacturer, Robot.serial_number)
+        if robot_ids is not None:
+            query = query.where(Robot.id.in_(robot_ids))
+        if manufacturer is not None:
+            query = query.where(Robot.manufacturer == manufacturer)
+        if connection_state is not None:
+            query = query.where(Robot.last_connection_state == connection_state)
+        robots = list((await self.session.scalars(query)).all())
+
+        results: dict[str, InstantActionResult] = {}
+        if robots:
+            async with self.header_sequences.allocate(
+                self.session, [robot.id for robot in robots], "instantActions"
+            ) as header_ids:
+                emitted_at = datetime.now(UTC)
+                payloads = [
+                    build_instant_actions(
+                        manufacturer=robot.manufacturer,
+                        serial_number=robot.serial_number,
+                        header_id=header_ids[robot.id],
+                        action_id=str(uuid4()),
+                        action_type=action_type,
+                        action_parameters=action_parameters,
+                        timestamp=emitted_at,
+                    )
+                    for robot in robots
+                ]
+                validation = validate_message("instantActions", payloads[0])
+                if not validation.valid:
+                    return InstantActionBroadcastResult(False, {}, validation.errors)
+                for robot, payload in zip(robots, payloads, strict=True):
+                    topic = build_topic(robot.manufacturer, robot.serial_number, "instantActions")
+                    log = MqttMessageLog(
+                        direction="outbound",
+                        topic=topic,
+                        qos=0,
+                        retain=False,
+                        robot_id=robot.id,
+                        message_type="instantActions",
+                        payload=payload,
+                        schema_valid=True,
+                        validation_errors=[],
+                    )
+                    self.session.add_all(
+                        [log, MqttOutboxMessage(robot_id=robot.id, message_log=log)]
+                    )
+                    results[robot.id] = InstantActionResult(True, topic, payload, [])
+                await self.session.commit()
+
+        filtered = manufacturer is not None or connection_state is not None
+        missing = "Robot not found or not matching the filter" if filtered else "Robot not found"
+        for robot_id in robot_ids or []:
+            if robot_id not in results:
+                results[robot_id] = InstantActionResult(False, "", {}, [missing])
+        return InstantActionBroadcastResult(True, results, [])
@@ -1,17 +1,16 @@
 from dataclasses import dataclass
-from datetime import UTC, datetime
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.base import Mission, MissionOrder, MqttMessageLog, Robot
-from app.mqtt.outbound import MqttPublisher
+from app.db.base import Mission, MissionOrder, MqttMessageLog, MqttOutboxMessage, Robot
 from app.services.event_bus import EventBus, get_event_bus
+from app.services.header_sequence import HeaderSequenceAllocator, get_header_sequence_allocator
 from app.services.map_service import MapService
 from app.vda5050.order_builder import RouteEdge, RouteNode, build_order
 from app.vda5050.topics import build_topic
-from app.vda5050.validator import validate_message
+from app.vda5050.validation_pool import ValidationPool, get_validation_pool
 
 
 @dataclass(frozen=True)
@@ -23,15 +22,23 @@ class MissionDispatchResult:
 
 
 class MissionDispatchService:
+    """Build, validate and commit VDA 5050 orders for assigned missions.
+
+    The order is written to the MQTT outbox in the same transaction as its ``MissionOrder`` and
+    message log; ``OutboxRelay`` publishes it once committed and sets ``published_at``.
+    """
+
     def __init__(
         self,
         session: AsyncSession,
-        publisher: MqttPublisher,
         event_bus: EventBus | None = None,
+        header_sequences: HeaderSequenceAllocator | None = None,
+        validation_pool: ValidationPool | None = None,
     ) -> None:
         self.session = session
-        self.publisher = publisher
         self.event_bus = event_bus or get_event_bus()
+        self.header_sequences = header_sequences or get_header_sequence_allocator()
+        self.validation_pool = validation_pool or get_validation_pool()
 
     async def dispatch_mission(self, mission_id: str) -> MissionDispatchResult:
         mission = await self.session.get(Mission, mission_id)
@@ -57,83 +64,71 @@ class MissionDispatchService:
         except ValueError as exc:
             return MissionDispatchResult(False, "", {}, [str(exc)])
 
-        latest_header_id = await self.session.scalar(
-            select(func.max(MissionOrder.header_id)).where(MissionOrder.robot_id == robot.id)
-        )
-        header_id = (latest_header_id or 0) + 1
-        payload = build_order(
-            manufacturer=robot.manufacturer,
-            serial_number=robot.serial_number,
-            header_id=header_id,
-            order_id=mission.id,
-            nodes=[
-                RouteNode(
-                    node_id=node.node_key,
-                    x=node.x,
-                    y=node.y,
-                    theta=node.theta,
-                    map_id=mission.map_id,
-                )
-                for node in planned_route.nodes
-            ],
-            edges=[
-                RouteEdge(
-                    edge_id=leg.edge_key,
-                    start_node_id=leg.from_node_key,
-                    end_node_id=leg.to_node_key,
-                )
-                for leg in planned_route.legs
-            ],
-        )
-        validation = validate_message("order", payload)
-        topic = build_topic(robot.manufacturer, robot.serial_number, "order")
-        mission_order = MissionOrder(
-            mission_id=mission.id,
-            robot_id=robot.id,
-            order_id=mission.id,
-            order_update_id=0,
-            header_id=header_id,
-            payload=payload,
-            validation_status="valid" if validation.valid else "invalid",
-        )
-        self.session.add(mission_order)
-        log = MqttMessageLog(
-            direction="outbound",
-            topic=topic,
-            qos=0,
-            retain=False,
-            robot_id=robot.id,
-            message_type="order",
-            payload=payload,
-            schema_valid=validation.valid,
-            validation_errors=validation.errors,
-        )
-        self.session.add(log)
-        if not validation.valid:
-            await self.session.commit()
-            self.event_bus.publish(
-                "vda.validation.failed",
-                robot_id=robot.id,
+        async with self.header_sequences.allocate(self.session, [robot.id], "order") as header_ids:
+            header_id = header_ids[robot.id]
+            payload = build_order(
+                manufacturer=robot.manufacturer,
+                serial_number=robot.serial_number,
+                header_id=header_id,
+                order_id=mission.id,
+                nodes=[
+                    RouteNode(
+                        node_id=node.node_key,
+                        x=node.x,
+                        y=node.y,
+                        theta=node.theta,
+                        map_id=mission.map_id,
+                    )
+                    for node in planned_route.nodes
+                ],
+                edges=[
+                    RouteEdge(
+                        edge_id=leg.edge_key,
+                        start_node_id=leg.from_node_key,
+                        end_node_id=leg.to_node_key,
+                    )
+                    for leg in planned_route.legs
+                ],
+            )
+            validation = await self.validation_pool.validate("order", payload)
+            topic = build_topic(robot.manufacturer, robot.serial_number, "order")
+            mission_order = MissionOrder(
                 mission_id=mission.id,
-                payload={"topic": topic, "messageType": "order", "errors": validation.errors},
+                robot_id=robot.id,
+                order_id=mission.id,
+                order_update_id=0,
+                header_id=header_id,
+                payload=payload,
+                validation_status="valid" if validation.valid else "invalid",
             )
-            return MissionDispatchResult(False, topic, payload, validation.errors)
+            self.session.add(mission_order)
+            log = MqttMessageLog(
+                direction="outbound",
+                topic=topic,
+                qos=0,
+                retain=False,
+                robot_id=robot.id,
+                message_type="order",
+                payload=payload,
+                schema_valid=validation.valid,
+                validation_errors=validation.errors,
+            )
+            self.session.add(log)
+            if not validation.valid:
+                await self.session.commit()
+                self.event_bus.publish(
+                    "vda.validation.failed",
+                    robot_id=robot.id,
+                    mission_id=mission.id,
+                    payload={"topic": topic, "messageType": "order", "errors": validation.errors},
+                )
+                return MissionDispatchResult(False, topic, payload, validation.errors)
 
-        try:
-            await self.publisher.publish(topic=topic, payload=payload, qos=0, retain=False)
-        except Exception:
-            mission_order.validation_status = "publish_failed"
+            self.session.add(
+                MqttOutboxMessage(robot_id=robot.id, message_log=log, mission_order=mission_order)
+            )
+            mission.status = "sent"
             await self.session.commit()
-            return MissionDispatchResult(False, topic, payload, ["MQTT publish failed"])
-        mission_order.published_at = datetime.now(UTC)
-        mission.status = "sent"
-        await self.session.commit()
-        self.event_bus.publish(
-            "mqtt.message.published",
-            robot_id=robot.id,
-            mission_id=mission.id,
-            payload={"messageId": log.id, "topic": topic, "messageType": "order"},
-        )
         self.event_bus.publish(
             "mission.dispatched",
             robot_id=robot.id,
@@ -1,44 +1,134 @@
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any
+from uuid import uuid4
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.db.base import Robot, RobotStateSnapshot
-from app.services.event_bus import EventBus, get_event_bus
+from app.db.base import AsyncSessionMaker, Robot, RobotStateSnapshot
+from app.services.event_bus import EventBus, PendingEvent, get_event_bus
+
+RobotIdentity = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class CachedRobot:
+    id: str
+    manufacturer: str
+    serial_number: str
+    display_name: str | None
+    last_connection_state: str
+
+    @classmethod
+    def from_robot(cls, robot: Robot) -> "CachedRobot":
+        return cls(
+            id=robot.id,
+            manufacturer=robot.manufacturer,
+            serial_number=robot.serial_number,
+            display_name=robot.display_name,
+            last_connection_state=robot.last_connection_state or "UNKNOWN",
+        )
+
+
+class RobotIdentityCache:
+    """Process-wide map from ``(manufacturer, serialNumber)`` to committed robot rows.
+
+    Entries are only written after the transaction that created or changed the robot has
+    committed, so a cached id always refers to an existing row.
+    """
+
+    def __init__(self) -> None:
+        self._robots: dict[RobotIdentity, CachedRobot] = {}
+
+    def __len__(self) -> int:
+        return len(self._robots)
+
+    def get(self, manufacturer: str, serial_number: str) -> CachedRobot | None:
+        return self._robots.get((manufacturer, serial_number))
+
+    def put(self, robot: CachedRobot) -> None:
+        self._robots[(robot.manufacturer, robot.serial_number)] = robot
+
+    def invalidate(self, manufacturer: str, serial_number: str) -> None:
+        self._robots.pop((manufacturer, serial_number), None)
+
+    def clear(self) -> None:
+        self._robots.clear()
+
+    async def warm(self, session: AsyncSession) -> int:
+        robots = (await session.execute(select(Robot))).scalars()
+        for robot in robots:
+            self.put(CachedRobot.from_robot(robot))
+        return len(self._robots)
+
+
+robot_identity_cache = RobotIdentityCache()
+
+
+def get_robot_identity_cache() -> RobotIdentityCache:
+    return robot_identity_cache
+
+
+async def warm_robot_identity_cache(
+    session_maker: async_sessionmaker[AsyncSession] = AsyncSessionMaker,
+) -> int:
+    async with session_maker() as session:
+        return await robot_identity_cache.warm(session)
 
 
 class RobotRegistryService:
-    def __init__(self, session: AsyncSession, event_bus: EventBus | None = None) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        event_bus: EventBus | None = None,
+        identity_cache: RobotIdentityCache | None = None,
+    ) -> None:
         self.session = session
         self.event_bus = event_bus or get_event_bus()
+        self.identity_cache = identity_cache or get_robot_identity_cache()
 
     async def get_or_create(
         self, manufacturer: str, serial_number: str, display_name: str | None = None
     ) -> Robot:
+        robot = await self.find(manufacturer, serial_number)
+        if robot is not None:
+            if display_name and robot.display_name != display_name:
+                robot.display_name = display_name
+                self._touch(robot)
+                await self._commit_and_refresh(robot)
+            self.identity_cache.put(CachedRobot.from_robot(robot))
+            return robot
+
+        robot, event = self.stage_robot(manufacturer, serial_number, display_name)
+        await self.session.commit()
+        await self.session.refresh(robot)
+        self.identity_cache.put(CachedRobot.from_robot(robot))
+        self.event_bus.publish_pending([event])
+        return robot
+
+    async def find(self, manufacturer: str, serial_number: str) -> Robot | None:
         result = await self.session.execute(
             select(Robot).where(
                 Robot.manufacturer == manufacturer,
                 Robot.serial_number == serial_number,
             )
         )
-        robot = result.scalar_one_or_none()
-        if robot is not None:
-            if display_name and robot.display_name != display_name:
-                robot.display_name = display_name
-                await self._touch_and_commit(robot)
-            return robot
+        return result.scalar_one_or_none()
 
+    def stage_robot(
+        self, manufacturer: str, serial_number: str, display_name: str | None = None
+    ) -> tuple[Robot, PendingEvent]:
+        """Add a new robot to the session without committing it."""
         robot = Robot(
+            id=str(uuid4()),
             manufacturer=manufacturer,
             serial_number=serial_number,
             display_name=display_name,
-            last_seen_at=datetime.now(UTC),
         )
+        self._touch(robot)
         self.session.add(robot)
-        await self.session.commit()
-        await self.session.refresh(robot)
-        self.event_bus.publish(
+        return robot, PendingEvent(
             "robot.discovered",
             robot_id=robot.id,
             payload={
@@ -46,37 +136,79 @@ class RobotRegistryService:
                 "serialNumber": robot.serial_number,
             },
         )
-        return robot
 
     async def update_connection_state(self, robot_id: str, state: str) -> Robot:
         robot = await self._get_robot_or_raise(robot_id)
-        robot.last_connection_state = state
-        await self._touch_and_commit(robot)
-        self.event_bus.publish(
+        event = self.apply_connection_state(robot, state)
+        await self._commit_and_refresh(robot)
+        self.identity_cache.put(CachedRobot.from_robot(robot))
+        self.event_bus.publish_pending([event])
+        return robot
+
+    def apply_connection_state(self, robot: Robot, state: str) -> PendingEvent:
+        values, event = self.connection_update(robot.id, state)
+        self._apply_values(robot, values)
+        return event
+
+    def connection_update(self, robot_id: str, state: str) -> tuple[dict[str, Any], PendingEvent]:
+        """Column values and event for a connection change, for id-based batch updates."""
+        return {"last_connection_state": state}, PendingEvent(
             "robot.connection.updated",
-            robot_id=robot.id,
+            robot_id=robot_id,
             payload={"connectionState": state},
         )
-        return robot
 
     async def update_factsheet(self, robot_id: str, factsheet: dict[str, Any]) -> Robot:
         robot = await self._get_robot_or_raise(robot_id)
-        robot.factsheet = factsheet
-        robot.capabilities = self._extract_capabilities(factsheet)
-        await self._touch_and_commit(robot)
-        self.event_bus.publish(
-            "robot.factsheet.updated", robot_id=robot.id, payload=factsheet
-        )
+        event = self.apply_factsheet(robot, factsheet)
+        await self._commit_and_refresh(robot)
+        self.identity_cache.put(CachedRobot.from_robot(robot))
+        self.event_bus.publish_pending([event])
         return robot
 
+    def apply_factsheet(self, robot: Robot, factsheet: dict[str, Any]) -> PendingEvent:
+        values, event = self.factsheet_update(robot.id, factsheet)
+        self._apply_values(robot, values)
+        return event
+
+    def factsheet_update(
+        self, robot_id: str, factsheet: dict[str, Any]
+    ) -> tuple[dict[str, Any], PendingEvent]:
+        """Column values and event for a factsheet change, for id-based batch updates."""
+        values = {
+            "factsheet": factsheet,
+            "capabilities": self._extract_capabilities(factsheet),
+        }
+        return values, PendingEvent("robot.factsheet.updated", robot_id=robot_id, payload=factsheet)
+
+    async def update_robots(self, values_by_robot_id: dict[str, dict[str, Any]]) -> None:
+        """Write staged column values and ``last_seen_at`` without loading the robots."""
+        now = datetime.now(UTC)
+        for robot_id, values in values_by_robot_id.items():
+            await self.session.execute(
+                update(Robot).where(Robot.id == robot_id).values(**values, last_seen_at=now)
+            )
+
     async def save_state_snapshot(
         self, robot_id: str, payload: dict[str, Any]
     ) -> RobotStateSnapshot:
         robot = await self._get_robot_or_raise(robot_id)
+        self._touch(robot)
+        snapshot, event = self.stage_state_snapshot(robot.id, payload)
+        await self.session.commit()
+        await self.session.refresh(snapshot)
+        self.event_bus.publish_pending([event])
+        return snapshot
+
+    def stage_state_snapshot(
+        self, robot_id: str, payload: dict[str, Any]
+    ) -> tuple[RobotStateSnapshot, PendingEvent]:
+        """Add a state snapshot to the session without committing it."""
         battery_state = payload.get("batteryState") or {}
         power_supply = payload.get("powerSupply") or {}
         snapshot = RobotStateSnapshot(
-            robot_id=robot.id,
+            id=str(uuid4()),
+            robot_id=robot_id,
             header_id=payload.get("headerId"),
             order_id=payload.get("orderId"),
             order_update_id=payload.get("orderUpdateId"),
@@ -92,12 +224,8 @@ class RobotRegistryService:
             action_states=payload.get("actionStates"),
             raw_payload=payload,
         )
-        robot.last_seen_at = datetime.now(UTC)
         self.session.add(snapshot)
-        await self.session.commit()
-        await self.session.refresh(snapshot)
-        self.event_bus.publish("robot.state.updated", robot_id=robot.id, payload=payload)
-        return snapshot
+        return snapshot, PendingEvent("robot.state.updated", robot_id=robot_id, payload=payload)
 
     async def get_latest_state(self, robot_id: str) -> RobotStateSnapshot | None:
         result = await self.session.execute(
@@ -114,8 +242,15 @@ class RobotRegistryService:
             raise ValueError(f"Robot not found: {robot_id}")
         return robot
 
-    async def _touch_and_commit(self, robot: Robot) -> None:
+    def _apply_values(self, robot: Robot, values: dict[str, Any]) -> None:
+        for name, value in values.items():
+            setattr(robot, name, value)
+        self._touch(robot)
+
+    def _touch(self, robot: Robot) -> None:
         robot.last_seen_at = datetime.now(UTC)
+
+    async def _commit_and_refresh(self, robot: Robot) -> None:
         await self.session.commit()
         await self.session.refresh(robot)
 
@@ -0,0 +1,91 @@
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+from typing import Any
+
+from app.core.config import get_settings
+from app.services.robot_registry import RobotIdentity
+
+
+@dataclass(frozen=True)
+class VisualizationSample:
+    header_id: int | None
+    timestamp: str | None
+    received_at: datetime
+    agv_position: dict[str, Any] | None
+    velocity: dict[str, Any] | None
+    # False if a field of the payload had the wrong type and was left out.
+    well_formed: bool = True
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "VisualizationSample":
+        """Sample from an unvalidated payload; fields of the wrong type become ``None``."""
+        header_id = payload.get("headerId")
+        timestamp = payload.get("timestamp")
+        agv_position = payload.get("agvPosition")
+        velocity = payload.get("velocity")
+        sample = cls(
+            header_id=(
+                header_id
+                if isinstance(header_id, int) and not isinstance(header_id, bool)
+                else None
+            ),
+            timestamp=timestamp if isinstance(timestamp, str) else None,
+            received_at=datetime.now(UTC),
+            agv_position=agv_position if isinstance(agv_position, dict) else None,
+            velocity=velocity if isinstance(velocity, dict) else None,
+        )
+        if (
+            (sample.header_id is None and header_id is not None)
+            or (sample.timestamp is None and timestamp is not None)
+            or (sample.agv_position is None and agv_position is not None)
+            or (sample.velocity is None and velocity is not None)
+        ):
+            return replace(sample, well_formed=False)
+        return sample
+
+
+class VisualizationBuffer:
+    """The last ``size`` visualization samples per robot, held in memory only.
+
+    Robots publish ``visualization`` at 10 Hz or more; the samples are only useful while fresh,
+    so they are kept in a fixed-size ring per robot instead of the database.
+    """
+
+    def __init__(self, size: int = 100) -> None:
+        if size < 1:
+            raise ValueError("size must be positive")
+        self.size = size
+        self._samples: dict[RobotIdentity, deque[VisualizationSample]] = {}
+        self._received: dict[RobotIdentity, int] = {}
+
+    def record(
+        self, manufacturer: str, serial_number: str, payload: dict[str, Any]
+    ) -> tuple[VisualizationSample, int]:
+        """Store a sample and return it with the number of samples received for the robot."""
+        key = (manufacturer, serial_number)
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.size)
+        sample = VisualizationSample.from_payload(payload)
+        samples.append(sample)
+        received = self._received[key] = self._received.get(key, 0) + 1
+        return sample, received
+
+    def samples(
+        self, manufacturer: str, serial_number: str, limit: int | None = None
+    ) -> list[VisualizationSample]:
+        """Buffered samples for a robot, oldest first, at most the newest ``limit``."""
+        samples = list(self._samples.get((manufacturer, serial_number), ()))
+        return samples[-limit:] if limit else samples
+
+    def clear(self) -> None:
+        self._samples.clear()
+        self._received.clear()
+
+
+visualization_buffer = VisualizationBuffer(get_settings().mqtt_visualization_buffer_size)
+
+
+def get_visualization_buffer() -> VisualizationBuffer:
+    return visualization_buffer
@@ -0,0 +1,16 @@
+"""Write checked, normalized copies of the VDA 5050 schemas for fast startup.
+
+Run from ``backend/`` with ``uv run python -m app.vda5050.build_schemas``; the Docker image does
+this at build time.
+"""
+
+from app.vda5050.validator import write_normalized_schemas
+
+
+def main() -> None:
+    for path in write_normalized_schemas():
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Compile VDA 5050 JSON schemas into plain Python predicates.
+
+The generated functions only answer "is this payload valid?". They implement the keywords the
+v3.0.0 schemas use with the same semantics as ``jsonschema``. Any other keyword, including ones
+this module does not know, is rejected with ``UnsupportedSchemaError``, so callers fall back to
+``jsonschema`` instead of silently accepting too much.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+Predicate = Callable[[Any], bool]
+
+# Keywords that never affect validity. `format` is an annotation unless a format checker is
+# configured, and `validate_message` does not configure one.
+_ANNOTATIONS = frozenset(
+    {
+        "$schema",
+        "$comment",
+        "title",
+        "description",
+        "examples",
+        "default",
+        "format",
+        "definitions",
+        "$defs",
+        "deprecated",
+        "readOnly",
+        "writeOnly",
+    }
+)
+# Keywords that appear in the VDA 5050 schema files but are not JSON Schema keywords.
+_IGNORED = frozenset({"unit", "subtopic"})
+# Validation keywords the compiler implements; any other keyword is rejected.
+_SUPPORTED = frozenset(
+    {
+        "$ref",
+        "type",
+        "enum",
+        "const",
+        "minimum",
+        "maximum",
+        "exclusiveMinimum",
+        "exclusiveMaximum",
+        "required",
+        "properties",
+        "items",
+        "minItems",
+        "maxItems",
+        "allOf",
+        "if",
+        "then",
+        "else",
+    }
+)
+_TYPE_CHECKS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    # Like jsonschema, a float without a fractional part is an integer.
+    "integer": (
+        "((isinstance({v}, int) and not isinstance({v}, bool))"
+        " or (isinstance({v}, float) and {v}.is_integer()))"
+    ),
+}
+_IS_NUMBER = "(isinstance({v}, (int, float)) and not isinstance({v}, bool))"
+_MISSING = object()
+
+
+class UnsupportedSchemaError(ValueError):
+    pass
+
+
+class _Compiler:
+    def __init__(self, root: dict[str, Any]) -> None:
+        self.root = root
+        self.lines: list[str] = []
+        self.constants: dict[str, Any] = {"_MISSING": _MISSING}
+        self._functions = 0
+        self._refs: dict[str, str] = {}
+
+    def function(self, schema: Any) -> str:
+        """Emit a function validating ``schema`` and return its name."""
+        name = f"_check_{self._functions}"
+        self._functions += 1
+        body: list[str] = []
+        self._emit(schema, "v", body, "    ")
+        self.lines.append(f"def {name}(v):")
+        self.lines.extend(body)
+        self.lines.append("    return True")
+        self.lines.append("")
+        return name
+
+    def ref(self, reference: str) -> str:
+        if reference not in self._refs:
+            if not reference.startswith("#/"):
+                raise UnsupportedSchemaError(f"Unsupported $ref: {reference}")
+            target: Any = self.root
+            for part in reference[2:].split("/"):
+                target = target[part.replace("~1", "/").replace("~0", "~")]
+            # Registered before compiling the target, so recursive references terminate.
+            self._refs[reference] = f"_check_{self._functions}"
+            compiled = self.function(target)
+            self._refs[reference] = compiled
+        return self._refs[reference]
+
+    def constant(self, value: Any) -> str:
+        name = f"_const_{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def _emit(self, schema: Any, v: str, out: list[str], indent: str) -> None:
+        if schema is True:
+            return
+        if schema is False:
+            out.append(f"{indent}return False")
+            return
+        if not isinstance(schema, dict):
+            raise UnsupportedSchemaError(f"Schema must be an object or boolean: {schema!r}")
+        unsupported = sorted(set(schema) - _SUPPORTED - _ANNOTATIONS - _IGNORED)
+        if unsupported:
+            raise UnsupportedSchemaError(f"Unsupported keywords: {', '.join(unsupported)}")
+
+        if "$ref" in schema:
+            out.append(f"{indent}if not {self.ref(schema['$ref'])}({v}): return False")
+        if "type" in schema:
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            if set(_TYPE_CHECKS) - set(types):
+                checks = " or ".join(_TYPE_CHECKS[name].format(v=v) for name in types)
+                out.append(f"{indent}if not ({checks}): return False")
+        if "enum" in schema:
+            out.append(f"{indent}if not ({self._one_of(schema['enum'], v)}): return False")
+        if "const" in schema:
+            out.append(f"{indent}if not ({self._one_of([schema['const']], v)}): return False")
+        self._emit_number(schema, v, out, indent)
+        self._emit_object(schema, v, out, indent)
+        self._emit_array(schema, v, out, indent)
+        for subschema in schema.get("allOf", []):
+            out.append(f"{indent}if not {self.function(subschema)}({v}): return False")
+        if "if" in schema and ("then" in schema or "else" in schema):
+            condition = f"{self.function(schema['if'])}({v})"
+            if "then" in schema:
+                then = self.function(schema["then"])
+                out.append(f"{indent}if {condition} and not {then}({v}): return False")
+            if "else" in schema:
+                otherwise = self.function(schema["else"])
+                out.append(f"{indent}if not {condition} and not {otherwise}({v}): return False")
+
+    def _one_of(self, values: list[Any], v: str) -> str:
+        # `1 == True` in Python but not in JSON Schema; only strings and null compare safely.
+        if not all(isinstance(value, str) or value is None for value in values):
+            raise UnsupportedSchemaError(f"Unsupported enum values: {values!r}")
+        return f"{v} in {self.constant(tuple(values))}"
+
+    def _emit_number(self, schema: dict[str, Any], v: str, out: list[str], indent: str) -> None:
+        bounds = [
+            (keyword, operator)
+            for keyword, operator in (
+                ("minimum", ">="),
+                ("maximum", "<="),
+                ("exclusiveMinimum", ">"),
+                ("exclusiveMaximum", "<"),
+            )
+            if keyword in schema
+        ]
+        if not bounds:
+            return
+        out.append(f"{indent}if {_IS_NUMBER.format(v=v)}:")
+        for keyword, operator in bounds:
+            limit = self.constant(schema[keyword])
+            out.append(f"{indent}    if not {v} {operator} {limit}: return False")
+
+    def _emit_object(self, schema: dict[str, Any], v: str, out: list[str], indent: str) -> None:
+        required = schema.get("required", [])
+        properties = schema.get("properties", {})
+        if not required and not properties:
+            return
+        out.append(f"{indent}if isinstance({v}, dict):")
+        if required:
+            keys = self.constant(frozenset(required))
+            out.append(f"{indent}    if not {keys} <= {v}.keys(): return False")
+        for index, (key, subschema) in enumerate(properties.items()):
+            if check_is_trivial(subschema):
+                continue
+            check = self.function(subschema)
+            item = f"{v}_{index}"
+            out.append(f"{indent}    {item} = {v}.get({key!r}, _MISSING)")
+            out.append(
+                f"{indent}    if {item} is not _MISSING and not {check}({item}): return False"
+            )
+
+    def _emit_array(self, schema: dict[str, Any], v: str, out: list[str], indent: str) -> None:
+        checks = [keyword for keyword in ("items", "minItems", "maxItems") if keyword in schema]
+        if not checks:
+            return
+        out.append(f"{indent}if isinstance({v}, list):")
+        if "minItems" in schema:
+            out.append(f"{indent}    if len({v}) < {int(schema['minItems'])}: return False")
+        if "maxItems" in schema:
+            out.append(f"{indent}    if len({v}) > {int(schema['maxItems'])}: return False")
+        if "items" in schema:
+            if not isinstance(schema["items"], dict | bool):
+                raise UnsupportedSchemaError("Array form of items is not supported")
+            check = self.function(schema["items"])
+            out.append(f"{indent}    for item in {v}:")
+            out.append(f"{indent}        if not {check}(item): return False")
+
+
+def check_is_trivial(schema: Any) -> bool:
+    """Whether ``schema`` accepts every instance, so the check can be skipped."""
+    if schema is True:
+        return True
+    return isinstance(schema, dict) and not (set(schema) - _ANNOTATIONS - _IGNORED)
+
+
+def compile_schema(schema: dict[str, Any]) -> Predicate:
+    """Return a function that is ``True`` exactly for instances valid against ``schema``."""
+    compiler = _Compiler(schema)
+    entry = compiler.function(schema)
+    source = "\n".join(compiler.lines)
+    namespace: dict[str, Any] = dict(compiler.constants)
+    exec(compile(source, f"<vda5050 schema {schema.get('title', '')}>", "exec"), namespace)
+    predicate: Predicate = namespace[entry]
+    return predicate
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from app.core.config import Settings, get_settings
+from app.mqtt.codec import encode_payload
+from app.vda5050.validator import ValidationResult, compile_validators, validate_message
+
+logger = logging.getLogger(__name__)
+
+
+class ValidationPool:
+    """Validate large payloads in worker processes so the event loop keeps serving requests.
+
+    Payloads of at least ``min_payload_bytes`` encoded bytes are validated by
+    ``validate_message`` in a ``ProcessPoolExecutor`` with ``processes`` workers; each worker
+    builds every validator once when it starts. Smaller payloads, and every payload while the
+    pool is not started or ``processes`` is 0, are validated inline: sending a payload to a
+    worker costs about half as much as validating it with the compiled schemas.
+    """
+
+    def __init__(self, processes: int = 0, min_payload_bytes: int = 65536) -> None:
+        if processes < 0:
+            raise ValueError("processes must not be negative")
+        self.processes = processes
+        self.min_payload_bytes = min_payload_bytes
+        self.offloaded = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ValidationPool":
+        return cls(
+            settings.vda5050_validation_processes,
+            settings.vda5050_validation_offload_bytes,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        if self.processes and self._executor is None:
+            # Forking a process that runs the event loop and client threads is not safe.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=compile_validators,
+            )
+
+    async def stop(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def validate(
+        self, message_type: str, payload: dict[str, Any], *, size: int | None = None
+    ) -> ValidationResult:
+        """Validate like ``validate_message``, off the event loop if ``payload`` is large.
+
+        ``size`` is the encoded payload size when the caller already knows it, such as the
+        length of a received MQTT payload; otherwise the payload is encoded to measure it.
+        """
+        executor = self._executor
+        if executor is None:
+            return validate_message(message_type, payload)
+        if size is None:
+            size = len(encode_payload(payload))
+        if size < self.min_payload_bytes:
+            return validate_message(message_type, payload)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor, validate_message, message_type, payload
+            )
+        except BrokenProcessPool:
+            logger.exception("Validation worker died; validating %s inline", message_type)
+            return validate_message(message_type, payload)
+        self.offloaded += 1
+        return result
+
+
+validation_pool = ValidationPool.from_settings(get_settings())
+
+
+def get_validation_pool() -> ValidationPool:
+    return validation_pool
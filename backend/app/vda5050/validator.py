@@ -1,3 +1,7 @@
+import json
+import logging
+import re
+import time
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
@@ -5,6 +9,11 @@ from typing import Any, cast
 
 import jsonschema
 
+from app.core.config import get_settings
+from app.vda5050.compiled import Predicate, UnsupportedSchemaError, compile_schema
+
+logger = logging.getLogger(__name__)
+
 SUPPORTED_MESSAGE_TYPES = {
     "order",
     "instantActions",
@@ -24,15 +33,16 @@ class ValidationResult:
     errors: list[str]
 
 
-@lru_cache
-def _load_schema(message_type: str) -> dict[str, Any]:
-    schema_path = SCHEMA_DIR / f"{message_type}.schema.json"
-    if not schema_path.exists():
-        raise FileNotFoundError(f"VDA 5050 schema not found: {schema_path}")
-    import json
-    import re
+def schema_path(message_type: str, schema_dir: Path | None = None) -> Path:
+    return (schema_dir or SCHEMA_DIR) / f"{message_type}.schema.json"
+
+
+def normalized_schema_path(message_type: str, schema_dir: Path | None = None) -> Path:
+    """Where ``write_normalized_schemas`` puts the build-time copy of a schema."""
+    return (schema_dir or SCHEMA_DIR) / f"{message_type}.schema.normalized.json"
+
 
-    raw_schema = schema_path.read_text(encoding="utf-8")
+def normalize_schema(raw_schema: str) -> dict[str, Any]:
     # The upstream VDA 5050 v3.0.0 schema files currently contain a few
     # JSON-with-comments style trailing commas. Keep the files verbatim for
     # traceability and normalize only while loading.
@@ -40,18 +50,86 @@ def _load_schema(message_type: str) -> dict[str, Any]:
     return cast(dict[str, Any], json.loads(normalized_schema))
 
 
+@lru_cache
+def _load_schema_source(message_type: str) -> tuple[dict[str, Any], bool]:
+    """The schema of ``message_type`` and whether it was already checked at build time.
+
+    A normalized copy written by ``write_normalized_schemas`` is used unless the original file
+    changed after it was written.
+    """
+    path = schema_path(message_type)
+    if not path.exists():
+        raise FileNotFoundError(f"VDA 5050 schema not found: {path}")
+    normalized_path = normalized_schema_path(message_type)
+    if normalized_path.exists() and normalized_path.stat().st_mtime >= path.stat().st_mtime:
+        return cast(dict[str, Any], json.loads(normalized_path.read_bytes())), True
+    return normalize_schema(path.read_text(encoding="utf-8")), False
+
+
+def _load_schema(message_type: str) -> dict[str, Any]:
+    return _load_schema_source(message_type)[0]
+
+
 @lru_cache
 def _validator(message_type: str) -> jsonschema.protocols.Validator:
-    schema = _load_schema(message_type)
+    schema, checked = _load_schema_source(message_type)
     cls = jsonschema.validators.validator_for(schema)
-    cls.check_schema(schema)
+    if not checked:
+        cls.check_schema(schema)
     return cls(schema)
 
 
+def write_normalized_schemas(schema_dir: Path | None = None) -> list[Path]:
+    """Check every supported schema and write it as plain JSON next to the original.
+
+    Run at build time, so loading a schema at startup is a single ``json.loads`` and skips the
+    trailing comma clean-up and the metaschema check.
+    """
+    written = []
+    for message_type in sorted(SUPPORTED_MESSAGE_TYPES):
+        schema = normalize_schema(schema_path(message_type, schema_dir).read_text(encoding="utf-8"))
+        jsonschema.validators.validator_for(schema).check_schema(schema)
+        path = normalized_schema_path(message_type, schema_dir)
+        path.write_text(json.dumps(schema, ensure_ascii=False), encoding="utf-8")
+        written.append(path)
+    return written
+
+
+@lru_cache
+def _compiled_validator(message_type: str) -> Predicate | None:
+    try:
+        return compile_schema(_load_schema(message_type))
+    except UnsupportedSchemaError as exc:
+        logger.warning("Validating %s with jsonschema only: %s", message_type, exc)
+        return None
+
+
+def compile_validators() -> float:
+    """Compile every supported schema up front instead of on its first message.
+
+    Returns the seconds it took; nothing is compiled twice in one process.
+    """
+    started = time.perf_counter()
+    for message_type in SUPPORTED_MESSAGE_TYPES:
+        _validator(message_type)
+        _compiled_validator(message_type)
+    return time.perf_counter() - started
+
+
 def validate_message(message_type: str, payload: dict[str, Any]) -> ValidationResult:
+    """Validate ``payload`` against its VDA 5050 schema.
+
+    In the default ``compiled`` mode a generated predicate accepts valid payloads without
+    collecting errors; ``jsonschema`` only runs to report why a payload is invalid.
+    """
     if message_type not in SUPPORTED_MESSAGE_TYPES:
         return ValidationResult(False, [f"Unsupported VDA 5050 message type: {message_type}"])
 
+    if get_settings().vda5050_validation_mode == "compiled":
+        is_valid = _compiled_validator(message_type)
+        if is_valid is not None and is_valid(payload):
+            return ValidationResult(True, [])
+
     validator = _validator(message_type)
     errors = sorted(validator.iter_errors(payload), key=lambda error: list(error.path))
     if not errors:
@@ -0,0 +1,55 @@
+"""Per-message cost of decoding and encoding VDA 5050 payloads.
+
+Run from ``backend/`` with ``uv run python -m benchmarks.codec``.
+"""
+
+import argparse
+import json
+import timeit
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from app.mqtt.codec import decode_payload, encode_payload
+from benchmarks.payloads import order_payload, state_payload
+
+
+def stdlib_decode(data: bytes) -> Any:
+    return json.loads(data.decode("utf-8"))
+
+
+def stdlib_encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def per_call_microseconds(function: Callable[[], Any], number: int, repeat: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'payload':<8} {'bytes':>6} {'operation':<9} {'json us':>8} {'orjson us':>9} "
+        f"{'speedup':>7}"
+    )
+    for name, payload in (("state", state_payload()), ("order", order_payload())):
+        data = encode_payload(payload)
+        timings = {
+            "decode": (partial(stdlib_decode, data), partial(decode_payload, data)),
+            "encode": (partial(stdlib_encode, payload), partial(encode_payload, payload)),
+        }
+        for operation, (baseline, candidate) in timings.items():
+            baseline_us = per_call_microseconds(baseline, args.number, args.repeat)
+            candidate_us = per_call_microseconds(candidate, args.number, args.repeat)
+            print(
+                f"{name:<8} {len(data):>6} {operation:<9} {baseline_us:>8.2f} "
+                f"{candidate_us:>9.2f} {baseline_us / candidate_us:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
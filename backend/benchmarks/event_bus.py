@@ -0,0 +1,53 @@
+"""Throughput of ``EventBus.publish`` for a ``robot.state.updated`` event.
+
+Run from ``backend/`` with ``uv run python -m benchmarks.event_bus``.
+"""
+
+import argparse
+import asyncio
+import timeit
+from contextlib import AsyncExitStack
+from functools import partial
+
+from app.services.event_bus import EventBus, EventFilter
+from benchmarks.payloads import state_payload
+
+
+async def publish_microseconds(
+    subscribers: int, event_filter: EventFilter | None, number: int, repeat: int
+) -> float:
+    event_bus = EventBus()
+    publish = partial(
+        event_bus.publish, "robot.state.updated", robot_id="robot-0", payload=state_payload()
+    )
+    async with AsyncExitStack() as stack:
+        for _ in range(subscribers):
+            await stack.enter_async_context(event_bus.subscribe(event_filter))
+        # Subscriber queues stay full, so each publish also pays for dropping the oldest event.
+        return min(timeit.repeat(publish, number=number, repeat=repeat)) / number * 1_000_000
+
+
+async def run(number: int, repeat: int) -> None:
+    other_robot = EventFilter(robot_ids=frozenset({"robot-1"}))
+    cases = [
+        ("0 subscribers", 0, None),
+        ("1 subscriber", 1, None),
+        ("100 subscribers", 100, None),
+        ("100 other robots", 100, other_robot),
+    ]
+    print(f"{'case':<18} {'us/publish':>10} {'publish/s':>10}")
+    for name, subscribers, event_filter in cases:
+        micros = await publish_microseconds(subscribers, event_filter, number, repeat)
+        print(f"{name:<18} {micros:>10.2f} {1_000_000 / micros:>10.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.number, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Realistic VDA 5050 v3.0.0 payloads shared by the benchmarks."""
+
+from datetime import UTC, datetime
+from typing import Any
+
+from app.vda5050.order_builder import RouteEdge, RouteNode, build_order
+
+MANUFACTURER = "ResearchBot"
+SERIAL_NUMBER = "RB-BENCH-001"
+
+
+def state_payload(node_count: int = 10) -> dict[str, Any]:
+    node_ids = [f"N{index}" for index in range(node_count)]
+    return {
+        "headerId": 4711,
+        "timestamp": "2026-06-25T13:00:01.000Z",
+        "version": "3.0.0",
+        "manufacturer": MANUFACTURER,
+        "serialNumber": SERIAL_NUMBER,
+        "orderId": "order-bench",
+        "orderUpdateId": 3,
+        "lastNodeId": node_ids[0],
+        "lastNodeSequenceId": 0,
+        "nodeStates": [
+            {
+                "nodeId": node_id,
+                "sequenceId": index * 2,
+                "released": True,
+                "nodePosition": {"x": float(index), "y": 2.5, "theta": 0.0, "mapId": "lab"},
+            }
+            for index, node_id in enumerate(node_ids[1:], start=1)
+        ],
+        "edgeStates": [
+            {"edgeId": f"E{index}", "sequenceId": index * 2 + 1, "released": True}
+            for index in range(node_count - 1)
+        ],
+        "driving": True,
+        "actionStates": [
+            {"actionId": f"action-{index}", "actionType": "pick", "actionStatus": "WAITING"}
+            for index in range(3)
+        ],
+        "instantActionStates": [],
+        "agvPosition": {
+            "x": 0.42,
+            "y": 2.5,
+            "theta": 0.0,
+            "mapId": "lab",
+            "localized": True,
+            "localizationScore": 0.97,
+        },
+        "velocity": {"vx": 0.8, "vy": 0.0, "omega": 0.0},
+        "powerSupply": {"stateOfCharge": 76.5, "charging": False, "batteryVoltage": 48.2},
+        "operatingMode": "AUTOMATIC",
+        "errors": [],
+        "information": [],
+        "safetyState": {"activeEmergencyStop": "NONE", "fieldViolation": False},
+    }
+
+
+def order_payload(node_count: int = 10) -> dict[str, Any]:
+    nodes = [
+        RouteNode(node_id=f"N{index}", x=float(index), y=2.5, theta=0.0, map_id="lab")
+        for index in range(node_count)
+    ]
+    edges = [
+        RouteEdge(edge_id=f"E{index}", start_node_id=f"N{index}", end_node_id=f"N{index + 1}")
+        for index in range(node_count - 1)
+    ]
+    return build_order(
+        manufacturer=MANUFACTURER,
+        serial_number=SERIAL_NUMBER,
+        header_id=4711,
+        order_id="order-bench",
+        nodes=nodes,
+        edges=edges,
+        timestamp=datetime(2026, 6, 25, 13, 0, 0, tzinfo=UTC),
+    )
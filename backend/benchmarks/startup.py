@@ -0,0 +1,58 @@
+"""Time the validator warm-up done at startup, with and without pre-normalized schemas.
+
+Each measurement runs in a fresh interpreter, like a booting backend. Run from ``backend/`` with
+``uv run python -m benchmarks.startup``.
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from app.vda5050.validator import SCHEMA_DIR, write_normalized_schemas
+
+WARM_UP = """
+import sys
+from pathlib import Path
+from app.vda5050 import validator
+validator.SCHEMA_DIR = Path(sys.argv[1])
+print(validator.compile_validators())
+"""
+
+
+def warm_up_milliseconds(schema_dir: Path, repeat: int) -> float:
+    runs = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", WARM_UP, str(schema_dir)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(repeat)
+    ]
+    return min(runs) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        schema_dir = Path(directory) / "schemas"
+        shutil.copytree(SCHEMA_DIR, schema_dir, ignore=shutil.ignore_patterns("*.normalized.json"))
+        raw_ms = warm_up_milliseconds(schema_dir, args.repeat)
+        write_normalized_schemas(schema_dir)
+        normalized_ms = warm_up_milliseconds(schema_dir, args.repeat)
+
+    print(f"{'schemas':<15} {'warm-up ms':>10}")
+    print(f"{'original':<15} {raw_ms:>10.1f}")
+    print(f"{'pre-normalized':<15} {normalized_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Per-message cost of validating VDA 5050 payloads with jsonschema and compiled predicates.
+
+Run from ``backend/`` with ``uv run python -m benchmarks.validation``.
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from app.vda5050.compiled import compile_schema
+from app.vda5050.instant_actions import build_instant_actions
+from app.vda5050.validator import _load_schema, _validator
+from benchmarks.payloads import MANUFACTURER, SERIAL_NUMBER, order_payload, state_payload
+
+
+def jsonschema_validate(message_type: str, payload: dict[str, Any]) -> bool:
+    # What `validate_message` did for every message before the compiled mode.
+    validator = _validator(message_type)
+    errors = sorted(validator.iter_errors(payload), key=lambda error: list(error.path))
+    return not errors
+
+
+def per_call_microseconds(function: Callable[[], Any], number: int, repeat: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = {
+        "state": state_payload(),
+        "order": order_payload(),
+        "instantActions": build_instant_actions(
+            manufacturer=MANUFACTURER,
+            serial_number=SERIAL_NUMBER,
+            header_id=1,
+            action_id="action-bench",
+            action_type="cancelOrder",
+        ),
+        "connection": {
+            "headerId": 1,
+            "timestamp": "2026-06-25T13:00:00.000Z",
+            "version": "3.0.0",
+            "manufacturer": MANUFACTURER,
+            "serialNumber": SERIAL_NUMBER,
+            "connectionState": "ONLINE",
+        },
+    }
+    print(f"{'message type':<15} {'jsonschema us':>13} {'compiled us':>11} {'speedup':>7}")
+    for message_type, payload in payloads.items():
+        is_valid = compile_schema(_load_schema(message_type))
+        assert is_valid(payload) and jsonschema_validate(message_type, payload)
+        baseline_us = per_call_microseconds(
+            partial(jsonschema_validate, message_type, payload), args.number, args.repeat
+        )
+        compiled_us = per_call_microseconds(partial(is_valid, payload), args.number, args.repeat)
+        print(
+            f"{message_type:<15} {baseline_us:>13.2f} {compiled_us:>11.2f} "
+            f"{baseline_us / compiled_us:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from collections.abc import Iterator
+
+import pytest
+
+from app.mqtt.validation_sampler import get_validation_sampler
+from app.services.header_sequence import get_header_sequence_allocator
+from app.services.robot_registry import get_robot_identity_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_process_caches() -> Iterator[None]:
+    # Every test gets a fresh database, so ids and leases cached by an earlier test are
+    # meaningless.
+    get_robot_identity_cache().clear()
+    get_header_sequence_allocator().clear()
+    get_validation_sampler().clear()
+    yield
+    get_robot_identity_cache().clear()
+    get_header_sequence_allocator().clear()
+    get_validation_sampler().clear()
@@ -1,3 +1,7 @@
+import time
+
+import pytest
+from fastapi import WebSocketDisconnect
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -28,3 +32,37 @@ def test_websocket_streams_domain_events_and_removes_disconnected_clients() -> N
             assert event_bus.subscriber_count == 0
     finally:
         app.dependency_overrides.clear()
+
+
+def test_websocket_subscribe_message_filters_events() -> None:
+    event_bus = EventBus()
+    app.dependency_overrides[get_event_bus] = lambda: event_bus
+
+    try:
+        with TestClient(app) as client:
+            with client.websocket_connect("/api/v1/events/ws") as websocket:
+                websocket.send_json(
+                    {"type": "subscribe", "eventTypes": ["robot."], "robotIds": ["robot-1"]}
+                )
+                # The subscription applies once the server read the message; poll until it has.
+                deadline = time.monotonic() + 5
+                while "robot-1" not in event_bus._by_robot and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                event_bus.publish("robot.state.updated", robot_id="robot-2")
+                event_bus.publish("mission.created", robot_id="robot-1")
+                event_bus.publish("robot.state.updated", robot_id="robot-1")
+
+                message = websocket.receive_json()
+
+                assert message["type"] == "robot.state.updated"
+                assert message["robotId"] == "robot-1"
+
+            with client.websocket_connect("/api/v1/events/ws") as websocket:
+                websocket.send_json({"type": "unsubscribe"})
+
+                with pytest.raises(WebSocketDisconnect) as disconnect:
+                    websocket.receive_json()
+
+                assert disconnect.value.code == 1008
+    finally:
+        app.dependency_overrides.clear()
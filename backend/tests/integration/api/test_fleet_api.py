@@ -8,8 +8,10 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from app.api.deps import get_session
 from app.db.base import Base
 from app.main import app
-from app.mqtt.outbound import RecordingMqttPublisher, get_mqtt_publisher
+from app.mqtt.outbound import RecordingMqttPublisher
+from app.mqtt.outbox import OutboxRelay, get_outbox_relay
 from app.services.robot_registry import RobotRegistryService
+from app.services.visualization_buffer import VisualizationBuffer, get_visualization_buffer
 
 
 @dataclass(frozen=True)
@@ -17,6 +19,7 @@ class ApiTestContext:
     client: AsyncClient
     maker: async_sessionmaker[AsyncSession]
     publisher: RecordingMqttPublisher
+    outbox_relay: OutboxRelay
 
 
 @pytest.fixture
@@ -27,18 +30,21 @@ async def context() -> AsyncIterator[ApiTestContext]:
     maker = async_sessionmaker(engine, expire_on_commit=False)
 
     publisher = RecordingMqttPublisher()
+    outbox_relay = OutboxRelay(publisher, session_maker=maker)
 
     async def override_session():
         async with maker() as session:
             yield session
 
-    def override_publisher() -> RecordingMqttPublisher:
-        return publisher
+    def override_outbox_relay() -> OutboxRelay:
+        return outbox_relay
 
     app.dependency_overrides[get_session] = override_session
-    app.dependency_overrides[get_mqtt_publisher] = override_publisher
+    app.dependency_overrides[get_outbox_relay] = override_outbox_relay
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as test_client:
-        yield ApiTestContext(client=test_client, maker=maker, publisher=publisher)
+        yield ApiTestContext(
+            client=test_client, maker=maker, publisher=publisher, outbox_relay=outbox_relay
+        )
     app.dependency_overrides.clear()
     await engine.dispose()
 
@@ -100,6 +106,59 @@ async def test_get_robot_detail_latest_state_and_factsheet(context: ApiTestConte
     assert factsheet_response.json()["typeSpecification"]["seriesName"] == "RB"
 
 
+async def test_list_robot_visualization_reads_the_in_memory_buffer(
+    context: ApiTestContext,
+) -> None:
+    buffer = VisualizationBuffer(size=2)
+    app.dependency_overrides[get_visualization_buffer] = lambda: buffer
+    robot_response = await context.client.post(
+        "/api/v1/robots", json={"manufacturer": "ResearchBot", "serialNumber": "RB-VIS"}
+    )
+    robot_id = robot_response.json()["id"]
+    for header_id in range(1, 4):
+        buffer.record(
+            "ResearchBot",
+            "RB-VIS",
+            {"headerId": header_id, "agvPosition": {"x": float(header_id), "y": 0.0}},
+        )
+
+    response = await context.client.get(f"/api/v1/robots/{robot_id}/visualization")
+    limited = await context.client.get(f"/api/v1/robots/{robot_id}/visualization?limit=1")
+    missing = await context.client.get("/api/v1/robots/missing/visualization")
+
+    assert response.status_code == 200
+    assert [sample["headerId"] for sample in response.json()] == [2, 3]
+    assert response.json()[1]["agvPosition"] == {"x": 3.0, "y": 0.0}
+    assert "receivedAt" in response.json()[0]
+    assert [sample["headerId"] for sample in limited.json()] == [3]
+    assert missing.status_code == 404
+
+
+async def test_list_robot_visualization_leaves_out_fields_of_the_wrong_type(
+    context: ApiTestContext,
+) -> None:
+    buffer = VisualizationBuffer(size=2)
+    app.dependency_overrides[get_visualization_buffer] = lambda: buffer
+    robot_response = await context.client.post(
+        "/api/v1/robots", json={"manufacturer": "ResearchBot", "serialNumber": "RB-VIS-BAD"}
+    )
+    robot_id = robot_response.json()["id"]
+    buffer.record(
+        "ResearchBot",
+        "RB-VIS-BAD",
+        {"headerId": "x", "timestamp": 5, "agvPosition": [1, 2], "velocity": {"vx": 0.5}},
+    )
+
+    response = await context.client.get(f"/api/v1/robots/{robot_id}/visualization")
+
+    assert response.status_code == 200
+    [sample] = response.json()
+    assert sample["headerId"] is None
+    assert sample["timestamp"] is None
+    assert sample["agvPosition"] is None
+    assert sample["velocity"] == {"vx": 0.5}
+
+
 async def test_send_cancel_order_instant_action(context: ApiTestContext) -> None:
     robot_response = await context.client.post(
         "/api/v1/robots", json={"manufacturer": "ResearchBot", "serialNumber": "RB-CANCEL"}
@@ -112,9 +171,35 @@ async def test_send_cancel_order_instant_action(context: ApiTestContext) -> None
 
     assert response.status_code == 202
     assert response.json()["payload"]["actions"][0]["actionType"] == "cancelOrder"
+    assert await context.outbox_relay.relay_pending() == 1
     assert context.publisher.publications[-1].topic.endswith("/instantActions")
 
 
+async def test_broadcast_instant_action_to_filtered_robots(context: ApiTestContext) -> None:
+    for serial_number in ["RB-ZONE-1", "RB-ZONE-2"]:
+        await context.client.post(
+            "/api/v1/robots", json={"manufacturer": "ZoneBot", "serialNumber": serial_number}
+        )
+    await context.client.post(
+        "/api/v1/robots", json={"manufacturer": "ResearchBot", "serialNumber": "RB-ELSEWHERE"}
+    )
+
+    response = await context.client.post(
+        "/api/v1/robots/instant-actions",
+        json={"actionType": "startPause", "manufacturer": "ZoneBot"},
+    )
+
+    assert response.status_code == 202
+    results = response.json()["results"]
+    assert [item["payload"]["serialNumber"] for item in results] == ["RB-ZONE-1", "RB-ZONE-2"]
+    assert all(item["accepted"] and "robotId" in item for item in results)
+    assert await context.outbox_relay.relay_pending() == 2
+    assert {publication.topic for publication in context.publisher.publications} == {
+        "vda5050/v3/ZoneBot/RB-ZONE-1/instantActions",
+        "vda5050/v3/ZoneBot/RB-ZONE-2/instantActions",
+    }
+
+
 async def test_create_map_with_nodes_and_route_preview(context: ApiTestContext) -> None:
     map_response = await context.client.post("/api/v1/maps", json={"name": "Lab"})
     map_id = map_response.json()["id"]
@@ -239,5 +324,7 @@ async def test_dispatch_mission_publishes_order(context: ApiTestContext) -> None
     assert body["payload"]["orderId"] == mission_response.json()["id"]
     assert body["payload"]["nodes"][0]["nodePosition"]["x"] == 2
     assert body["payload"]["nodes"][1]["nodePosition"]["x"] == 8
+    assert context.publisher.publications == []
+    assert await context.outbox_relay.relay_pending() == 1
     assert len(context.publisher.publications) == 1
     assert context.publisher.publications[0].topic == "vda5050/v3/ResearchBot/RB004/order"
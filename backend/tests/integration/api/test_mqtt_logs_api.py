@@ -6,8 +6,11 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from app.api.deps import get_session
+from app.core.config import Settings
 from app.db.base import Base, MqttMessageLog, Robot
 from app.main import app
+from app.mqtt.inbound import InboundMqttMessage
+from app.mqtt.worker import MqttWorker
 
 
 @pytest.fixture
@@ -140,3 +143,68 @@ async def test_reject_invalid_log_query_parameters(client: AsyncClient) -> None:
     )
 
     assert response.status_code == 422
+
+
+async def test_ingest_stats_report_disabled_worker(client: AsyncClient) -> None:
+    response = await client.get("/api/v1/mqtt/ingest")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["enabled"] is False
+    assert body["lanes"] == []
+    assert body["lastBatchSize"] == 0
+    assert body["messagesPerSecond"] == 0
+    assert [topic["messageType"] for topic in body["topics"]] == [
+        "connection",
+        "factsheet",
+        "state",
+        "visualization",
+    ]
+    assert body["topics"][0] == {
+        "messageType": "connection",
+        "priority": 0,
+        "queued": 0,
+        "shed": 0,
+        "queueDepth": 0,
+    }
+
+
+async def test_sequence_stats_report_loss_and_reordering_per_robot(client: AsyncClient) -> None:
+    worker = MqttWorker(Settings())
+    for header_id in (1, 3, 2, 6):
+        await worker.dispatcher.put(
+            InboundMqttMessage(
+                topic="vda5050/v3/ResearchBot/RB001/state",
+                payload={"headerId": header_id, "timestamp": "2026-06-25T13:00:00Z"},
+            )
+        )
+    app.state.mqtt_worker = worker
+    try:
+        response = await client.get("/api/v1/mqtt/sequences")
+    finally:
+        app.state.mqtt_worker = None
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "manufacturer": "ResearchBot",
+            "serialNumber": "RB001",
+            "robotId": None,
+            "received": 4,
+            "missing": 2,
+            "late": 1,
+            "duplicates": 0,
+            "restarts": 0,
+            "lossRate": 2 / 6,
+            "reorderRate": 0.25,
+        }
+    ]
+
+
+async def test_metrics_endpoint_exposes_inbound_latency_histograms(client: AsyncClient) -> None:
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE tars_mqtt_inbound_stage_seconds histogram" in response.text
+    assert "# TYPE tars_mqtt_inbound_end_to_end_seconds histogram" in response.text
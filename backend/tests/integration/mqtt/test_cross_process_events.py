@@ -0,0 +1,49 @@
+"""Needs the development broker from ``infra/mosquitto``; see docs/mqtt-topics.md."""
+
+import asyncio
+import os
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import Settings
+from app.mqtt.event_bridge import MqttEventBridge
+from app.services.event_bus import EventBus
+
+MQTT_HOST = os.getenv("TARS_TEST_MQTT_HOST")
+MQTT_PORT = int(os.getenv("TARS_TEST_MQTT_PORT", "1883"))
+
+pytestmark = pytest.mark.skipif(
+    MQTT_HOST is None, reason="set TARS_TEST_MQTT_HOST to run against a local mosquitto"
+)
+
+
+async def test_events_reach_other_processes_in_order_per_robot() -> None:
+    assert MQTT_HOST is not None
+    # A private prefix keeps this test away from backends on the same broker.
+    settings = Settings(
+        mqtt_host=MQTT_HOST,
+        mqtt_port=MQTT_PORT,
+        event_bus_mqtt_topic_prefix=f"tars-test-{uuid4().hex[:8]}/events",
+    )
+    api_bus, worker_bus = EventBus(), EventBus()
+    bridges = [MqttEventBridge(settings, api_bus), MqttEventBridge(settings, worker_bus)]
+    for bridge in bridges:
+        bridge.start()
+
+    try:
+        await asyncio.sleep(0.5)
+        async with api_bus.subscribe() as events:
+            for n in range(50):
+                worker_bus.publish(
+                    "robot.state.updated", robot_id=f"robot-{n % 2}", payload={"n": n}
+                )
+            received = [await asyncio.wait_for(events.get(), timeout=5) for _ in range(50)]
+    finally:
+        for bridge in bridges:
+            await bridge.stop()
+
+    for robot in range(2):
+        assert [
+            event.payload["n"] for event in received if event.robot_id == f"robot-{robot}"
+        ] == list(range(robot, 50, 2))
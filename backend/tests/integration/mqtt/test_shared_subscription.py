@@ -0,0 +1,93 @@
+"""Needs the development broker from ``infra/mosquitto``; see docs/mqtt-topics.md."""
+
+import asyncio
+import os
+from pathlib import Path
+from uuid import uuid4
+
+import aiomqtt
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import Settings
+from app.db.base import Base, RobotStateSnapshot
+from app.mqtt.codec import encode_payload
+from app.mqtt.ingest import ShardedInboundDispatcher
+from app.mqtt.worker import MqttWorker
+
+MQTT_HOST = os.getenv("TARS_TEST_MQTT_HOST")
+MQTT_PORT = int(os.getenv("TARS_TEST_MQTT_PORT", "1883"))
+
+pytestmark = pytest.mark.skipif(
+    MQTT_HOST is None, reason="set TARS_TEST_MQTT_HOST to run against a local mosquitto"
+)
+
+
+def state_payload(serial_number: str, header_id: int) -> dict:
+    return {
+        "headerId": header_id,
+        "timestamp": "2026-06-25T13:00:01.000Z",
+        "version": "3.0.0",
+        "manufacturer": "ResearchBot",
+        "serialNumber": serial_number,
+        "orderId": "",
+        "orderUpdateId": 0,
+        "lastNodeId": "",
+        "lastNodeSequenceId": 0,
+        "nodeStates": [],
+        "edgeStates": [],
+        "driving": False,
+        "actionStates": [],
+        "instantActionStates": [],
+        "powerSupply": {"stateOfCharge": 50.0, "charging": False},
+        "operatingMode": "AUTOMATIC",
+        "errors": [],
+        "safetyState": {"activeEmergencyStop": "NONE", "fieldViolation": False},
+    }
+
+
+async def test_replicas_in_a_share_group_split_inbound_messages(tmp_path: Path) -> None:
+    assert MQTT_HOST is not None
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'shared.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    # A private interface name keeps this test away from robots on the same broker.
+    settings = Settings(
+        mqtt_host=MQTT_HOST,
+        mqtt_port=MQTT_PORT,
+        mqtt_interface_name=f"tars-test-{uuid4().hex[:8]}",
+        mqtt_shared_subscription_group="tars-test",
+    )
+    replicas = [MqttWorker(settings) for _ in range(2)]
+    for replica in replicas:
+        replica.dispatcher = ShardedInboundDispatcher(
+            lanes=1, max_batch_size=10, max_latency=0.01, session_maker=maker, deduplicate=True
+        )
+        replica.start()
+
+    try:
+        await asyncio.sleep(0.5)
+        async with aiomqtt.Client(MQTT_HOST, MQTT_PORT) as publisher:
+            for header_id in range(1, 21):
+                await publisher.publish(
+                    f"{settings.mqtt_interface_name}/v3/ResearchBot/RB-SHARED/state",
+                    encode_payload(state_payload("RB-SHARED", header_id)),
+                    qos=1,
+                )
+        for _ in range(100):
+            if sum(replica.dispatcher.stats.messages for replica in replicas) == 20:
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        for replica in replicas:
+            await replica.stop()
+    async with maker() as session:
+        snapshots = await session.scalar(select(func.count()).select_from(RobotStateSnapshot))
+    await engine.dispose()
+
+    received = [replica.dispatcher.stats.messages for replica in replicas]
+    assert sum(received) == 20
+    assert all(received)
+    assert snapshots == 20
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from app.mqtt.codec import PayloadDecodeError, decode_payload, encode_payload
+
+
+def test_encode_payload_produces_compact_utf8_bytes() -> None:
+    payload = {"headerId": 1, "serialNumber": "RB-ü", "nodes": [{"x": 1.5}]}
+
+    encoded = encode_payload(payload)
+
+    assert isinstance(encoded, bytes)
+    assert encoded == json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def test_decode_payload_reads_bytes_directly() -> None:
+    assert decode_payload(b'{"headerId":1,"errors":[]}') == {"headerId": 1, "errors": []}
+    assert decode_payload(bytearray(b"[1,2]")) == [1, 2]
+
+
+@pytest.mark.parametrize("data", [b"not json", b"\xff\xfe", b""])
+def test_decode_payload_rejects_invalid_json_with_value_error(data: bytes) -> None:
+    with pytest.raises(PayloadDecodeError):
+        decode_payload(data)
+    with pytest.raises(ValueError):
+        decode_payload(data)
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.core.config import Settings
+from app.mqtt.event_bridge import MqttEventBridge
+from app.services.event_bus import EventBus, EventFilter
+
+
+class FakeAiomqttClient:
+    def __init__(self) -> None:
+        self.published: list[tuple[str, str]] = []
+
+    async def publish(self, topic: str, *, payload: str, qos: int) -> None:
+        self.published.append((topic, payload))
+
+
+async def test_event_bridge_forwards_events_in_publish_order_with_a_topic_per_robot() -> None:
+    event_bus = EventBus()
+    bridge = MqttEventBridge(Settings(), event_bus)
+    bridge.attach()
+    client = FakeAiomqttClient()
+
+    async with event_bus.subscribe() as local:
+        sender = asyncio.create_task(bridge.send(client))  # type: ignore[arg-type]
+        events = [
+            event_bus.publish("robot.state.updated", robot_id="robot-1", payload={"n": 1}),
+            event_bus.publish("mission.created", mission_id="mission-1"),
+            event_bus.publish("robot.state.updated", robot_id="robot-1", payload={"n": 2}),
+        ]
+        # Local subscribers do not wait for the broker.
+        assert local.qsize() == 3
+        await asyncio.sleep(0.01)
+        sender.cancel()
+
+    prefix = f"tars/events/{bridge.origin}"
+    assert client.published == [
+        (f"{prefix}/robot-1", f"robot.state.updated\t-\n{events[0].as_json()}"),
+        (f"{prefix}/-", f"mission.created\tmission-1\n{events[1].as_json()}"),
+        (f"{prefix}/robot-1", f"robot.state.updated\t-\n{events[2].as_json()}"),
+    ]
+
+
+async def test_event_bridge_delivers_events_of_other_processes_locally_only() -> None:
+    sender_bus, receiver_bus = EventBus(), EventBus()
+    sender = MqttEventBridge(Settings(), sender_bus)
+    receiver = MqttEventBridge(Settings(), receiver_bus)
+    receiver.attach()
+    published = sender_bus.publish("robot.state.updated", robot_id="robot-1", payload={"n": 1})
+
+    async with receiver_bus.subscribe() as events:
+        payload = sender.payload_for(published)
+        delivered = receiver.receive(sender.topic_for(published), payload.encode())
+        assert receiver.receive(receiver.topic_for(published), payload) is None
+        assert receiver.receive(sender.topic_for(published), b"not json") is None
+        assert receiver.receive(sender.topic_for(published), b"robot.state.updated\t-\n{") is None
+
+        assert delivered is not None
+        assert events.qsize() == 1
+        received = events.get_nowait()
+
+    assert received.as_message() == published.as_message()
+    assert received.timestamp == published.timestamp
+    # Delivered events are not forwarded again.
+    assert receiver._outgoing.empty()
+
+
+async def test_event_bridge_skips_decoding_events_no_local_subscriber_wants(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    receiver_bus = EventBus()
+    receiver = MqttEventBridge(Settings(), receiver_bus)
+    sender = MqttEventBridge(Settings(), EventBus())
+    topic = f"{sender.topic_prefix}/{sender.origin}"
+    # The bodies are not JSON, so any attempt to decode them would log a warning.
+    with caplog.at_level(logging.WARNING):
+        assert receiver.receive(f"{topic}/robot-1", b"robot.state.updated\t-\n{") is None
+
+        async with receiver_bus.subscribe(
+            EventFilter(event_types=frozenset({"mission."}), mission_ids=frozenset({"mission-1"}))
+        ):
+            for robot_level, header in [
+                ("robot-1", b"robot.state.updated\tmission-1"),
+                ("-", b"mission.created\tmission-2"),
+                ("-", b"mission.created\t-"),
+            ]:
+                assert receiver.receive(f"{topic}/{robot_level}", header + b"\n{") is None
+    assert caplog.records == []
+
+    wanted = sender.event_bus.publish("mission.created", mission_id="mission-1")
+    async with receiver_bus.subscribe(EventFilter(mission_ids=frozenset({"mission-1"}))) as events:
+        assert receiver.receive(sender.topic_for(wanted), sender.payload_for(wanted)) is not None
+        assert events.get_nowait().as_message() == wanted.as_message()
+
+
+async def test_event_bridge_drops_the_oldest_event_when_its_buffer_is_full() -> None:
+    event_bus = EventBus()
+    bridge = MqttEventBridge(Settings(), event_bus, buffer_size=2)
+    bridge.attach()
+
+    for n in range(3):
+        event_bus.publish("robot.state.updated", robot_id="robot-1", payload={"n": n})
+
+    assert bridge.dropped_events == 1
+    assert [bridge._outgoing.get_nowait().payload["n"] for _ in range(2)] == [1, 2]
+    await bridge.stop()
+    assert event_bus.backend is None
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.mqtt.inbound import InboundMqttMessage
+from app.mqtt.inbound_queue import PriorityInboundQueue
+
+
+def message(serial_number: str, message_type: str, header_id: int = 1) -> InboundMqttMessage:
+    return InboundMqttMessage(
+        topic=f"vda5050/v3/ResearchBot/{serial_number}/{message_type}",
+        payload={"headerId": header_id},
+    )
+
+
+def drain(queue: PriorityInboundQueue) -> list[tuple[str, int]]:
+    items = []
+    while not queue.empty():
+        item = queue.get_nowait()
+        items.append((item.topic.rsplit("/", 1)[1], item.payload["headerId"]))
+    return items
+
+
+async def test_queue_hands_out_higher_priority_first_and_fifo_within_a_class() -> None:
+    queue = PriorityInboundQueue(10)
+    for item in (
+        message("RB1", "visualization", 1),
+        message("RB1", "state", 2),
+        message("RB1", "connection", 3),
+        message("RB1", "state", 4),
+        message("RB1", "factsheet", 5),
+    ):
+        await queue.put(item)
+
+    assert queue.qsize() == 5
+    assert drain(queue) == [
+        ("connection", 3),
+        ("factsheet", 5),
+        ("state", 2),
+        ("state", 4),
+        ("visualization", 1),
+    ]
+
+
+async def test_drop_oldest_sheds_lowest_class_to_admit_connection() -> None:
+    queue = PriorityInboundQueue(2, shed_policy="drop_oldest")
+    await queue.put(message("RB1", "state", 1))
+    await queue.put(message("RB1", "visualization", 2))
+
+    await queue.put(message("RB1", "connection", 3))
+    await queue.put(message("RB1", "state", 4))
+
+    assert drain(queue) == [("connection", 3), ("state", 4)]
+    stats = queue.stats_by_message_type()
+    assert (stats["state"].queued, stats["state"].shed) == (2, 1)
+    assert (stats["visualization"].queued, stats["visualization"].shed) == (1, 1)
+    assert stats["connection"].shed == 0
+
+
+async def test_drop_newest_sheds_incoming_message_of_the_lowest_class() -> None:
+    queue = PriorityInboundQueue(2, shed_policy="drop_newest")
+    await queue.put(message("RB1", "state", 1))
+    await queue.put(message("RB1", "state", 2))
+
+    await queue.put(message("RB1", "state", 3))
+    await queue.put(message("RB1", "visualization", 4))
+
+    assert drain(queue) == [("state", 1), ("state", 2)]
+    stats = queue.stats_by_message_type()
+    assert stats["state"].shed == 1
+    assert stats["visualization"].shed == 1
+
+
+async def test_connection_messages_are_never_shed() -> None:
+    queue = PriorityInboundQueue(1, shed_policy="drop_oldest")
+    await queue.put(message("RB1", "connection", 1))
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(queue.put(message("RB2", "connection", 2)), 0.01)
+    await queue.put(message("RB1", "state", 3))
+
+    assert drain(queue) == [("connection", 1)]
+    assert queue.stats_by_message_type()["connection"].shed == 0
+
+
+async def test_block_policy_waits_for_space() -> None:
+    queue = PriorityInboundQueue(1)
+    await queue.put(message("RB1", "visualization", 1))
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(queue.put(message("RB1", "connection", 2)), 0.01)
+    assert queue.stats_by_message_type()["visualization"].depth == 1
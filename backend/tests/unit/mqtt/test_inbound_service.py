@@ -1,10 +1,15 @@
 import pytest
-from sqlalchemy import select
+from prometheus_client import REGISTRY
+from sqlalchemy import event, select, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from app.db.base import Base, MqttMessageLog, Robot, RobotStateSnapshot
-from app.mqtt.inbound import InboundMqttMessage, MqttInboundService
+from app.db.base import Base, MqttInboundReceipt, MqttMessageLog, Robot, RobotStateSnapshot
+from app.mqtt.inbound import InboundMqttMessage, MqttInboundService, inbound_message_key
+from app.mqtt.message_log import MessageLogSampler
+from app.mqtt.validation_sampler import ValidationSampler
 from app.services.event_bus import EventBus
+from app.services.robot_registry import CachedRobot, RobotIdentityCache
 
 
 @pytest.fixture
@@ -101,6 +106,33 @@ async def test_state_message_persists_latest_snapshot_and_soc(session: AsyncSess
     assert snapshot.raw_payload["powerSupply"]["stateOfCharge"] == 76.5
 
 
+async def test_message_stages_and_end_to_end_latency_are_observed(session: AsyncSession) -> None:
+    def count(metric: str, **labels: str) -> float:
+        return REGISTRY.get_sample_value(f"{metric}_count", labels) or 0.0
+
+    stages = ["parse_topic", "validate", "robot_lookup", "log"]
+    before = [
+        count("tars_mqtt_inbound_stage_seconds", stage=stage, message_type="state")
+        for stage in stages
+    ]
+    commits = count("tars_mqtt_inbound_stage_seconds", stage="commit", message_type="batch")
+    end_to_end = count("tars_mqtt_inbound_end_to_end_seconds", message_type="state")
+
+    await MqttInboundService(session).handle_message(
+        InboundMqttMessage(topic="vda5050/v3/ResearchBot/RB100/state", payload=state_payload())
+    )
+
+    after = [
+        count("tars_mqtt_inbound_stage_seconds", stage=stage, message_type="state")
+        for stage in stages
+    ]
+    assert [a - b for a, b in zip(after, before, strict=True)] == [1, 1, 1, 1]
+    assert count("tars_mqtt_inbound_stage_seconds", stage="commit", message_type="batch") == (
+        commits + 1
+    )
+    assert count("tars_mqtt_inbound_end_to_end_seconds", message_type="state") == end_to_end + 1
+
+
 async def test_invalid_vda_payload_is_logged_but_not_applied(session: AsyncSession) -> None:
     event_bus = EventBus()
 
@@ -137,3 +169,193 @@ async def test_invalid_topic_is_logged_without_robot(session: AsyncSession) -> N
     assert log.message_type == "unknown"
     assert log.robot_id is None
     assert log.validation_errors
+
+
+async def test_log_policy_skips_log_rows_but_still_applies_and_publishes(
+    session: AsyncSession,
+) -> None:
+    event_bus = EventBus()
+    sampler = MessageLogSampler({"state": "off"}, default="invalid_only")
+    topic = "vda5050/v3/ResearchBot/RB100"
+
+    async with event_bus.subscribe() as events:
+        await MqttInboundService(session, event_bus, log_sampler=sampler).handle_batch(
+            [
+                InboundMqttMessage(topic=f"{topic}/connection", payload=connection_payload()),
+                InboundMqttMessage(topic=f"{topic}/state", payload=state_payload()),
+                InboundMqttMessage(topic=f"{topic}/connection", payload={"headerId": 3}),
+            ]
+        )
+        received = [await events.get() for _ in range(7)]
+
+    logs = (await session.execute(select(MqttMessageLog))).scalars().all()
+    snapshot = (await session.execute(select(RobotStateSnapshot))).scalar_one()
+    assert [(log.message_type, log.schema_valid) for log in logs] == [("connection", False)]
+    assert snapshot.raw_payload["headerId"] == 2
+    assert [
+        event.payload["messageId"] for event in received if event.type == "mqtt.message.received"
+    ] == [
+        None,
+        None,
+        logs[0].id,
+    ]
+
+
+async def test_validation_policy_accepts_skipped_messages_and_rejects_sampled_failures(
+    session: AsyncSession,
+) -> None:
+    event_bus = EventBus()
+    sampler = ValidationSampler({"state": "every:2"})
+    topic = "vda5050/v3/ResearchBot/RB100/state"
+    invalid = {key: value for key, value in state_payload().items() if key != "driving"}
+
+    async with event_bus.subscribe() as events:
+        results = await MqttInboundService(
+            session, event_bus, validation_sampler=sampler
+        ).handle_batch(
+            [
+                InboundMqttMessage(topic=topic, payload=state_payload()),
+                InboundMqttMessage(topic=topic, payload=invalid),
+                InboundMqttMessage(topic=topic, payload=invalid),
+            ]
+        )
+        received = [(await events.get()).type for _ in range(7)]
+
+    assert [result.accepted for result in results] == [True, True, False]
+    assert received.count("vda.validation.failed") == 1
+    assert REGISTRY.get_sample_value(
+        "tars_mqtt_inbound_validation_skipped_total", {"message_type": "state"}
+    )
+
+
+async def test_batch_commits_once_and_publishes_events_in_message_order(
+    session: AsyncSession,
+) -> None:
+    event_bus = EventBus()
+    service = MqttInboundService(session, event_bus)
+
+    async with event_bus.subscribe() as events:
+        results = await service.handle_batch(
+            [
+                InboundMqttMessage(
+                    topic="vda5050/v3/ResearchBot/RB100/connection",
+                    payload=connection_payload(),
+                ),
+                InboundMqttMessage(
+                    topic="vda5050/v3/ResearchBot/RB100/state", payload=state_payload()
+                ),
+            ]
+        )
+        emitted_types = [events.get_nowait().type for _ in range(events.qsize())]
+
+    robot = (await session.execute(select(Robot))).scalar_one()
+    logs = (await session.execute(select(MqttMessageLog))).scalars().all()
+    assert [result.robot_id for result in results] == [robot.id, robot.id]
+    assert len(logs) == 2
+    assert robot.last_connection_state == "ONLINE"
+    assert emitted_types == [
+        "robot.discovered",
+        "robot.connection.updated",
+        "mqtt.message.received",
+        "robot.state.updated",
+        "mqtt.message.received",
+    ]
+
+
+async def test_cached_robot_state_message_needs_no_lookup_query(session: AsyncSession) -> None:
+    cache = RobotIdentityCache()
+    service = MqttInboundService(session)
+    service.robot_registry.identity_cache = cache
+    await service.handle_message(
+        InboundMqttMessage(
+            topic="vda5050/v3/ResearchBot/RB100/connection", payload=connection_payload()
+        )
+    )
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:  # type: ignore[no-untyped-def]
+        statements.append(statement.split()[0].upper())
+
+    engine = session.bind.sync_engine  # type: ignore[union-attr]
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        await service.handle_message(
+            InboundMqttMessage(topic="vda5050/v3/ResearchBot/RB100/state", payload=state_payload())
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert cache.get("ResearchBot", "RB100") is not None
+    assert "SELECT" not in statements
+    assert statements.count("INSERT") == 2
+    assert statements.count("UPDATE") == 1
+
+
+async def test_stale_cached_robot_is_invalidated_when_the_batch_fails(
+    session: AsyncSession,
+) -> None:
+    cache = RobotIdentityCache()
+    cache.put(CachedRobot("missing-robot", "ResearchBot", "RB100", None, "ONLINE"))
+    await session.execute(text("PRAGMA foreign_keys = ON"))
+    service = MqttInboundService(session)
+    service.robot_registry.identity_cache = cache
+    message = InboundMqttMessage(
+        topic="vda5050/v3/ResearchBot/RB100/state", payload=state_payload()
+    )
+
+    with pytest.raises(IntegrityError):
+        await service.handle_message(message)
+    await session.rollback()
+    result = await service.handle_message(message)
+
+    robot = (await session.execute(select(Robot))).scalar_one()
+    assert result.robot_id == robot.id
+    assert cache.get("ResearchBot", "RB100") == CachedRobot.from_robot(robot)
+
+
+async def test_deduplicating_service_skips_redelivered_messages(session: AsyncSession) -> None:
+    service = MqttInboundService(session, deduplicate=True)
+    message = InboundMqttMessage(
+        topic="vda5050/v3/ResearchBot/RB100/state", payload=state_payload()
+    )
+
+    first = await service.handle_batch([message, message])
+    redelivered = await service.handle_message(message)
+
+    snapshots = (await session.execute(select(RobotStateSnapshot))).scalars().all()
+    logs = (await session.execute(select(MqttMessageLog))).scalars().all()
+    receipts = (await session.execute(select(MqttInboundReceipt))).scalars().all()
+    assert [result.duplicate for result in first] == [False, True]
+    assert redelivered.duplicate is True
+    assert redelivered.accepted is False
+    assert len(snapshots) == len(logs) == len(receipts) == 1
+
+
+async def test_deduplicating_service_logs_non_object_payloads_as_invalid(
+    session: AsyncSession,
+) -> None:
+    message = InboundMqttMessage(
+        topic="vda5050/v3/ResearchBot/RB100/state",
+        payload=[1, 2],  # type: ignore[arg-type]
+    )
+
+    results = await MqttInboundService(session, deduplicate=True).handle_batch([message, message])
+
+    logs = (await session.execute(select(MqttMessageLog))).scalars().all()
+    receipts = (await session.execute(select(MqttInboundReceipt))).scalars().all()
+    assert inbound_message_key(message) is None
+    assert [(result.accepted, result.duplicate) for result in results] == [(False, False)] * 2
+    assert [log.schema_valid for log in logs] == [False, False]
+    assert receipts == []
+
+
+def test_inbound_message_key_distinguishes_restarted_header_ids() -> None:
+    topic = "vda5050/v3/ResearchBot/RB100/state"
+    before_reboot = InboundMqttMessage(topic=topic, payload=state_payload())
+    after_reboot = InboundMqttMessage(
+        topic=topic, payload={**state_payload(), "timestamp": "2026-06-26T08:00:00.000Z"}
+    )
+
+    assert inbound_message_key(before_reboot) == inbound_message_key(before_reboot)
+    assert inbound_message_key(before_reboot) != inbound_message_key(after_reboot)
+    assert inbound_message_key(InboundMqttMessage(topic=topic, payload={})) is None
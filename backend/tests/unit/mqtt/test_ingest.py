@@ -0,0 +1,402 @@
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base, MqttMessageLog, Robot, RobotStateSnapshot
+from app.mqtt.inbound import InboundMqttMessage, MqttInboundResult, MqttInboundService
+from app.mqtt.ingest import InboundBatcher, ShardedInboundDispatcher, coalesce_states
+from app.services.event_bus import EventBus, PendingEvent
+
+
+@pytest.fixture
+async def maker() -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def state_message(serial_number: str, header_id: int) -> InboundMqttMessage:
+    return InboundMqttMessage(
+        topic=f"vda5050/v3/ResearchBot/{serial_number}/state",
+        payload={
+            "headerId": header_id,
+            "timestamp": "2026-06-25T13:00:01.000Z",
+            "version": "3.0.0",
+            "manufacturer": "ResearchBot",
+            "serialNumber": serial_number,
+            "orderId": "",
+            "orderUpdateId": 0,
+            "lastNodeId": "",
+            "lastNodeSequenceId": 0,
+            "nodeStates": [],
+            "edgeStates": [],
+            "driving": False,
+            "actionStates": [],
+            "instantActionStates": [],
+            "powerSupply": {"stateOfCharge": 50.0 + header_id, "charging": False},
+            "operatingMode": "AUTOMATIC",
+            "errors": [],
+            "safetyState": {"activeEmergencyStop": "NONE", "fieldViolation": False},
+        },
+    )
+
+
+async def count(maker: async_sessionmaker[AsyncSession], model: type[Base]) -> int:
+    async with maker() as session:
+        return await session.scalar(select(func.count()).select_from(model)) or 0
+
+
+async def test_batcher_flushes_when_batch_size_is_reached(
+    maker: async_sessionmaker[AsyncSession],
+) -> None:
+    batcher = InboundBatcher(max_batch_size=3, max_latency=60, session_maker=maker)
+    batcher.start()
+    try:
+        for header_id in range(1, 7):
+            await batcher.put(state_message("RB1", header_id))
+        for _ in range(100):
+            if batcher.stats.batches == 2:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await batcher.stop()
+
+    assert batcher.stats.batches == 2
+    assert batcher.stats.max_batch_size == 3
+    assert batcher.stats.average_batch_size == 3
+    assert await count(maker, RobotStateSnapshot) == 6
+    assert await count(maker, MqttMessageLog) == 6
+    assert await count(maker, Robot) == 1
+
+
+async def test_batcher_flushes_partial_batch_after_latency(
+    maker: async_sessionmaker[AsyncSession],
+) -> None:
+    batcher = InboundBatcher(max_batch_size=100, max_latency=0.02, session_maker=maker)
+    batcher.start()
+    try:
+        await batcher.put(state_message("RB1", 1))
+        await batcher.put(state_message("RB2", 1))
+        for _ in range(100):
+            if batcher.stats.batches:
+                break
+            await asyncio.sleep(0.01)
+
+        assert batcher.stats.batches == 1
+        assert batcher.stats.last_batch_size == 2
+        assert await count(maker, Robot) == 2
+    finally:
+        await batcher.stop()
+
+
+async def test_stop_persists_buffered_messages(maker: async_sessionmaker[AsyncSession]) -> None:
+    batcher = InboundBatcher(max_batch_size=100, max_latency=60, session_maker=maker)
+
+    await batcher.put(state_message("RB1", 1))
+    await batcher.put(state_message("RB1", 2))
+    await batcher.stop()
+
+    assert batcher.stats.messages == 2
+    assert await count(maker, RobotStateSnapshot) == 2
+
+
+async def test_failed_batch_is_retried_message_by_message(
+    maker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    persist_batch = MqttInboundService.persist_batch
+
+    async def fail_multi_message_batches(
+        self: MqttInboundService, messages: Sequence[InboundMqttMessage]
+    ) -> tuple[list[MqttInboundResult], list[PendingEvent]]:
+        if len(messages) > 1:
+            raise RuntimeError("database unavailable")
+        return await persist_batch(self, messages)
+
+    monkeypatch.setattr(MqttInboundService, "persist_batch", fail_multi_message_batches)
+    event_bus = EventBus()
+    batcher = InboundBatcher(
+        max_batch_size=10, max_latency=0, session_maker=maker, event_bus=event_bus
+    )
+
+    async with event_bus.subscribe() as events:
+        await batcher.flush([state_message("RB1", 1), state_message("RB1", 2)])
+        received = [events.get_nowait().type for _ in range(events.qsize())]
+
+    assert batcher.stats.failed_batches == 1
+    assert batcher.stats.messages == 2
+    assert await count(maker, RobotStateSnapshot) == 2
+    assert received.count("robot.state.updated") == 2
+
+
+async def test_stop_waits_for_an_in_flight_flush(
+    maker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    persist_batch = MqttInboundService.persist_batch
+    flush_started = asyncio.Event()
+    release_flush = asyncio.Event()
+
+    async def blocked_persist_batch(
+        self: MqttInboundService, messages: Sequence[InboundMqttMessage]
+    ) -> tuple[list[MqttInboundResult], list[PendingEvent]]:
+        flush_started.set()
+        await release_flush.wait()
+        return await persist_batch(self, messages)
+
+    monkeypatch.setattr(MqttInboundService, "persist_batch", blocked_persist_batch)
+    batcher = InboundBatcher(max_batch_size=2, max_latency=60, session_maker=maker)
+    batcher.start()
+    await batcher.put(state_message("RB1", 1))
+    await batcher.put(state_message("RB1", 2))
+    await batcher.put(state_message("RB1", 3))
+    await flush_started.wait()
+
+    stopping = asyncio.create_task(batcher.stop())
+    await asyncio.sleep(0.01)
+    release_flush.set()
+    await stopping
+
+    assert batcher.stats.messages == 3
+    assert await count(maker, RobotStateSnapshot) == 3
+
+
+async def test_put_applies_backpressure_when_the_buffer_is_full() -> None:
+    batcher = InboundBatcher(max_batch_size=1, max_latency=0, max_queue_size=1)
+
+    await batcher.put(state_message("RB1", 1))
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(batcher.put(state_message("RB1", 2)), 0.01)
+
+
+async def test_throughput_reflects_only_recent_flushes(
+    maker: async_sessionmaker[AsyncSession],
+) -> None:
+    batcher = InboundBatcher(
+        max_batch_size=10, max_latency=0, session_maker=maker, rate_window=0.05
+    )
+    batcher.start()
+    try:
+        await batcher.flush([state_message("RB1", 1), state_message("RB1", 2)])
+        assert batcher.messages_per_second > 0
+        await asyncio.sleep(0.06)
+        assert batcher.messages_per_second == 0
+    finally:
+        await batcher.stop()
+
+
+def connection_message(serial_number: str, header_id: int, state: str) -> InboundMqttMessage:
+    return InboundMqttMessage(
+        topic=f"vda5050/v3/ResearchBot/{serial_number}/connection",
+        payload={
+            "headerId": header_id,
+            "timestamp": "2026-06-25T13:00:00.000Z",
+            "version": "3.0.0",
+            "manufacturer": "ResearchBot",
+            "serialNumber": serial_number,
+            "connectionState": state,
+        },
+    )
+
+
+def test_coalesce_states_keeps_newest_state_per_robot_in_place() -> None:
+    batch = [
+        state_message("RB1", 1),
+        connection_message("RB1", 2, "ONLINE"),
+        state_message("RB2", 1),
+        state_message("RB1", 3),
+        connection_message("RB1", 4, "CONNECTION_BROKEN"),
+    ]
+
+    kept, dropped = coalesce_states(batch)
+
+    assert dropped == 1
+    assert kept == [batch[1], batch[2], batch[3], batch[4]]
+
+
+async def test_backlog_above_threshold_is_coalesced_to_latest_state(
+    maker: async_sessionmaker[AsyncSession],
+) -> None:
+    event_bus = EventBus(subscriber_buffer_size=100)
+    batcher = InboundBatcher(
+        max_batch_size=10,
+        max_latency=60,
+        session_maker=maker,
+        event_bus=event_bus,
+        max_queue_size=50,
+        coalesce_threshold=20,
+    )
+    for header_id in range(1, 21):
+        await batcher.put(state_message("RB1", header_id))
+        await batcher.put(state_message("RB2", header_id))
+    await batcher.put(connection_message("RB1", 21, "CONNECTION_BROKEN"))
+
+    async with event_bus.subscribe() as events:
+        batcher.start()
+        for _ in range(100):
+            if batcher.stats.batches:
+                break
+            await asyncio.sleep(0.01)
+        await batcher.stop()
+        received = [events.get_nowait() for _ in range(events.qsize())]
+
+    states = [
+        event.payload["headerId"] for event in received if event.type == "robot.state.updated"
+    ]
+    assert states == [20, 20]
+    assert "robot.connection.updated" in [event.type for event in received]
+    assert batcher.stats.coalesced_messages == 38
+    assert batcher.stats.messages == 3
+    assert await count(maker, RobotStateSnapshot) == 2
+
+
+async def test_small_queue_is_not_coalesced(maker: async_sessionmaker[AsyncSession]) -> None:
+    batcher = InboundBatcher(
+        max_batch_size=10, max_latency=0.01, session_maker=maker, coalesce_threshold=20
+    )
+    for header_id in range(1, 6):
+        await batcher.put(state_message("RB1", header_id))
+
+    batcher.start()
+    for _ in range(100):
+        if batcher.stats.messages == 5:
+            break
+        await asyncio.sleep(0.01)
+    await batcher.stop()
+
+    assert batcher.stats.coalesced_messages == 0
+    assert await count(maker, RobotStateSnapshot) == 5
+
+
+async def test_redelivered_messages_are_dropped_before_queueing(
+    maker: async_sessionmaker[AsyncSession],
+) -> None:
+    batcher = InboundBatcher(
+        max_batch_size=10, max_latency=0, session_maker=maker, redelivery_window=4
+    )
+    for header_id in (1, 2, 1, 3, 2):
+        await batcher.put(state_message("RB1", header_id))
+    await batcher.put(state_message("RB2", 1))
+
+    assert batcher.queue_depth == 4
+    assert batcher.stats.redelivered_messages == 2
+    await batcher.stop()
+    assert await count(maker, RobotStateSnapshot) == 4
+
+
+async def test_late_state_is_logged_but_does_not_become_the_latest_state(
+    maker: async_sessionmaker[AsyncSession],
+) -> None:
+    batcher = InboundBatcher(max_batch_size=10, max_latency=0, session_maker=maker)
+    for header_id in (1, 3, 2):
+        await batcher.put(state_message("RB1", header_id))
+
+    await batcher.stop()
+
+    async with maker() as session:
+        snapshots = (await session.scalars(select(RobotStateSnapshot.header_id))).all()
+    assert sorted(snapshots) == [1, 3]
+    assert await count(maker, MqttMessageLog) == 3
+    stats = batcher.sequences.stats_by_robot()[("ResearchBot", "RB1")]
+    assert (stats.missing, stats.late) == (0, 1)
+
+
+@pytest.mark.parametrize("redelivery_window", [None, 4])
+async def test_non_object_payload_is_persisted_as_an_invalid_message(
+    maker: async_sessionmaker[AsyncSession], redelivery_window: int | None
+) -> None:
+    batcher = InboundBatcher(
+        max_batch_size=10,
+        max_latency=0,
+        session_maker=maker,
+        redelivery_window=redelivery_window,
+    )
+
+    await batcher.put(
+        InboundMqttMessage(topic="vda5050/v3/ResearchBot/RB1/state", payload=[1, 2])  # type: ignore[arg-type]
+    )
+    await batcher.stop()
+
+    async with maker() as session:
+        log = (await session.scalars(select(MqttMessageLog))).one()
+    assert log.payload == [1, 2]
+    assert log.schema_valid is False
+    assert log.validation_errors
+    assert await count(maker, RobotStateSnapshot) == 0
+
+
+def test_dispatcher_routes_every_message_of_a_robot_to_the_same_lane() -> None:
+    dispatcher = ShardedInboundDispatcher(lanes=8, max_batch_size=10, max_latency=0)
+
+    state_lane = dispatcher.lane_for("vda5050/v3/ResearchBot/RB1/state")
+    connection_lane = dispatcher.lane_for("vda5050/v3/ResearchBot/RB1/connection")
+    lanes = {dispatcher.lane_for(f"vda5050/v3/ResearchBot/RB{index}/state") for index in range(64)}
+
+    assert state_lane == connection_lane
+    assert len(lanes) > 1
+
+
+async def test_dispatcher_keeps_per_robot_order_across_concurrent_lanes(tmp_path: Path) -> None:
+    # In-memory SQLite shares one connection between sessions; concurrent lanes need a file.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ingest.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    event_bus = EventBus(subscriber_buffer_size=100)
+    dispatcher = ShardedInboundDispatcher(
+        lanes=3, max_batch_size=5, max_latency=0.01, session_maker=maker, event_bus=event_bus
+    )
+
+    try:
+        async with event_bus.subscribe() as events:
+            dispatcher.start()
+            for header_id in range(1, 6):
+                for serial_number in ("RB1", "RB2", "RB3"):
+                    await dispatcher.put(state_message(serial_number, header_id))
+            await dispatcher.stop()
+            states = [
+                event
+                for event in (events.get_nowait() for _ in range(events.qsize()))
+                if event.type == "robot.state.updated"
+            ]
+    finally:
+        await engine.dispose()
+
+    for serial_number in ("RB1", "RB2", "RB3"):
+        header_ids = [
+            event.payload["headerId"]
+            for event in states
+            if event.payload["serialNumber"] == serial_number
+        ]
+        assert header_ids == [1, 2, 3, 4, 5]
+    assert dispatcher.stats.messages == 15
+    assert dispatcher.queue_depth == 0
+
+
+async def test_replicas_persist_a_redelivered_message_once(tmp_path: Path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replicas.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    replicas = [
+        InboundBatcher(max_batch_size=10, max_latency=0, session_maker=maker, deduplicate=True)
+        for _ in range(2)
+    ]
+
+    try:
+        await asyncio.gather(
+            *(
+                replica.flush([state_message("RB1", 1), state_message("RB1", 2)])
+                for replica in replicas
+            )
+        )
+        snapshots = await count(maker, RobotStateSnapshot)
+    finally:
+        await engine.dispose()
+
+    assert snapshots == 2
+    assert sum(replica.stats.duplicate_messages for replica in replicas) == 2
@@ -0,0 +1,80 @@
+import gzip
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import orjson
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base, MqttMessageLog
+from app.mqtt.message_log import MessageLogRetention, MessageLogSampler, parse_log_policy
+
+
+@pytest.fixture
+async def session_maker() -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def message_log(index: int, age: timedelta, direction: str = "inbound") -> MqttMessageLog:
+    return MqttMessageLog(
+        id=f"log-{index}",
+        direction=direction,
+        topic="vda5050/v3/ResearchBot/RB100/state",
+        message_type="state" if direction == "inbound" else "instantActions",
+        payload={"headerId": index},
+        schema_valid=True,
+        created_at=datetime.now(UTC) - age,
+    )
+
+
+def test_parse_log_policy_reads_sampling_interval() -> None:
+    assert parse_log_policy("every:25") == 25
+    assert parse_log_policy("invalid_only") is None
+    with pytest.raises(ValueError):
+        parse_log_policy("sometimes")
+
+
+def test_sampler_applies_policy_per_message_type_and_counts_per_topic() -> None:
+    sampler = MessageLogSampler({"state": "every:3", "visualization": "off"})
+    rb1, rb2 = "vda5050/v3/ResearchBot/RB1/state", "vda5050/v3/ResearchBot/RB2/state"
+
+    logged = [sampler.should_log(rb1, "state", schema_valid=True) for _ in range(7)]
+
+    assert logged == [True, False, False, True, False, False, True]
+    assert sampler.should_log(rb2, "state", schema_valid=True) is True
+    assert sampler.should_log(rb1, "state", schema_valid=False) is True
+    assert sampler.should_log(rb1, "visualization", schema_valid=False) is False
+    assert sampler.should_log(rb1, "connection", schema_valid=True) is True
+
+
+async def test_retention_prunes_old_inbound_rows_in_batches_and_archives_them(
+    session_maker: async_sessionmaker[AsyncSession], tmp_path: Path
+) -> None:
+    async with session_maker() as session:
+        session.add_all(message_log(index, timedelta(days=2)) for index in range(5))
+        session.add(message_log(5, timedelta(minutes=5)))
+        session.add(message_log(6, timedelta(days=2), direction="outbound"))
+        await session.commit()
+    retention = MessageLogRetention(
+        retention=timedelta(days=1),
+        batch_size=2,
+        archive_dir=tmp_path,
+        batch_pause=0,
+        session_maker=session_maker,
+    )
+
+    assert await retention.prune() == 5
+
+    async with session_maker() as session:
+        remaining = (await session.scalars(select(MqttMessageLog.id))).all()
+    assert sorted(remaining) == ["log-5", "log-6"]
+    (archive,) = tmp_path.glob("mqtt_message_logs-*.jsonl.gz")
+    with gzip.open(archive, "rb") as lines:
+        archived = [orjson.loads(line) for line in lines]
+    assert sorted(row["id"] for row in archived) == [f"log-{index}" for index in range(5)]
+    assert archived[0]["payload"]["headerId"] in range(5)
@@ -0,0 +1,132 @@
+import asyncio
+import socket
+import threading
+from dataclasses import dataclass
+
+import paho.mqtt.client as mqtt
+import pytest
+
+from app.core.config import Settings
+from app.mqtt.outbound import AiomqttPublisher, PahoMqttPublisher
+
+
+@dataclass
+class FakePublishInfo:
+    mid: int
+    rc: mqtt.MQTTErrorCode = mqtt.MQTT_ERR_SUCCESS
+
+
+class FakePahoClient:
+    """Completes publishes like paho's network thread: immediately, or later from a thread."""
+
+    def __init__(self, publisher: PahoMqttPublisher, *, acknowledge_immediately: bool) -> None:
+        self.publisher = publisher
+        self.acknowledge_immediately = acknowledge_immediately
+        self.published: list[tuple[str, bytes, int]] = []
+
+    def is_connected(self) -> bool:
+        return True
+
+    def publish(self, topic: str, payload: bytes, qos: int, retain: bool) -> FakePublishInfo:
+        mid = len(self.published) + 1
+        self.published.append((topic, payload, qos))
+        if self.acknowledge_immediately:
+            self._acknowledge(mid)
+        else:
+            threading.Timer(0.01, self._acknowledge, args=(mid,)).start()
+        return FakePublishInfo(mid)
+
+    def _acknowledge(self, mid: int) -> None:
+        self.publisher._on_publish(self, None, mid, mqtt.ReasonCode(mqtt.PUBACK >> 4), None)
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@pytest.mark.parametrize("publisher_class", [PahoMqttPublisher, AiomqttPublisher])
+async def test_publish_without_a_broker_connection_fails_fast(
+    publisher_class: type[PahoMqttPublisher | AiomqttPublisher],
+) -> None:
+    publisher = publisher_class(Settings(mqtt_host="127.0.0.1", mqtt_port=unused_port()))
+    publisher.start()
+    await asyncio.sleep(0.05)
+    try:
+        with pytest.raises(ConnectionError):
+            await publisher.publish(topic="vda5050/v3/ResearchBot/RB1/order", payload={})
+    finally:
+        await publisher.stop()
+    assert publisher.connected is False
+
+
+@pytest.mark.parametrize("acknowledge_immediately", [True, False])
+async def test_qos1_publish_waits_for_the_acknowledgement(acknowledge_immediately: bool) -> None:
+    publisher = PahoMqttPublisher(Settings())
+    publisher._loop = asyncio.get_running_loop()
+    client = FakePahoClient(publisher, acknowledge_immediately=acknowledge_immediately)
+    publisher._client = client  # type: ignore[assignment]
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            *(
+                publisher.publish(topic="vda5050/v3/ResearchBot/RB1/order", payload={"n": n}, qos=1)
+                for n in range(3)
+            )
+        ),
+        timeout=1,
+    )
+    await publisher.publish(topic="vda5050/v3/ResearchBot/RB1/instantActions", payload={})
+
+    assert [qos for _, _, qos in client.published] == [1, 1, 1, 0]
+    await asyncio.sleep(0.05)
+    assert publisher._pending == {}
+    assert publisher._acknowledged == set()
+
+
+class FakeAiomqttClient:
+    def __init__(self) -> None:
+        self.started: list[tuple[str, int]] = []
+        self.acknowledge = asyncio.Event()
+
+    async def publish(self, topic: str, *, payload: bytes, qos: int, retain: bool) -> None:
+        self.started.append((topic, qos))
+        if qos > 0:
+            await self.acknowledge.wait()
+
+
+async def test_asyncio_publisher_bounds_unacknowledged_messages() -> None:
+    publisher = AiomqttPublisher(Settings(mqtt_publish_max_inflight=2))
+    client = FakeAiomqttClient()
+    publisher._client = client  # type: ignore[assignment]
+
+    publishes = [
+        asyncio.create_task(
+            publisher.publish(topic=f"vda5050/v3/ResearchBot/RB{n}/order", payload={}, qos=1)
+        )
+        for n in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    # A QoS 0 message does not need a slot in the window.
+    await publisher.publish(topic="vda5050/v3/ResearchBot/RB1/instantActions", payload={})
+    assert [qos for _, qos in client.started] == [1, 1, 0]
+
+    client.acknowledge.set()
+    await asyncio.wait_for(asyncio.gather(*publishes), timeout=1)
+    assert len(client.started) == 4
+
+
+async def test_asyncio_publisher_fails_when_disconnected_or_the_window_stays_full() -> None:
+    publisher = AiomqttPublisher(
+        Settings(mqtt_publish_max_inflight=1, mqtt_publish_timeout_seconds=0.05)
+    )
+    with pytest.raises(ConnectionError):
+        await publisher.publish(topic="vda5050/v3/ResearchBot/RB1/order", payload={}, qos=1)
+
+    publisher._client = FakeAiomqttClient()  # type: ignore[assignment]
+    with pytest.raises(TimeoutError):
+        await asyncio.gather(
+            publisher.publish(topic="vda5050/v3/ResearchBot/RB1/order", payload={}, qos=1),
+            publisher.publish(topic="vda5050/v3/ResearchBot/RB2/order", payload={}, qos=1),
+        )
@@ -0,0 +1,141 @@
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import (
+    Base,
+    Mission,
+    MissionOrder,
+    MqttMessageLog,
+    MqttOutboxMessage,
+    Robot,
+)
+from app.mqtt.outbound import RecordingMqttPublisher
+from app.mqtt.outbox import OutboxRelay
+from app.services.event_bus import EventBus
+from app.services.instant_action_service import InstantActionService
+
+
+class FlakyMqttPublisher(RecordingMqttPublisher):
+    def __init__(self) -> None:
+        super().__init__()
+        self.unreachable: set[str] = set()
+
+    async def publish(
+        self, *, topic: str, payload: dict[str, Any], qos: int = 0, retain: bool = False
+    ) -> None:
+        if topic in self.unreachable:
+            raise ConnectionError("broker unavailable")
+        await super().publish(topic=topic, payload=payload, qos=qos, retain=retain)
+
+
+@pytest.fixture
+async def session() -> AsyncIterator[AsyncSession]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with maker() as value:
+        yield value
+    await engine.dispose()
+
+
+async def test_relay_retries_a_failed_publish_before_the_robots_later_messages(
+    session: AsyncSession,
+) -> None:
+    session.add_all(
+        [
+            Robot(id="robot-a", manufacturer="ResearchBot", serial_number="RB-A"),
+            Robot(id="robot-b", manufacturer="ResearchBot", serial_number="RB-B"),
+        ]
+    )
+    await session.commit()
+    service = InstantActionService(session)
+    for robot_id in ["robot-a", "robot-b", "robot-a"]:
+        await service.send(robot_id, "cancelOrder")
+    publisher = FlakyMqttPublisher()
+    publisher.unreachable.add("vda5050/v3/ResearchBot/RB-A/instantActions")
+    relay = OutboxRelay(publisher, retry_delay=60)
+
+    assert await relay.relay_batch(session) == (1, 3)
+    assert [p.topic for p in publisher.publications] == [
+        "vda5050/v3/ResearchBot/RB-B/instantActions"
+    ]
+    failed = await session.get(MqttOutboxMessage, 1)
+    assert failed is not None
+    assert failed.attempts == 1
+    assert failed.last_error == "broker unavailable"
+    # The robot's second message stays behind the first one while it backs off.
+    assert await relay.relay_batch(session) == (0, 0)
+
+    publisher.unreachable.clear()
+    await session.execute(update(MqttOutboxMessage).values(available_at=datetime.now(UTC)))
+    await session.commit()
+
+    assert await relay.relay_batch(session) == (2, 2)
+    assert [p.payload["headerId"] for p in publisher.publications[1:]] == [1, 2]
+
+
+async def test_relay_gives_up_and_lets_the_mission_be_dispatched_again(
+    session: AsyncSession,
+) -> None:
+    robot = Robot(id="robot-order", manufacturer="ResearchBot", serial_number="RB-ORDER")
+    mission = Mission(
+        id="mission-1",
+        assigned_robot_id=robot.id,
+        start_node_key="A",
+        goal_node_key="B",
+        status="sent",
+    )
+    mission_order = MissionOrder(
+        mission_id=mission.id,
+        robot_id=robot.id,
+        order_id=mission.id,
+        header_id=1,
+        payload={"orderId": mission.id},
+        validation_status="valid",
+    )
+    log = MqttMessageLog(
+        direction="outbound",
+        topic="vda5050/v3/ResearchBot/RB-ORDER/order",
+        robot_id=robot.id,
+        message_type="order",
+        payload={"orderId": mission.id},
+        schema_valid=True,
+    )
+    session.add_all(
+        [
+            robot,
+            mission,
+            mission_order,
+            MqttOutboxMessage(robot_id=robot.id, message_log=log, mission_order=mission_order),
+        ]
+    )
+    await session.commit()
+    publisher = FlakyMqttPublisher()
+    publisher.unreachable.add(log.topic)
+    event_bus = EventBus()
+    relay = OutboxRelay(publisher, max_attempts=2, retry_delay=0, event_bus=event_bus)
+
+    async with event_bus.subscribe() as events:
+        assert await relay.relay_batch(session) == (0, 1)
+        await session.execute(
+            update(MqttOutboxMessage).values(available_at=datetime.now(UTC) - timedelta(seconds=1))
+        )
+        assert await relay.relay_batch(session) == (0, 1)
+        event = await events.get()
+
+    outbox_message = (await session.execute(select(MqttOutboxMessage))).scalar_one()
+    await session.refresh(mission)
+    await session.refresh(mission_order)
+    assert outbox_message.attempts == 2
+    assert outbox_message.failed_at is not None
+    assert relay.failed_messages == 1
+    assert mission_order.validation_status == "publish_failed"
+    assert mission.status == "assigned"
+    assert (event.type, event.payload) == ("mission.status.changed", {"status": "assigned"})
+    assert await relay.relay_batch(session) == (0, 0)
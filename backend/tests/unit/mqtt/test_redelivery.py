@@ -0,0 +1,52 @@
+from app.mqtt.inbound import InboundMqttMessage
+from app.mqtt.redelivery import RedeliveryWindow
+
+TOPIC = "vda5050/v3/ResearchBot/RB1/state"
+
+
+def message(
+    header_id: object, timestamp: object = "2026-06-25T13:00:00.000Z"
+) -> InboundMqttMessage:
+    return InboundMqttMessage(topic=TOPIC, payload={"headerId": header_id, "timestamp": timestamp})
+
+
+def test_same_header_id_and_timestamp_is_a_redelivery() -> None:
+    window = RedeliveryWindow(size=4)
+
+    assert window.is_redelivery(message(1)) is False
+    assert window.is_redelivery(message(1)) is True
+    # A robot restart reuses header ids with a new timestamp.
+    assert window.is_redelivery(message(1, "2026-06-25T14:00:00.000Z")) is False
+    assert (
+        window.is_redelivery(InboundMqttMessage(topic=f"{TOPIC}x", payload={"headerId": 1}))
+        is False
+    )
+
+
+def test_window_forgets_least_recently_seen_messages() -> None:
+    window = RedeliveryWindow(size=2)
+    for header_id in (1, 2):
+        window.is_redelivery(message(header_id))
+
+    assert window.is_redelivery(message(1)) is True
+    assert window.is_redelivery(message(3)) is False
+    assert window.is_redelivery(message(2)) is False
+    assert window.is_redelivery(message(1)) is False
+
+
+def test_messages_without_usable_header_id_are_never_redeliveries() -> None:
+    window = RedeliveryWindow()
+
+    for payload_header_id in (None, "1", [1]):
+        assert window.is_redelivery(message(payload_header_id)) is False
+        assert window.is_redelivery(message(payload_header_id)) is False
+    assert window.is_redelivery(message(1, {"unhashable": True})) is False
+
+
+def test_non_object_payload_is_never_a_redelivery() -> None:
+    window = RedeliveryWindow(size=4)
+
+    for payload in ([1, 2], [1, 2], "state", None):
+        non_object = InboundMqttMessage(topic=TOPIC, payload=payload)  # type: ignore[arg-type]
+        assert window.is_redelivery(non_object) is False
+    assert len(window) == 0
@@ -0,0 +1,48 @@
+from datetime import UTC, datetime
+
+from app.mqtt.sequence import SequencePosition, SequenceStats, SequenceTracker, classify
+
+STATE_TOPIC = "vda5050/v3/ResearchBot/RB1/state"
+
+
+def payload(header_id: int, second: int = 0) -> dict:
+    return {"headerId": header_id, "timestamp": f"2026-06-25T13:00:{second:02d}.000Z"}
+
+
+def test_classify_places_header_ids_relative_to_the_newest_message() -> None:
+    newest = SequencePosition(10, datetime(2026, 6, 25, 13, 0, 10, tzinfo=UTC))
+
+    def at(header_id: int, second: int) -> SequencePosition:
+        return SequencePosition(header_id, datetime(2026, 6, 25, 13, 0, second, tzinfo=UTC))
+
+    assert classify(None, at(10, 10)) == ("first", 0)
+    assert classify(newest, at(11, 11)) == ("in_order", 0)
+    assert classify(newest, at(14, 11)) == ("gap", 3)
+    assert classify(newest, at(10, 10)) == ("duplicate", 0)
+    assert classify(newest, at(9, 9)) == ("late", 0)
+    assert classify(newest, at(0, 30)) == ("restart", 0)
+
+
+def test_tracker_keeps_position_on_stale_messages_and_counts_per_robot() -> None:
+    tracker = SequenceTracker()
+
+    verdicts = [
+        tracker.observe(STATE_TOPIC, payload(header_id, second))
+        for header_id, second in [(1, 1), (2, 2), (5, 5), (3, 3), (4, 4), (5, 5), (0, 40), (1, 41)]
+    ]
+
+    assert verdicts == [
+        "first",
+        "in_order",
+        "gap",
+        "late",
+        "late",
+        "duplicate",
+        "restart",
+        "in_order",
+    ]
+    stats = tracker.stats_by_robot()[("ResearchBot", "RB1")]
+    assert stats == SequenceStats(received=8, missing=0, late=2, duplicates=1, restarts=1)
+    assert stats.reorder_rate == 0.25
+    assert tracker.observe("vda5050/v3/ResearchBot/RB1/connection", payload(1)) is None
+    assert tracker.observe(STATE_TOPIC, {"headerId": "7"}) is None
@@ -0,0 +1,49 @@
+import pytest
+
+from app.mqtt.validation_sampler import ValidationSampler, parse_validation_policy
+
+RB1 = "vda5050/v3/ResearchBot/RB1/state"
+RB2 = "vda5050/v3/ResearchBot/RB2/state"
+
+
+def validate(sampler: ValidationSampler, topic: str, valid: bool = True) -> bool:
+    checked = sampler.should_validate(topic, "state")
+    if checked:
+        sampler.record(topic, valid=valid)
+    return checked
+
+
+def test_parse_validation_policy_reads_trust_and_sampling_interval() -> None:
+    assert parse_validation_policy("full") is None
+    assert parse_validation_policy("every:10") == (0, 10)
+    assert parse_validation_policy("trusted:1000:50") == (1000, 50)
+    with pytest.raises(ValueError):
+        parse_validation_policy("sometimes")
+
+
+def test_every_policy_validates_every_nth_message_per_topic() -> None:
+    sampler = ValidationSampler(default="every:3")
+
+    checked = [validate(sampler, RB1) for _ in range(7)]
+
+    assert checked == [True, False, False, True, False, False, True]
+    assert validate(sampler, RB2) is True
+
+
+def test_trusted_policy_samples_after_a_clean_run_and_reverts_on_failure() -> None:
+    sampler = ValidationSampler({"state": "trusted:3:2"})
+
+    checked = [validate(sampler, RB1) for _ in range(6)]
+    assert checked == [True, True, True, True, False, True]
+
+    assert validate(sampler, RB1) is False
+    assert validate(sampler, RB1, valid=False) is True
+    assert [validate(sampler, RB1) for _ in range(5)] == [True, True, True, True, False]
+    assert validate(sampler, RB2) is True
+
+
+def test_connection_and_factsheet_are_always_validated() -> None:
+    sampler = ValidationSampler(default="every:100")
+    topic = "vda5050/v3/ResearchBot/RB1/connection"
+
+    assert all(sampler.should_validate(topic, "connection") for _ in range(5))
@@ -4,7 +4,16 @@ import aiomqtt
 import pytest
 
 from app.core.config import Settings
-from app.mqtt.worker import MqttWorker, build_subscription_filter, next_reconnect_delay
+from app.mqtt.inbound import InboundMqttMessage
+from app.mqtt.worker import (
+    MqttWorker,
+    build_subscription_filter,
+    ingest_lane_count,
+    next_reconnect_delay,
+)
+from app.services.event_bus import EventBus
+from app.services.robot_registry import CachedRobot, RobotIdentityCache
+from app.services.visualization_buffer import VisualizationBuffer
 
 
 def test_build_subscription_filter_targets_vda5050_v3_topics() -> None:
@@ -15,18 +24,30 @@ def test_build_subscription_filter_uses_custom_interface_and_version() -> None:
     assert build_subscription_filter("custom", "v9") == "custom/v9/+/+/+"
 
 
+def test_build_subscription_filter_uses_shared_subscription_group() -> None:
+    assert build_subscription_filter(shared_group="tars") == "$share/tars/vda5050/v3/+/+/+"
+
+
 def test_reconnect_delay_uses_bounded_exponential_backoff() -> None:
     assert next_reconnect_delay(1, 30) == 2
     assert next_reconnect_delay(16, 30) == 30
     assert next_reconnect_delay(30, 30) == 30
 
 
+def test_ingest_lanes_are_clamped_to_one_for_sqlite() -> None:
+    assert ingest_lane_count(Settings(mqtt_ingest_lanes=4)) == 1
+    assert (
+        ingest_lane_count(
+            Settings(mqtt_ingest_lanes=4, database_url="postgresql+asyncpg://tars@db/tars")
+        )
+        == 4
+    )
+
+
 async def test_worker_retries_after_mqtt_connection_failure(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    worker = MqttWorker(
-        Settings(mqtt_reconnect_min_seconds=0.25, mqtt_reconnect_max_seconds=1.0)
-    )
+    worker = MqttWorker(Settings(mqtt_reconnect_min_seconds=0.25, mqtt_reconnect_max_seconds=1.0))
     attempts = 0
     sleeps: list[float] = []
 
@@ -49,3 +70,80 @@ async def test_worker_retries_after_mqtt_connection_failure(
 
     assert attempts == 2
     assert sleeps == [0.25]
+
+
+async def test_visualization_skips_the_database_except_for_sampled_messages(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    event_bus = EventBus()
+    buffer = VisualizationBuffer(size=10)
+    identity_cache = RobotIdentityCache()
+    identity_cache.put(CachedRobot("robot-1", "ResearchBot", "RB1", None, "ONLINE"))
+    worker = MqttWorker(
+        Settings(mqtt_visualization_persist_every=3),
+        event_bus=event_bus,
+        visualization_buffer=buffer,
+        identity_cache=identity_cache,
+    )
+    persisted: list[InboundMqttMessage] = []
+
+    async def put(message: InboundMqttMessage) -> None:
+        persisted.append(message)
+
+    monkeypatch.setattr(worker.dispatcher, "put", put)
+
+    async with event_bus.subscribe() as events:
+        for header_id in range(1, 7):
+            await worker._handle_aiomqtt_message(
+                aiomqtt.Message(
+                    "vda5050/v3/ResearchBot/RB1/visualization",
+                    b'{"headerId":%d,"agvPosition":{"x":1.0,"y":2.0}}' % header_id,
+                    qos=0,
+                    retain=False,
+                    mid=header_id,
+                    properties=None,
+                )
+            )
+        received = [events.get_nowait() for _ in range(events.qsize())]
+
+    assert [message.payload["headerId"] for message in persisted] == [3, 6]
+    assert len(buffer.samples("ResearchBot", "RB1")) == 6
+    assert [event.type for event in received] == ["robot.visualization.updated"] * 6
+    assert received[0].robot_id == "robot-1"
+    assert received[0].payload["agvPosition"] == {"x": 1.0, "y": 2.0}
+
+
+async def test_malformed_visualization_goes_through_the_regular_pipeline(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    event_bus = EventBus()
+    buffer = VisualizationBuffer(size=10)
+    worker = MqttWorker(
+        Settings(mqtt_visualization_persist_every=None),
+        event_bus=event_bus,
+        visualization_buffer=buffer,
+        identity_cache=RobotIdentityCache(),
+    )
+    persisted: list[InboundMqttMessage] = []
+
+    async def put(message: InboundMqttMessage) -> None:
+        persisted.append(message)
+
+    monkeypatch.setattr(worker.dispatcher, "put", put)
+
+    async with event_bus.subscribe() as events:
+        await worker._handle_aiomqtt_message(
+            aiomqtt.Message(
+                "vda5050/v3/ResearchBot/RB1/visualization",
+                b'{"headerId":"x","agvPosition":[1,2]}',
+                qos=0,
+                retain=False,
+                mid=1,
+                properties=None,
+            )
+        )
+        [event] = [events.get_nowait() for _ in range(events.qsize())]
+
+    assert [message.payload["headerId"] for message in persisted] == ["x"]
+    assert event.payload["headerId"] is None
+    assert event.payload["agvPosition"] is None
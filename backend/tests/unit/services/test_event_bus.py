@@ -1,4 +1,8 @@
-from app.services.event_bus import EventBus
+import json
+from contextlib import AsyncExitStack
+from datetime import UTC, datetime, timedelta
+
+from app.services.event_bus import DomainEvent, EventBus, EventFilter
 
 
 async def test_event_bus_broadcasts_an_independent_copy_to_each_subscriber() -> None:
@@ -19,6 +23,35 @@ async def test_event_bus_broadcasts_an_independent_copy_to_each_subscriber() ->
     assert event_bus.subscriber_count == 0
 
 
+def test_domain_event_json_matches_message_and_is_encoded_once() -> None:
+    event = DomainEvent(type="robot.state.updated", robot_id="robot-1", payload={"näme": 1.5})
+
+    encoded = event.as_json()
+
+    assert json.loads(encoded) == event.as_message()
+    assert event.as_json() is encoded
+
+
+def test_domain_event_materializes_id_and_timestamp_on_first_access() -> None:
+    before = datetime.now(UTC)
+    event = DomainEvent("robot.state.updated")
+    after = datetime.now(UTC)
+
+    assert event._id is None
+    assert event.id == event.id
+    # The creation time is a float, so the materialized datetime may be off by a microsecond.
+    slack = timedelta(milliseconds=1)
+    assert before - slack <= event.timestamp <= after + slack
+    assert event.as_message()["timestamp"].endswith("Z")
+
+
+def test_event_bus_without_subscribers_still_returns_the_event() -> None:
+    event = EventBus().publish("mission.created", mission_id="mission-1")
+
+    assert event.mission_id == "mission-1"
+    assert event.as_message()["missionId"] == "mission-1"
+
+
 async def test_event_bus_drops_oldest_event_for_a_slow_subscriber() -> None:
     event_bus = EventBus(subscriber_buffer_size=2)
 
@@ -29,3 +62,66 @@ async def test_event_bus_drops_oldest_event_for_a_slow_subscriber() -> None:
 
         assert (await events.get()).type == "event.2"
         assert (await events.get()).type == "event.3"
+
+
+async def test_event_bus_delivers_only_events_matching_a_subscriber_filter() -> None:
+    event_bus = EventBus()
+    robot_filter = EventFilter(
+        event_types=frozenset({"robot.state", "mission."}), robot_ids=frozenset({"robot-1"})
+    )
+
+    async with (
+        event_bus.subscribe(robot_filter) as robot_events,
+        event_bus.subscribe(EventFilter(mission_ids=frozenset({"mission-1"}))) as mission_events,
+        event_bus.subscribe() as all_events,
+    ):
+        event_bus.publish("robot.state.updated", robot_id="robot-2")
+        event_bus.publish("robot.connection.updated", robot_id="robot-1")
+        event_bus.publish("robot.state.updated", robot_id="robot-1")
+        event_bus.publish("mission.assigned", robot_id="robot-1", mission_id="mission-1")
+
+        assert [robot_events.get_nowait().type for _ in range(robot_events.qsize())] == [
+            "robot.state.updated",
+            "mission.assigned",
+        ]
+        assert [mission_events.get_nowait().type for _ in range(mission_events.qsize())] == [
+            "mission.assigned"
+        ]
+        assert all_events.qsize() == 4
+
+
+async def test_event_bus_only_checks_subscribers_indexed_for_the_event() -> None:
+    event_bus = EventBus()
+
+    async with AsyncExitStack() as stack:
+        queues = [
+            await stack.enter_async_context(
+                event_bus.subscribe(EventFilter(robot_ids=frozenset({f"robot-{index}"})))
+            )
+            for index in range(50)
+        ]
+
+        assert event_bus._candidates("robot-7", None) == [queues[7]]
+        assert event_bus._candidates(None, None) == []
+        assert event_bus.wants("robot.state.updated", "robot-7", None) is True
+        assert event_bus.wants("robot.state.updated", "robot-50", None) is False
+
+    assert event_bus._by_robot == {}
+
+
+async def test_event_bus_update_filter_reindexes_and_drops_buffered_events() -> None:
+    event_bus = EventBus()
+
+    async with event_bus.subscribe() as events:
+        event_bus.publish("robot.state.updated", robot_id="robot-1")
+        event_bus.publish("robot.state.updated", robot_id="robot-2")
+
+        event_bus.update_filter(events, EventFilter(robot_ids=frozenset({"robot-2"})))
+        event_bus.publish("robot.state.updated", robot_id="robot-1")
+        event_bus.publish("mission.created", robot_id="robot-2")
+
+        assert [events.get_nowait().type for _ in range(events.qsize())] == [
+            "robot.state.updated",
+            "mission.created",
+        ]
+    assert event_bus._by_robot == {}
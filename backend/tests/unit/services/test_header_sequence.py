@@ -0,0 +1,113 @@
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base, Mission, MissionOrder, MqttHeaderSequence, MqttMessageLog, Robot
+from app.services.header_sequence import HeaderSequenceAllocator
+
+
+@pytest.fixture
+async def session(tmp_path: Path) -> AsyncIterator[AsyncSession]:
+    # A file database, so concurrent leases get their own connections as they would in
+    # production; an in-memory database shares one connection.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tars.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with maker() as value:
+        value.add_all(
+            [
+                Robot(id="robot-1", manufacturer="ResearchBot", serial_number="RB-1"),
+                Robot(id="robot-2", manufacturer="ResearchBot", serial_number="RB-2"),
+            ]
+        )
+        await value.commit()
+        yield value
+    await engine.dispose()
+
+
+async def stored_next_header_ids(session: AsyncSession) -> dict[tuple[str, str], int]:
+    rows = (await session.scalars(select(MqttHeaderSequence))).all()
+    return {(row.robot_id, row.message_type): row.next_header_id for row in rows}
+
+
+async def test_allocator_continues_existing_history_and_leases_ranges(
+    session: AsyncSession,
+) -> None:
+    mission = Mission(id="mission-1", start_node_key="A", goal_node_key="B")
+    session.add_all(
+        [
+            mission,
+            MissionOrder(
+                mission_id=mission.id,
+                robot_id="robot-1",
+                order_id=mission.id,
+                header_id=7,
+                payload={},
+                validation_status="valid",
+            ),
+            MqttMessageLog(
+                direction="outbound",
+                topic="vda5050/v3/ResearchBot/RB-1/instantActions",
+                robot_id="robot-1",
+                message_type="instantActions",
+                payload={"headerId": 4},
+            ),
+        ]
+    )
+    await session.commit()
+    allocator = HeaderSequenceAllocator(lease_size=3)
+
+    orders = [await allocator.next_header_id(session, "robot-1", "order") for _ in range(4)]
+    actions = await allocator.next_header_ids(session, ["robot-1", "robot-2"], "instantActions")
+
+    assert orders == [8, 9, 10, 11]
+    assert actions == {"robot-1": 5, "robot-2": 1}
+    assert await stored_next_header_ids(session) == {
+        ("robot-1", "order"): 14,
+        ("robot-1", "instantActions"): 8,
+        ("robot-2", "instantActions"): 4,
+    }
+
+
+async def test_concurrent_allocators_never_share_an_id(session: AsyncSession) -> None:
+    replicas = [HeaderSequenceAllocator(lease_size=5), HeaderSequenceAllocator(lease_size=5)]
+
+    header_ids = await asyncio.gather(
+        *(replicas[n % 2].next_header_id(session, "robot-1", "instantActions") for n in range(30))
+    )
+
+    assert sorted(header_ids) == list(range(1, 31))
+
+
+async def test_leased_ids_are_not_reused_after_the_caller_rolls_back(
+    session: AsyncSession,
+) -> None:
+    allocator = HeaderSequenceAllocator(lease_size=2)
+    assert await allocator.next_header_id(session, "robot-1", "order") == 1
+    await session.rollback()
+
+    # A restarted replica starts a new lease after the one that was handed out.
+    assert await HeaderSequenceAllocator().next_header_id(session, "robot-1", "order") == 3
+
+
+async def test_allocate_holds_only_the_allocated_robots_sequence(session: AsyncSession) -> None:
+    allocator = HeaderSequenceAllocator(lease_size=5)
+
+    async with allocator.allocate(session, ["robot-1"], "instantActions") as held:
+        waiting = asyncio.create_task(
+            allocator.next_header_id(session, "robot-1", "instantActions")
+        )
+        other = await asyncio.wait_for(
+            allocator.next_header_id(session, "robot-2", "instantActions"), timeout=5
+        )
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+    assert held == {"robot-1": 1}
+    assert other == 1
+    assert await waiting == 2
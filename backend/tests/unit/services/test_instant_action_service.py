@@ -1,11 +1,14 @@
+import asyncio
 from collections.abc import AsyncIterator
+from pathlib import Path
 
 import pytest
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from app.db.base import Base, MqttMessageLog, Robot
+from app.db.base import Base, MqttMessageLog, MqttOutboxMessage, Robot
 from app.mqtt.outbound import RecordingMqttPublisher
+from app.mqtt.outbox import OutboxRelay
 from app.services.instant_action_service import InstantActionService
 from app.vda5050.validator import validate_message
 
@@ -28,10 +31,11 @@ async def test_send_cancel_order_publishes_valid_incremental_instant_actions(
     session.add(robot)
     await session.commit()
     publisher = RecordingMqttPublisher()
-    service = InstantActionService(session, publisher)
+    service = InstantActionService(session)
 
     first = await service.send(robot.id, "cancelOrder")
     second = await service.send(robot.id, "cancelOrder")
+    await OutboxRelay(publisher).relay_batch(session)
 
     assert first.accepted is True
     assert second.accepted is True
@@ -40,15 +44,109 @@ async def test_send_cancel_order_publishes_valid_incremental_instant_actions(
     assert second.payload["headerId"] == 2
     assert first.payload["actions"][0]["actionType"] == "cancelOrder"
     assert validate_message("instantActions", first.payload).valid is True
-    assert len(publisher.publications) == 2
+    assert [publication.payload["headerId"] for publication in publisher.publications] == [1, 2]
     logs = (await session.execute(select(MqttMessageLog))).scalars().all()
     assert [log.message_type for log in logs] == ["instantActions", "instantActions"]
+    outbox = (await session.execute(select(MqttOutboxMessage))).scalars().all()
+    assert all(message.published_at is not None for message in outbox)
 
 
 async def test_send_instant_action_rejects_unknown_robot(session: AsyncSession) -> None:
-    result = await InstantActionService(session, RecordingMqttPublisher()).send(
-        "missing", "cancelOrder"
-    )
+    result = await InstantActionService(session).send("missing", "cancelOrder")
 
     assert result.accepted is False
     assert result.errors == ["Robot not found"]
+
+
+async def test_broadcast_queues_one_instant_action_per_matching_robot(
+    session: AsyncSession,
+) -> None:
+    session.add_all(
+        [
+            Robot(
+                id="robot-1",
+                manufacturer="ResearchBot",
+                serial_number="RB-1",
+                last_connection_state="ONLINE",
+            ),
+            Robot(
+                id="robot-2",
+                manufacturer="ResearchBot",
+                serial_number="RB-2",
+                last_connection_state="ONLINE",
+            ),
+            Robot(
+                id="robot-3",
+                manufacturer="ResearchBot",
+                serial_number="RB-3",
+                last_connection_state="OFFLINE",
+            ),
+            Robot(
+                id="robot-4",
+                manufacturer="OtherBot",
+                serial_number="OB-4",
+                last_connection_state="ONLINE",
+            ),
+        ]
+    )
+    await session.commit()
+    publisher = RecordingMqttPublisher()
+    service = InstantActionService(session)
+    await service.send("robot-2", "startPause")
+
+    result = await service.broadcast(
+        "startPause",
+        robot_ids=["robot-1", "robot-2", "robot-3", "missing"],
+        manufacturer="ResearchBot",
+        connection_state="ONLINE",
+    )
+    await OutboxRelay(publisher).relay_batch(session)
+
+    assert result.accepted is True
+    assert {robot_id: item.accepted for robot_id, item in result.results.items()} == {
+        "robot-1": True,
+        "robot-2": True,
+        "robot-3": False,
+        "missing": False,
+    }
+    assert result.results["robot-1"].payload["headerId"] == 1
+    assert result.results["robot-2"].payload["headerId"] == 2
+    assert result.results["missing"].errors == ["Robot not found or not matching the filter"]
+    assert sorted(
+        (publication.payload["serialNumber"], publication.payload["headerId"])
+        for publication in publisher.publications
+    ) == [("RB-1", 1), ("RB-2", 1), ("RB-2", 2)]
+
+
+async def test_concurrent_sends_commit_a_robots_header_ids_in_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tars.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with maker() as session:
+        session.add(Robot(id="robot-1", manufacturer="ResearchBot", serial_number="RB-1"))
+        await session.commit()
+
+    async def send() -> None:
+        async with maker() as session:
+            commit = session.commit
+
+            async def slow_commit() -> None:
+                # Lower ids take longer to commit, which would let higher ids overtake them.
+                [log] = [item for item in session.new if isinstance(item, MqttMessageLog)]
+                await asyncio.sleep((7 - log.payload["headerId"]) * 0.01)
+                await commit()
+
+            monkeypatch.setattr(session, "commit", slow_commit)
+            await InstantActionService(session).send("robot-1", "startPause")
+
+    await asyncio.gather(*(send() for _ in range(6)))
+
+    publisher = RecordingMqttPublisher()
+    async with maker() as session:
+        await OutboxRelay(publisher).relay_batch(session)
+    await engine.dispose()
+    header_ids = [publication.payload["headerId"] for publication in publisher.publications]
+    assert header_ids == list(range(1, 7))
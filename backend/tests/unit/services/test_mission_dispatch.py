@@ -12,9 +12,11 @@ from app.db.base import (
     Mission,
     MissionOrder,
     MqttMessageLog,
+    MqttOutboxMessage,
     Robot,
 )
 from app.mqtt.outbound import RecordedPublish, RecordingMqttPublisher
+from app.mqtt.outbox import OutboxRelay
 from app.services.event_bus import EventBus
 from app.services.mission_dispatch import MissionDispatchService
 
@@ -30,7 +32,7 @@ async def session() -> AsyncIterator[AsyncSession]:
     await engine.dispose()
 
 
-async def test_dispatch_mission_publishes_order_and_logs_outbound(
+async def test_dispatch_mission_commits_order_to_outbox_and_relay_publishes_it(
     session: AsyncSession,
 ) -> None:
     robot = Robot(
@@ -81,9 +83,9 @@ async def test_dispatch_mission_publishes_order_and_logs_outbound(
     event_bus = EventBus()
 
     async with event_bus.subscribe() as events:
-        result = await MissionDispatchService(session, publisher, event_bus).dispatch_mission(
-            mission.id
-        )
+        result = await MissionDispatchService(session, event_bus).dispatch_mission(mission.id)
+        assert publisher.publications == []
+        relayed = await OutboxRelay(publisher, event_bus=event_bus).relay_batch(session)
         emitted_types = [(await events.get()).type for _ in range(3)]
 
     assert result.accepted is True
@@ -100,6 +102,7 @@ async def test_dispatch_mission_publishes_order_and_logs_outbound(
         "allowedDeviationTheta": 0.1,
         "mapId": layout.id,
     }
+    assert relayed == (1, 1)
     assert publisher.publications == [
         RecordedPublish(topic=result.topic, payload=result.payload, qos=0, retain=False)
     ]
@@ -116,10 +119,13 @@ async def test_dispatch_mission_publishes_order_and_logs_outbound(
     assert mission_order.payload == result.payload
     assert mission_order.validation_status == "valid"
     assert mission_order.published_at is not None
+    outbox_message = (await session.execute(select(MqttOutboxMessage))).scalar_one()
+    assert outbox_message.message_log_id == log.id
+    assert outbox_message.published_at is not None
     assert emitted_types == [
-        "mqtt.message.published",
         "mission.dispatched",
         "mission.status.changed",
+        "mqtt.message.published",
     ]
 
 
@@ -128,7 +134,7 @@ async def test_dispatch_mission_rejects_unassigned_mission(session: AsyncSession
     session.add(mission)
     await session.commit()
 
-    service = MissionDispatchService(session, RecordingMqttPublisher())
+    service = MissionDispatchService(session)
 
     result = await service.dispatch_mission(mission.id)
 
@@ -155,8 +161,7 @@ async def test_dispatch_mission_increments_order_header_per_robot(session: Async
         ]
     )
     await session.commit()
-    publisher = RecordingMqttPublisher()
-    service = MissionDispatchService(session, publisher)
+    service = MissionDispatchService(session)
 
     header_ids = []
     for _ in range(2):
@@ -198,9 +203,7 @@ async def test_dispatch_mission_rejects_when_route_does_not_exist(
     )
     await session.commit()
 
-    result = await MissionDispatchService(
-        session, RecordingMqttPublisher()
-    ).dispatch_mission(mission.id)
+    result = await MissionDispatchService(session).dispatch_mission(mission.id)
 
     assert result.accepted is False
     assert result.errors == ["No route found"]
@@ -2,7 +2,7 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.db.base import Base
-from app.services.robot_registry import RobotRegistryService
+from app.services.robot_registry import RobotIdentityCache, RobotRegistryService
 
 
 @pytest.fixture
@@ -81,3 +81,18 @@ async def test_save_state_snapshot_and_read_latest_state(session: AsyncSession)
     assert latest.id == snapshot.id
     assert latest.battery_charge == 87.5
     assert latest.raw_payload == payload
+
+
+async def test_identity_cache_is_warmed_and_written_through(session: AsyncSession) -> None:
+    service = RobotRegistryService(session)
+    robot = await service.get_or_create("ResearchBot", "RB005")
+    cache = RobotIdentityCache()
+
+    assert await cache.warm(session) == 1
+    service.identity_cache = cache
+    await service.update_connection_state(robot.id, "ONLINE")
+
+    cached = cache.get("ResearchBot", "RB005")
+    assert cached is not None
+    assert cached.id == robot.id
+    assert cached.last_connection_state == "ONLINE"
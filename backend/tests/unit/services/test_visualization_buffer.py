@@ -0,0 +1,22 @@
+import pytest
+
+from app.services.visualization_buffer import VisualizationBuffer
+
+
+def test_buffer_keeps_the_newest_samples_per_robot() -> None:
+    buffer = VisualizationBuffer(size=3)
+
+    for header_id in range(1, 6):
+        buffer.record("ResearchBot", "RB1", {"headerId": header_id, "velocity": {"vx": 0.5}})
+    _, received = buffer.record("ResearchBot", "RB2", {"headerId": 1})
+
+    assert [sample.header_id for sample in buffer.samples("ResearchBot", "RB1")] == [3, 4, 5]
+    assert [sample.header_id for sample in buffer.samples("ResearchBot", "RB1", 2)] == [4, 5]
+    assert buffer.samples("ResearchBot", "RB1")[0].velocity == {"vx": 0.5}
+    assert received == 1
+    assert buffer.samples("ResearchBot", "unknown") == []
+
+
+def test_buffer_rejects_non_positive_size() -> None:
+    with pytest.raises(ValueError):
+        VisualizationBuffer(size=0)
@@ -0,0 +1,112 @@
+import copy
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from app.vda5050.compiled import UnsupportedSchemaError, compile_schema
+from app.vda5050.instant_actions import build_instant_actions
+from app.vda5050.validator import SUPPORTED_MESSAGE_TYPES, _load_schema, _validator
+from benchmarks.payloads import order_payload, state_payload
+
+REPLACEMENTS: list[Any] = [None, "text", -1, 2.5, 3.0, True, [], {}]
+
+
+def mutations(payload: Any) -> Iterator[Any]:
+    """The payload with one key removed or one value replaced by another JSON type."""
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            yield {k: v for k, v in payload.items() if k != key}
+            for replacement in [*REPLACEMENTS, *mutations(value)]:
+                yield {**payload, key: replacement}
+    elif isinstance(payload, list):
+        for index, value in enumerate(payload[:2]):
+            for replacement in [*REPLACEMENTS, *mutations(value)]:
+                yield [*payload[:index], replacement, *payload[index + 1 :]]
+
+
+def sample_payloads() -> dict[str, dict[str, Any]]:
+    return {
+        "state": state_payload(node_count=2),
+        "order": order_payload(node_count=2),
+        "instantActions": build_instant_actions(
+            manufacturer="ResearchBot",
+            serial_number="RB001",
+            header_id=1,
+            action_id="action-1",
+            action_type="startPause",
+            action_parameters=[{"key": "duration", "value": 5}],
+        ),
+        "connection": {
+            "headerId": 1,
+            "timestamp": "2026-06-25T13:00:00.00Z",
+            "version": "3.0.0",
+            "manufacturer": "ResearchBot",
+            "serialNumber": "RB001",
+            "connectionState": "ONLINE",
+        },
+    }
+
+
+@pytest.mark.parametrize("message_type", sorted(SUPPORTED_MESSAGE_TYPES))
+def test_every_vda5050_schema_compiles(message_type: str) -> None:
+    assert callable(compile_schema(_load_schema(message_type)))
+
+
+@pytest.mark.parametrize("message_type", sorted(sample_payloads()))
+def test_compiled_validator_agrees_with_jsonschema(message_type: str) -> None:
+    is_valid = compile_schema(_load_schema(message_type))
+    validator = _validator(message_type)
+    payload = sample_payloads()[message_type]
+    assert is_valid(payload) is True
+
+    disagreements = [
+        mutated
+        for mutated in mutations(copy.deepcopy(payload))
+        if is_valid(mutated) is not validator.is_valid(mutated)
+    ]
+
+    assert disagreements == []
+
+
+def test_conditional_and_bounded_keywords_match_json_schema_semantics() -> None:
+    is_valid = compile_schema(
+        {
+            "type": "object",
+            "properties": {
+                "kind": {"enum": ["SPEED_LIMIT", "OTHER"]},
+                "count": {"type": "integer", "minimum": 0, "exclusiveMaximum": 3},
+                "points": {"type": "array", "minItems": 2, "items": {"type": "number"}},
+            },
+            "allOf": [
+                {
+                    "if": {"properties": {"kind": {"const": "SPEED_LIMIT"}}},
+                    "then": {"required": ["count"]},
+                }
+            ],
+        }
+    )
+
+    assert is_valid({"kind": "OTHER"}) is True
+    assert is_valid({"kind": "SPEED_LIMIT"}) is False
+    assert is_valid({"kind": "SPEED_LIMIT", "count": 2.0}) is True
+    assert is_valid({"count": True}) is False
+    assert is_valid({"count": 3}) is False
+    assert is_valid({"points": [1]}) is False
+    assert is_valid({"points": [1, False]}) is False
+    assert is_valid([]) is False
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        {"type": "string", "pattern": "^[A-Z]+$"},
+        {"type": "object", "dependentRequired": {"a": ["b"]}},
+        {"type": "array", "contains": {"type": "string"}},
+        {"properties": {"nested": {"unevaluatedProperties": False}}},
+        {"type": "string", "x-madeUpKeyword": True},
+    ],
+)
+def test_unsupported_keywords_are_rejected_instead_of_ignored(schema: dict[str, Any]) -> None:
+    with pytest.raises(UnsupportedSchemaError):
+        compile_schema(schema)
@@ -0,0 +1,34 @@
+from app.mqtt.codec import encode_payload
+from app.vda5050.validation_pool import ValidationPool
+from benchmarks.payloads import order_payload
+
+
+async def test_validation_pool_validates_inline_until_started() -> None:
+    pool = ValidationPool(processes=1, min_payload_bytes=0)
+
+    result = await pool.validate("order", order_payload())
+
+    assert result.valid is True
+    assert pool.running is False
+    assert pool.offloaded == 0
+
+
+async def test_validation_pool_offloads_only_large_payloads() -> None:
+    small = order_payload()
+    large = order_payload(node_count=200)
+    invalid = {**large, "nodes": "not-a-list"}
+    pool = ValidationPool(processes=1, min_payload_bytes=len(encode_payload(small)) + 1)
+    pool.start()
+    try:
+        small_result = await pool.validate("order", small)
+        large_result = await pool.validate("order", large)
+        invalid_result = await pool.validate("order", invalid, size=len(encode_payload(large)))
+    finally:
+        await pool.stop()
+
+    assert small_result.valid is True
+    assert large_result.valid is True
+    assert invalid_result.valid is False
+    assert any("nodes" in error for error in invalid_result.errors)
+    assert pool.offloaded == 2
+    assert pool.running is False
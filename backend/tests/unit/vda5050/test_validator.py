@@ -1,4 +1,11 @@
-from app.vda5050.validator import validate_message
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.vda5050 import validator
+from app.vda5050.validator import validate_message, write_normalized_schemas
 
 
 def test_valid_connection_message_passes_schema_validation() -> None:
@@ -37,3 +44,33 @@ def test_unknown_message_type_fails_without_exception() -> None:
 
     assert result.valid is False
     assert result.errors == ["Unsupported VDA 5050 message type: not-a-vda-topic"]
+
+
+def test_normalized_schemas_are_used_until_the_original_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    shutil.copytree(
+        validator.SCHEMA_DIR,
+        tmp_path,
+        ignore=shutil.ignore_patterns("*.normalized.json"),
+        dirs_exist_ok=True,
+    )
+    monkeypatch.setattr(validator, "SCHEMA_DIR", tmp_path)
+    validator._load_schema_source.cache_clear()
+    try:
+        original, checked = validator._load_schema_source("state")
+        assert checked is False
+
+        write_normalized_schemas()
+        validator._load_schema_source.cache_clear()
+        normalized, checked = validator._load_schema_source("state")
+        assert checked is True
+        assert normalized == original
+
+        source = validator.schema_path("state")
+        later = validator.normalized_schema_path("state").stat().st_mtime + 1
+        os.utime(source, (later, later))
+        validator._load_schema_source.cache_clear()
+        assert validator._load_schema_source("state")[1] is False
+    finally:
+        validator._load_schema_source.cache_clear()
@@ -1,11 +1,11 @@
 import argparse
 import asyncio
-import json
 import logging
 import sys
 
 import aiomqtt
 
+from tars_robot_simulator.codec import PayloadDecodeError, decode_payload, encode_payload
 from tars_robot_simulator.payloads import RobotIdentity
 from tars_robot_simulator.simulator import Publication, SimulatedRobot
 from tars_robot_simulator.topics import subscription_topics
@@ -78,8 +78,8 @@ async def publish_state_forever(
 async def consume_commands(client: aiomqtt.Client, robot: SimulatedRobot) -> None:
     async for message in client.messages:
         try:
-            payload = json.loads(message.payload.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            payload = decode_payload(message.payload)
+        except PayloadDecodeError as exc:
             logger.warning("Ignoring invalid command payload on %s: %s", message.topic, exc)
             continue
         topic = str(message.topic)
@@ -93,7 +93,7 @@ async def consume_commands(client: aiomqtt.Client, robot: SimulatedRobot) -> Non
 
 
 async def publish(client: aiomqtt.Client, publication: Publication) -> None:
-    payload = json.dumps(publication.payload, separators=(",", ":"))
+    payload = encode_payload(publication.payload)
     await client.publish(
         publication.topic,
         payload=payload,
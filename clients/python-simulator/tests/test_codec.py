@@ -0,0 +1,17 @@
+import pytest
+
+from tars_robot_simulator.codec import PayloadDecodeError, decode_payload, encode_payload
+
+
+def test_codec_round_trips_vda5050_payload() -> None:
+    payload = {"headerId": 7, "orderId": "order-1", "nodes": [{"nodeId": "A", "released": True}]}
+
+    encoded = encode_payload(payload)
+
+    assert encoded == b'{"headerId":7,"orderId":"order-1","nodes":[{"nodeId":"A","released":true}]}'
+    assert decode_payload(encoded) == payload
+
+
+def test_decode_payload_rejects_invalid_json() -> None:
+    with pytest.raises(PayloadDecodeError):
+        decode_payload(b"\xff")